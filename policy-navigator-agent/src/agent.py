@@ -1,25 +1,109 @@
+import asyncio
+import contextvars
 import json
+import logging
 import os
 import re
 from concurrent.futures import ThreadPoolExecutor
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple, Callable, Awaitable
 
+from cache import DiskCache, file_sha256, make_key
+from config import (
+    CACHE_DIR,
+    IE_CACHE_ENABLED,
+    IE_CACHE_MAX_ENTRIES,
+    IE_CACHE_TTL_HOURS,
+    PARSE_CACHE_ENABLED,
+    PARSE_CACHE_MAX_ENTRIES,
+    PARSE_CACHE_MAX_MB,
+    PLAN_FILTERS_QUESTIONS,
+    PLAN_PROMPT_TOKENS,
+    FINAL_PROMPT_TOKENS,
+    PRESCREEN_ENABLED,
+    PROMPT_BUDGET_ENABLED,
+)
+from eligibility import predicates_from_output, prescreen
+from pipeline import StageGraph
+from policy_pack import build_pack, load_pack, pack_policy
 from prompts import (
+    PromptBudget,
     build_solar_prompt,
     build_plan_prompt,
+    build_policy_conditions_prompt,
+    build_predicate_compile_prompt,
+    build_replan_prompt,
     build_question_filter_prompt,
     build_profile_extract_prompt,
     build_profile_parse_prompt,
+    compact_ie_extract,
+    compact_plan,
     format_profile_structured,
 )
-from upstage_client import call_document_parse, call_information_extract, call_solar
+from profile_parser import parse_profile_rules
+from ratelimit import estimate_tokens
+from retrieval import PolicyIndex, chunk_elements, chunk_text, format_chunks
+from tracing import record_prompt_savings, start_trace, traced_stage, tracer
+from upstage_client import (
+    DOCUMENT_PARSE_PARAMS,
+    PARSE_SPLIT_PARAMS,
+    acall_document_parse,
+    acall_information_extract,
+    acall_solar,
+    call_document_parse,
+    call_information_extract,
+    call_solar,
+)
 
 
+logger = logging.getLogger(__name__)
+
 # 기본 PDF 경로 (data 폴더 내) — 금융·재정·조세 정책
 DEFAULT_PDF_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "finance_policy.pdf")
 MAX_POLICY_TEXT_CHARS = 20000
 # Plan 전용 정책 텍스트 길이 제한. None이면 전체 사용. 빈 응답 원인 파악 시 6000 등으로 줄여서 테스트.
 PLAN_MAX_POLICY_CHARS: Optional[int] = None
+# 프롬프트에 넣을 정책 텍스트 예산 (문자). 관련 청크만 BM25로 골라 이 길이 안에서 구성
+PLAN_CONTEXT_CHARS = 8000
+# 정책 팩의 자격 조건 목록이 있으면 조건을 본문에서 다시 찾을 필요가 없으므로 근거 본문만 적게 포함
+PLAN_CONTEXT_CHARS_WITH_CONDITIONS = 4000
+# 정책 팩 생성 시 자격 조건 추출에 넣을 본문 예산
+CONDITIONS_CONTEXT_CHARS = 16000
+FINAL_CONTEXT_CHARS = 12000
+# 프롬프트 예산 적용 시에도 정책 본문은 최소 이만큼 포함 (고정 섹션이 예산을 다 써도 근거가 남도록)
+MIN_PROMPT_POLICY_CHARS = 1500
+# 정책 본문 예산 중 프로필과 무관한 질의로 고르는 고정 블록의 비율 (나머지는 사용자별 추가 본문).
+# 고정 블록은 프롬프트 앞쪽에 두어 같은 정책이면 세션이 달라도 접두부가 같음 (서버 측 prefix 캐시)
+STABLE_POLICY_SHARE = 0.75
+# 프롬프트 예산에서 사용자별 섹션 몫으로 미리 떼어 두는 토큰 (고정 블록 길이가 사용자마다 달라지지 않도록)
+PLAN_USER_RESERVE_TOKENS = 300
+FINAL_USER_RESERVE_TOKENS = 1200
+# 답변 후 재분석: True면 1차 Plan + 새 답변 + 관련 청크만 보내 증분 갱신 (실패 시 전체 재분석)
+INCREMENTAL_REPLAN = True
+REPLAN_CONTEXT_CHARS = 4000
+# Plan 검색 질의에 항상 포함하는 자격 판단 관련 용어 (프로필만으로는 매칭이 약함)
+ELIGIBILITY_QUERY_TERMS = "지원 대상 자격 요건 조건 연령 나이 소득 기준 거주 신청 방법 기간 혜택 제외"
+
+
+# Document Parse 결과 캐시 (파일 해시 + 요청 파라미터 키, LRU 제거)
+_parse_cache: Optional[DiskCache] = (
+    DiskCache(
+        os.path.join(CACHE_DIR, "document_parse"),
+        max_bytes=PARSE_CACHE_MAX_MB * 1024 * 1024,
+        max_entries=PARSE_CACHE_MAX_ENTRIES,
+    )
+    if PARSE_CACHE_ENABLED
+    else None
+)
+# Information Extraction 결과 캐시 (파일 해시 + IE_SCHEMA 지문 키, TTL)
+_ie_cache: Optional[DiskCache] = (
+    DiskCache(
+        os.path.join(CACHE_DIR, "information_extract"),
+        max_entries=IE_CACHE_MAX_ENTRIES,
+        ttl_seconds=IE_CACHE_TTL_HOURS * 3600,
+    )
+    if IE_CACHE_ENABLED
+    else None
+)
 
 
 REQUIRED_HEADERS = [
@@ -60,6 +144,39 @@ def _clean_terminal_output(text: str) -> str:
     return s.strip()
 
 
+class _StreamCleaner:
+    """스트리밍 출력용 굵은글씨(**) 제거기.
+
+    토큰 경계에 걸친 "**"를 처리하기 위해 끝의 "*" 한 글자는 다음 토큰까지 보류한다.
+    최종 반환값은 전체 응답에 _clean_terminal_output을 다시 적용한다.
+    """
+
+    def __init__(self, write: Callable[[str], None]) -> None:
+        self._write = write
+        self._pending = ""
+        self._started = False
+
+    def feed(self, delta: str) -> None:
+        text = (self._pending + delta).replace("**", "")
+        self._pending = ""
+        if text.endswith("*"):
+            text, self._pending = text[:-1], "*"
+        if not self._started:
+            text = text.lstrip()  # _clean_terminal_output과 같이 앞 공백 제거
+            self._started = bool(text)
+        if text:
+            self._write(text)
+
+    def close(self) -> None:
+        if self._pending:
+            self._write(self._pending)
+            self._pending = ""
+
+
+def _print_stream(text: str) -> None:
+    print(text, end="", flush=True)
+
+
 def _ensure_required_headers(text: str) -> str:
     """출력에 필수 섹션 헤더가 포함되어 있는지 확인."""
     missing = [header for header in REQUIRED_HEADERS if header not in text]
@@ -72,21 +189,25 @@ def _ensure_required_headers(text: str) -> str:
     return "\n".join(lines).strip()
 
 
-def _policy_text_from_parsed_doc(parsed_doc: Dict[str, Any]) -> str:
+def _policy_text_from_parsed_doc(
+    parsed_doc: Dict[str, Any],
+    max_chars: Optional[int] = MAX_POLICY_TEXT_CHARS,
+) -> str:
     """Document Parse 응답을 텍스트로 변환.
 
     우선 content.text / content.html, 그다음 elements[] 내 paragraph/heading 등
     content.text를 모아 사용. 본문이 elements에만 있는 API 응답 구조 대응.
+    max_chars=None이면 길이 제한 없이 반환 (청킹용).
     """
     for key in ("html", "text", "content"):
         val = parsed_doc.get(key)
         if isinstance(val, str) and val.strip():
-            return _normalize_policy_text(val)
+            return _normalize_policy_text(val, max_chars)
         if isinstance(val, dict):
             for nested_key in ("text", "html"):
                 nested_val = val.get(nested_key)
                 if isinstance(nested_val, str) and nested_val.strip():
-                    return _normalize_policy_text(nested_val)
+                    return _normalize_policy_text(nested_val, max_chars)
     # content.text가 비어 있고 elements에 본문이 있는 경우
     elements = parsed_doc.get("elements") or parsed_doc.get("content", {}).get("elements")
     if isinstance(elements, list):
@@ -105,30 +226,108 @@ def _policy_text_from_parsed_doc(parsed_doc: Dict[str, Any]) -> str:
             if t and str(t).strip():
                 parts.append(str(t).strip())
         if parts:
-            return _normalize_policy_text(" ".join(parts))
+            return _normalize_policy_text(" ".join(parts), max_chars)
     try:
-        return _normalize_policy_text(json.dumps(parsed_doc, ensure_ascii=False))
+        return _normalize_policy_text(json.dumps(parsed_doc, ensure_ascii=False), max_chars)
     except Exception:
-        return _normalize_policy_text(str(parsed_doc))
+        return _normalize_policy_text(str(parsed_doc), max_chars)
+
+
+def _build_policy_index(parsed_doc: Dict[str, Any]) -> PolicyIndex:
+    """Document Parse 응답 → 청크 인덱스.
+
+    elements(heading/paragraph/table)로 청킹하고, elements가 없으면 길이 제한 없는 본문을 청킹.
+    """
+    elements = parsed_doc.get("elements")
+    if elements is None and isinstance(parsed_doc.get("content"), dict):
+        elements = parsed_doc["content"].get("elements")
+    chunks = chunk_elements(elements) if isinstance(elements, list) else []
+    if not chunks:
+        chunks = chunk_text(_policy_text_from_parsed_doc(parsed_doc, max_chars=None))
+    return PolicyIndex(chunks, _policy_text_from_parsed_doc(parsed_doc))
 
 
-def _normalize_policy_text(raw_text: str) -> str:
+def _document_hash(pdf_path: str) -> Optional[str]:
+    """파싱/IE 캐시 키에 쓰는 PDF 내용 해시. 캐시가 모두 꺼져 있거나 읽을 수 없으면 None.
+
+    load_policy / run에서 1회 계산하여 두 캐시 조회에 함께 전달 (파일을 두 번 해시하지 않도록).
+    """
+    if _parse_cache is None and _ie_cache is None:
+        return None
+    try:
+        return file_sha256(pdf_path)
+    except OSError:
+        return None
+
+
+def _parse_cache_key(doc_hash: str) -> str:
+    return make_key(doc_hash, DOCUMENT_PARSE_PARAMS, PARSE_SPLIT_PARAMS)
+
+
+def _store_cached(cache: Optional[DiskCache], key: Optional[str], value: Any) -> None:
+    """캐시 저장. 실패해도 실행에 영향 없음."""
+    if cache is None or key is None:
+        return
+    try:
+        cache.set(key, value)
+    except (OSError, TypeError, ValueError):
+        pass
+
+
+@traced_stage("parse")
+def _load_parsed_doc(
+    pdf_path: str,
+    doc_hash: Optional[str] = None,
+    on_progress: Optional[Callable[[int, int, int, int], None]] = None,
+) -> Dict[str, Any]:
+    """Document Parse 결과 반환. 캐시 적중 시 API 호출 생략, 미스 시 호출 후 저장.
+
+    doc_hash: _document_hash 결과 (없으면 여기서 계산)
+    on_progress: 대용량 PDF 분할 파싱 시 구간별 진행 상황 콜백 (call_document_parse 참고)
+    """
+    doc_hash = doc_hash or _document_hash(pdf_path)
+    if _parse_cache is None or doc_hash is None:
+        return call_document_parse(pdf_path, on_progress=on_progress)
+
+    key = _parse_cache_key(doc_hash)
+    cached = _parse_cache.get(key)
+    if isinstance(cached, dict):
+        return cached
+
+    parsed_doc = call_document_parse(pdf_path, on_progress=on_progress)
+    _store_cached(_parse_cache, key, parsed_doc)
+    return parsed_doc
+
+
+@traced_stage("parse")
+async def _aload_parsed_doc(pdf_path: str, doc_hash: Optional[str] = None) -> Dict[str, Any]:
+    """_load_parsed_doc의 비동기 버전 (캐시 파일 I/O는 스레드에서 수행)."""
+    doc_hash = doc_hash or await asyncio.to_thread(_document_hash, pdf_path)
+    if _parse_cache is None or doc_hash is None:
+        return await acall_document_parse(pdf_path)
+
+    key = _parse_cache_key(doc_hash)
+    cached = await asyncio.to_thread(_parse_cache.get, key)
+    if isinstance(cached, dict):
+        return cached
+
+    parsed_doc = await acall_document_parse(pdf_path)
+    await asyncio.to_thread(_store_cached, _parse_cache, key, parsed_doc)
+    return parsed_doc
+
+
+def _normalize_policy_text(raw_text: str, max_chars: Optional[int] = MAX_POLICY_TEXT_CHARS) -> str:
     """HTML/잡음 제거 및 길이 제한."""
     text = raw_text
     if "<" in text and ">" in text:
         text = re.sub(r"<[^>]+>", " ", text)
     text = re.sub(r"\s+", " ", text).strip()
-    return text[:MAX_POLICY_TEXT_CHARS]
+    return text[:max_chars] if max_chars else text
 
 
-def _get_structured_profile(profile: str) -> str:
-    """
-    프로필 문자열을 구조화하여 반환. Plan/질문필터에 전달.
-    실패 시 원본 profile 반환.
-    """
+def _structured_profile_from_output(profile: str, output: str) -> str:
+    """프로필 파싱 Solar 출력을 구조화 문자열로 변환. 실패 시 원본 profile 반환."""
     try:
-        prompt = build_profile_parse_prompt(profile=profile)
-        output = call_solar(prompt, reasoning_effort=None)
         parsed = None
         try:
             parsed = json.loads(output)
@@ -146,27 +345,55 @@ def _get_structured_profile(profile: str) -> str:
     return profile.strip()
 
 
-def _filter_questions_llm(profile: str, questions: Any) -> list:
-    """LLM 기반 질문 필터링: 프로필에 이미 답이 있는 질문은 제외."""
-    raw = list(questions or [])
-    if not raw:
-        return []
+def _rule_structured_profile(profile: str) -> Optional[str]:
+    """규칙 기반 파싱 (흔한 슬래시 형식). 인식 못 한 토큰이 있으면 None."""
+    parsed = parse_profile_rules(profile)
+    return format_profile_structured(parsed) if parsed else None
+
 
-    # 질문이 dict 리스트인지 확인
+@traced_stage("profile_parse")
+def _get_structured_profile(profile: str) -> str:
+    """
+    프로필 문자열을 구조화하여 반환. Plan/질문필터에 전달.
+    규칙 파서로 처리 가능하면 LLM 호출 없이 반환하고, 실패 시 원본 profile 반환.
+    """
+    structured = _rule_structured_profile(profile)
+    if structured:
+        return structured
+    try:
+        output = call_solar(build_profile_parse_prompt(profile=profile), reasoning_effort=None)
+    except Exception:
+        return profile.strip()
+    return _structured_profile_from_output(profile, output)
+
+
+@traced_stage("profile_parse")
+async def _aget_structured_profile(profile: str) -> str:
+    """_get_structured_profile의 비동기 버전."""
+    structured = _rule_structured_profile(profile)
+    if structured:
+        return structured
+    try:
+        output = await acall_solar(build_profile_parse_prompt(profile=profile), reasoning_effort=None)
+    except Exception:
+        return profile.strip()
+    return _structured_profile_from_output(profile, output)
+
+
+def _normalize_questions(questions: Any) -> list:
+    """질문 목록을 {"field", "question"} dict 리스트로 정규화."""
     normalized = []
-    for item in raw:
+    for item in list(questions or []):
         if isinstance(item, dict) and (item.get("question") or item.get("field")):
             normalized.append(item)
         elif isinstance(item, str) and item.strip():
             normalized.append({"field": None, "question": item.strip()})
+    return normalized
 
-    if not normalized:
-        return []
 
+def _filtered_questions_from_output(output: str, normalized: list) -> list:
+    """질문 필터 Solar 출력(JSON 배열) 파싱. 실패 시 원본 질문 유지."""
     try:
-        prompt = build_question_filter_prompt(profile=profile, questions=normalized)
-        output = call_solar(prompt, reasoning_effort=None)
-
         # JSON 배열 파싱 (앞뒤 설명 제거)
         parsed = None
         try:
@@ -188,6 +415,106 @@ def _filter_questions_llm(profile: str, questions: Any) -> list:
     return normalized
 
 
+@traced_stage("question_filter")
+def _filter_questions_llm(profile: str, questions: Any) -> list:
+    """LLM 기반 질문 필터링: 프로필에 이미 답이 있는 질문은 제외."""
+    normalized = _normalize_questions(questions)
+    if not normalized:
+        return []
+
+    try:
+        prompt = build_question_filter_prompt(profile=profile, questions=normalized)
+        output = call_solar(prompt, reasoning_effort=None)
+    except Exception:
+        return normalized
+    return _filtered_questions_from_output(output, normalized)
+
+
+@traced_stage("question_filter")
+async def _afilter_questions_llm(profile: str, questions: Any) -> list:
+    """_filter_questions_llm의 비동기 버전."""
+    normalized = _normalize_questions(questions)
+    if not normalized:
+        return []
+
+    try:
+        prompt = build_question_filter_prompt(profile=profile, questions=normalized)
+        output = await acall_solar(prompt, reasoning_effort=None)
+    except Exception:
+        return normalized
+    return _filtered_questions_from_output(output, normalized)
+
+
+# 로컬 질문 필터: 프로필 항목 → 같은 뜻의 질문 field 이름 (접미사 "여부/유무/상태" 등을 뗀 뒤 정확히 일치할 때만)
+_PROFILE_FIELD_ALIASES = {
+    "나이": ("나이", "연령", "만나이", "출생연도"),
+    "지역": ("지역", "거주지", "거주지역", "주소", "주소지"),
+    "직업": ("직업", "고용형태", "재직", "취업", "근로형태", "직장"),
+    "월소득": ("소득", "월소득", "월평균소득", "급여", "월급"),
+    "연소득": ("소득", "연소득", "연봉", "연간소득"),
+    "혼인상태": ("혼인", "결혼", "혼인상태"),
+    "주거": ("주거", "주거형태", "주택소유", "주택보유", "무주택", "거주형태"),
+    "자녀": ("자녀", "자녀수", "자녀유무"),
+}
+_FIELD_SUFFIX_RE = re.compile(r"(여부|유무|상태|정보|구분|수준|금액)$")
+
+
+def _field_key(field_name: str) -> str:
+    return _FIELD_SUFFIX_RE.sub("", re.sub(r"\s+", "", field_name)) or field_name
+
+
+def _answered_by_profile(field_name: str, known: Dict[str, str]) -> bool:
+    key = _field_key(field_name)
+    return any(key == _field_key(name) or key in _PROFILE_FIELD_ALIASES.get(name, ()) for name in known)
+
+
+def _local_filter_questions(profile: str, questions: Any) -> Optional[list]:
+    """로컬 질문 필터: field 이름이 프로필에 이미 있는 항목이면 제외.
+
+    프로필을 규칙으로 파싱할 수 없거나 field가 없는 질문이 있으면 판단하지 않고 None (LLM 필터로 대체).
+    """
+    normalized = _normalize_questions(questions)
+    if not normalized:
+        return []
+    known = parse_profile_rules(profile)
+    if known is None or any(not item.get("field") for item in normalized):
+        return None
+    kept = [item for item in normalized if not _answered_by_profile(str(item["field"]), known)]
+    if len(kept) < len(normalized):
+        dropped = [str(item["field"]) for item in normalized if item not in kept]
+        logger.info("프로필에 이미 있는 항목이라 질문 %d개 제외: %s", len(dropped), ", ".join(dropped))
+    return kept
+
+
+def _known_fields(profile: str) -> Optional[str]:
+    """Plan 프롬프트에 전달할 '프로필에 이미 있는 항목' (PLAN_FILTERS_QUESTIONS일 때만)."""
+    if not PLAN_FILTERS_QUESTIONS:
+        return None
+    known = parse_profile_rules(profile)
+    return ", ".join(known) if known else None
+
+
+def _plan_questions(profile: str, plan_result: Dict[str, Any]) -> list:
+    """Plan 질문 → 사용자에게 물을 질문. PLAN_FILTERS_QUESTIONS면 Plan이 이미 거른 목록을 로컬로 한 번 더 거르고,
+    로컬로 판단할 수 없을 때만 질문 필터 Solar 호출."""
+    questions = plan_result.get("questions", [])
+    if PLAN_FILTERS_QUESTIONS:
+        filtered = _local_filter_questions(profile, questions)
+        if filtered is not None:
+            return filtered
+    return _filter_questions_llm(profile, questions)
+
+
+async def _aplan_questions(profile: str, plan_result: Dict[str, Any]) -> list:
+    """_plan_questions의 비동기 버전."""
+    questions = plan_result.get("questions", [])
+    if PLAN_FILTERS_QUESTIONS:
+        filtered = _local_filter_questions(profile, questions)
+        if filtered is not None:
+            return filtered
+    return await _afilter_questions_llm(profile, questions)
+
+
 def _parse_plan_json(raw_text: str) -> Optional[Dict[str, Any]]:
     """Solar Plan 출력에서 JSON을 추출.
 
@@ -221,13 +548,100 @@ def _parse_plan_json(raw_text: str) -> Optional[Dict[str, Any]]:
         return None
 
 
-def _plan_phase(profile: str, policy_text: str, ie_extract: Optional[str]) -> Dict[str, Any]:
-    """Solar Plan 단계: 조건 분석 및 질문 생성."""
-    plan_text = (
-        policy_text[:PLAN_MAX_POLICY_CHARS] if PLAN_MAX_POLICY_CHARS else policy_text
+def _record_prompt_budget(prompt: str, budget: PromptBudget, baseline_prompt: Callable[[], str]) -> None:
+    """예산 적용 전 프롬프트(baseline)와 비교한 절약 토큰을 trace에 기록 (계측 중일 때만 baseline 생성)."""
+    if tracer.enabled:
+        prompt_tokens = estimate_tokens(prompt)
+        saved = max(0, estimate_tokens(baseline_prompt()) - prompt_tokens)
+        record_prompt_savings(prompt_tokens, saved, budget.sections)
+
+
+def _warn_policy_trimmed(stage: str, total_chars: int, cap_chars: int, max_tokens: int) -> None:
+    """예산 때문에 정책 본문이 예산 미적용 시(cap_chars)보다 짧아지면 경고 (조용히 잘리지 않도록)."""
+    if total_chars < cap_chars:
+        logger.warning(
+            "%s 프롬프트 예산(%d토큰)에 맞추느라 정책 본문을 %d자 중 %d자만 넣었습니다. "
+            "관련 조건이 빠질 수 있으니 예산을 늘리거나 PROMPT_BUDGET_ENABLED=0으로 끄세요.",
+            stage, max_tokens, cap_chars, total_chars,
+        )
+
+
+def _stable_policy_block(policy: PolicyIndex, budget_chars: int) -> Tuple[str, List[int]]:
+    """프로필과 무관한 질의로 고른 고정 정책 블록과 그 청크 id (같은 정책·같은 예산이면 같은 바이트)."""
+    if not policy.chunks:
+        return policy.text[:budget_chars], []
+    chunks = policy.select_chunks(ELIGIBILITY_QUERY_TERMS, budget_chars)
+    return format_chunks(chunks), [chunk["id"] for chunk in chunks]
+
+
+def _policy_excerpts(policy: PolicyIndex, query: str, budget_chars: int, exclude: List[int]) -> Optional[str]:
+    """고정 블록에 없는 청크 중 사용자별 질의와 관련된 추가 본문 (없으면 None)."""
+    chunks = policy.select_chunks(query, budget_chars, exclude)
+    return format_chunks(chunks) if chunks else None
+
+
+def _plan_context_chars(policy: PolicyIndex) -> int:
+    cap = PLAN_CONTEXT_CHARS_WITH_CONDITIONS if policy.conditions else PLAN_CONTEXT_CHARS
+    return min(cap, PLAN_MAX_POLICY_CHARS) if PLAN_MAX_POLICY_CHARS else cap
+
+
+def _plan_prompt_full(profile: str, policy: PolicyIndex, ie_extract: Optional[str]) -> str:
+    cap = _plan_context_chars(policy)
+    policy_text, used_ids = _stable_policy_block(policy, int(cap * STABLE_POLICY_SHARE))
+    excerpts = _policy_excerpts(policy, f"{profile} {ELIGIBILITY_QUERY_TERMS}", cap - len(policy_text), used_ids)
+    conditions = json.dumps(policy.conditions, ensure_ascii=False) if policy.conditions else None
+    return build_plan_prompt(
+        profile=profile,
+        policy_text=policy_text,
+        ie_extract=ie_extract,
+        policy_conditions=conditions,
+        policy_excerpts=excerpts,
+        known_fields=_known_fields(profile),
     )
-    prompt = build_plan_prompt(profile=profile, policy_text=plan_text, ie_extract=ie_extract)
-    output = call_solar(prompt, reasoning_effort="medium", max_tokens=8192)
+
+
+def _plan_prompt(profile: str, policy: PolicyIndex, ie_extract: Optional[str]) -> str:
+    """Plan 프롬프트. PROMPT_BUDGET_ENABLED면 PLAN_PROMPT_TOKENS 안에서 본문 길이를 정하고 중복 IE 필드 제거.
+
+    고정 블록(본문·조건·IE)의 길이는 사용자 섹션 몫을 미리 떼어 둔 예산으로 정하므로 프로필과 무관하다.
+    """
+    if not PROMPT_BUDGET_ENABLED:
+        return _plan_prompt_full(profile, policy, ie_extract)
+    cap = _plan_context_chars(policy)
+    conditions = json.dumps(policy.conditions, ensure_ascii=False) if policy.conditions else None
+
+    budget = PromptBudget(PLAN_PROMPT_TOKENS)
+    budget.add("template", build_plan_prompt(profile="", policy_text="", ie_extract=None))
+    budget.add("conditions", conditions)
+    budget.add("ie", ie_extract)
+    budget.reserve("user", PLAN_USER_RESERVE_TOKENS)
+    total_chars = budget.policy_chars(cap, MIN_PROMPT_POLICY_CHARS)
+    _warn_policy_trimmed("Plan", total_chars, cap, PLAN_PROMPT_TOKENS)
+    policy_text, used_ids = _stable_policy_block(policy, int(total_chars * STABLE_POLICY_SHARE))
+    budget.add("policy", policy_text)
+    ie_compact = budget.add("ie", compact_ie_extract(ie_extract, policy_text))
+    budget.release("user")
+    budget.add("profile", profile)
+    known_fields = budget.add("known_fields", _known_fields(profile))
+    excerpts = budget.add("excerpts", _policy_excerpts(
+        policy,
+        f"{profile} {ELIGIBILITY_QUERY_TERMS}",
+        min(total_chars - len(policy_text), budget.policy_chars(cap, 0)),
+        used_ids,
+    ))
+    prompt = build_plan_prompt(
+        profile=profile,
+        policy_text=policy_text,
+        ie_extract=ie_compact,
+        policy_conditions=conditions,
+        policy_excerpts=excerpts,
+        known_fields=known_fields,
+    )
+    _record_prompt_budget(prompt, budget, lambda: _plan_prompt_full(profile, policy, ie_extract))
+    return prompt
+
+
+def _plan_from_output(output: str) -> Dict[str, Any]:
     parsed = _parse_plan_json(output)
     
     if parsed:
@@ -241,19 +655,166 @@ def _plan_phase(profile: str, policy_text: str, ie_extract: Optional[str]) -> Di
     }
 
 
-def _safe_information_extract(pdf_path: str) -> Optional[str]:
-    """Information Extraction 결과를 안전하게 반환. PDF 파일 경로를 넘긴다."""
-    try:
-        result = call_information_extract(document_path=pdf_path, schema=IE_SCHEMA)
-    except Exception:
+@traced_stage("plan")
+def _plan_phase(profile: str, policy: PolicyIndex, ie_extract: Optional[str]) -> Dict[str, Any]:
+    """Solar Plan 단계: 조건 분석 및 질문 생성."""
+    prompt = _plan_prompt(profile, policy, ie_extract)
+    output = call_solar(prompt, reasoning_effort="medium", max_tokens=8192)
+    return _plan_from_output(output)
+
+
+@traced_stage("plan")
+async def _aplan_phase(profile: str, policy: PolicyIndex, ie_extract: Optional[str]) -> Dict[str, Any]:
+    """_plan_phase의 비동기 버전."""
+    prompt = _plan_prompt(profile, policy, ie_extract)
+    output = await acall_solar(prompt, reasoning_effort="medium", max_tokens=8192)
+    return _plan_from_output(output)
+
+
+def _replan_prompt(
+    profile: str,
+    policy: PolicyIndex,
+    previous_plan: Dict[str, Any],
+    answered_fields: Dict[str, str],
+) -> str:
+    query_parts = [str(item) for item in previous_plan.get("uncertain_conditions") or []]
+    query_parts.extend(f"{field} {value}" for field, value in answered_fields.items())
+    policy_text, used_ids = _stable_policy_block(policy, int(REPLAN_CONTEXT_CHARS * STABLE_POLICY_SHARE))
+    excerpts = _policy_excerpts(
+        policy, " ".join(query_parts) or profile, REPLAN_CONTEXT_CHARS - len(policy_text), used_ids
+    )
+    return build_replan_prompt(
+        profile=profile,
+        previous_plan=json.dumps(previous_plan, ensure_ascii=False),
+        answered_fields=json.dumps(answered_fields, ensure_ascii=False),
+        policy_text=policy_text,
+        policy_excerpts=excerpts,
+    )
+
+
+def _replan_item_key(item: Any) -> str:
+    """재분석 항목의 중복 판단 키 (질문은 field, field가 없으면 질문 문장)."""
+    if isinstance(item, dict):
+        return str(item.get("field") or item.get("question") or "").strip()
+    return str(item).strip()
+
+
+def _merge_replan_output(
+    previous_plan: Dict[str, Any], output: str, answered_fields: Optional[Dict[str, str]] = None
+) -> Optional[Dict[str, Any]]:
+    """증분 재분석 출력을 1차 Plan에 덮어씀. 파싱 실패 시 None (전체 재분석으로 대체).
+
+    출력에 없거나 목록이 아닌 키는 1차 Plan 값을 그대로 유지하고, 목록은 중복 항목을 제거한다.
+    질문은 같은 field를 한 번만 남기고 이미 답한 field에 대한 질문은 뺀다.
+    """
+    parsed = _parse_plan_json(output)
+    if not parsed:
         return None
+    answered = set(answered_fields or {})
+    merged = dict(previous_plan)
+    for key in ("certain_conditions", "uncertain_conditions", "questions", "action_candidates"):
+        items = parsed.get(key)
+        if not isinstance(items, list):
+            continue
+        seen = set(answered) if key == "questions" else set()
+        kept = []
+        for item in items:
+            item_key = _replan_item_key(item)
+            if item_key and item_key not in seen:
+                seen.add(item_key)
+                kept.append(item)
+        merged[key] = kept
+    return merged
+
+
+@traced_stage("replan")
+def _replan_phase(
+    profile: str,
+    policy: PolicyIndex,
+    ie_extract: Optional[str],
+    previous_plan: Dict[str, Any],
+    answered_fields: Dict[str, str],
+) -> Dict[str, Any]:
+    """답변 반영 재분석. INCREMENTAL_REPLAN이면 1차 Plan을 갱신하고, 아니면/실패 시 전체 Plan."""
+    if INCREMENTAL_REPLAN and answered_fields:
+        prompt = _replan_prompt(profile, policy, previous_plan, answered_fields)
+        output = call_solar(prompt, reasoning_effort="medium", max_tokens=8192)
+        merged = _merge_replan_output(previous_plan, output, answered_fields)
+        if merged is not None:
+            return merged
+    return _plan_phase(profile=profile, policy=policy, ie_extract=ie_extract)
+
+
+@traced_stage("replan")
+async def _areplan_phase(
+    profile: str,
+    policy: PolicyIndex,
+    ie_extract: Optional[str],
+    previous_plan: Dict[str, Any],
+    answered_fields: Dict[str, str],
+) -> Dict[str, Any]:
+    """_replan_phase의 비동기 버전."""
+    if INCREMENTAL_REPLAN and answered_fields:
+        prompt = _replan_prompt(profile, policy, previous_plan, answered_fields)
+        output = await acall_solar(prompt, reasoning_effort="medium", max_tokens=8192)
+        merged = _merge_replan_output(previous_plan, output, answered_fields)
+        if merged is not None:
+            return merged
+    return await _aplan_phase(profile=profile, policy=policy, ie_extract=ie_extract)
+
+
+def _ie_cache_lookup(pdf_path: str, doc_hash: Optional[str] = None) -> Tuple[Optional[str], Any]:
+    """IE 캐시 조회. (캐시 키, 적중 결과 또는 None) 반환."""
+    if _ie_cache is None:
+        return None, None
+    doc_hash = doc_hash or _document_hash(pdf_path)
+    if doc_hash is None:
+        return None, None
+    try:
+        key = make_key(doc_hash, IE_SCHEMA)
+        return key, _ie_cache.get(key)
+    except OSError:
+        return None, None
 
+
+def _dump_ie_result(result: Any) -> Optional[str]:
     try:
         return json.dumps(result, ensure_ascii=False)
     except (TypeError, ValueError):
         return None
 
 
+@traced_stage("ie")
+def _safe_information_extract(pdf_path: str, doc_hash: Optional[str] = None) -> Optional[str]:
+    """Information Extraction 결과를 안전하게 반환. PDF 파일 경로를 넘긴다.
+
+    결과는 문서 해시(doc_hash, 없으면 계산) + IE_SCHEMA 지문으로 캐시되며, 스키마가 바뀌면 키가 달라져 자동 무효화된다.
+    """
+    key, result = _ie_cache_lookup(pdf_path, doc_hash)
+    if result is None:
+        try:
+            result = call_information_extract(document_path=pdf_path, schema=IE_SCHEMA)
+        except Exception:
+            return None
+        if result:
+            _store_cached(_ie_cache, key, result)
+    return _dump_ie_result(result)
+
+
+@traced_stage("ie")
+async def _asafe_information_extract(pdf_path: str, doc_hash: Optional[str] = None) -> Optional[str]:
+    """_safe_information_extract의 비동기 버전."""
+    key, result = await asyncio.to_thread(_ie_cache_lookup, pdf_path, doc_hash)
+    if result is None:
+        try:
+            result = await acall_information_extract(document_path=pdf_path, schema=IE_SCHEMA)
+        except Exception:
+            return None
+        if result:
+            await asyncio.to_thread(_store_cached, _ie_cache, key, result)
+    return _dump_ie_result(result)
+
+
 def _append_profile_field(profile: str, field_name: str, value: str) -> str:
     """프로필에 새 필드 추가."""
     updated_profile = profile.strip()
@@ -264,24 +825,10 @@ def _append_profile_field(profile: str, field_name: str, value: str) -> str:
     return f"{field_name}: {value}"
 
 
-def _update_profile_from_message_llm(
-    profile: str,
-    user_message: str,
-    question_text: str = "",
-    field_name: Optional[str] = None,
-) -> str:
-    """LLM 기반: 질문 맥락 + 사용자 답변으로 프로필 정보 추출 및 병합."""
-    if not user_message or not user_message.strip():
-        return profile.strip()
-
+def _profile_fields_from_output(output: str, user_message: str, field_name: Optional[str]) -> List[Tuple[str, str]]:
+    """프로필 추출 Solar 출력 → [(필드명, 값)]. 추출 실패 시 필드명으로 원문 답변 기록."""
+    fallback = [(field_name, user_message.strip())] if field_name else []
     try:
-        prompt = build_profile_extract_prompt(
-            user_message=user_message.strip(),
-            question_text=question_text or "",
-            field_name=field_name or "",
-        )
-        output = call_solar(prompt, reasoning_effort=None)
-
         parsed = None
         try:
             parsed = json.loads(output)
@@ -291,68 +838,625 @@ def _update_profile_from_message_llm(
             if start != -1 and end != -1 and end > start:
                 parsed = json.loads(output[start : end + 1])
 
-        updated = profile.strip()
         if isinstance(parsed, dict) and parsed:
-            for fn, value in parsed.items():
-                if fn and value and isinstance(value, str):
-                    updated = _append_profile_field(updated, fn, value.strip())
-        else:
-            if field_name:
-                updated = _append_profile_field(updated, field_name, user_message.strip())
-        return updated
+            return [
+                (fn, value.strip())
+                for fn, value in parsed.items()
+                if fn and value and isinstance(value, str)
+            ]
+        return fallback
     except Exception:
-        if field_name:
-            return _append_profile_field(profile.strip(), field_name, user_message.strip())
-        return profile.strip()
+        return fallback
 
 
-def run(profile: str, pdf_path: Optional[str] = None) -> str:
-    """정책 에이전트 실행 (항상 대화형).
+def _apply_profile_fields(profile: str, fields: List[Tuple[str, str]]) -> str:
+    """추출된 필드를 순서대로 프로필에 병합."""
+    updated = profile.strip()
+    for fn, value in fields:
+        updated = _append_profile_field(updated, fn, value)
+    return updated
 
-    Args:
-        profile: 사용자 프로필 문자열
-        pdf_path: 정책 PDF 경로 (없으면 기본 PDF 사용)
 
-    Returns:
-        최종 상담 결과 문자열
-    """
-    # PDF 경로 설정 (기본값: finance_policy.pdf)
+@traced_stage("answer_extract")
+def _extract_profile_fields(
+    user_message: str,
+    question_text: str = "",
+    field_name: Optional[str] = None,
+) -> List[Tuple[str, str]]:
+    """LLM 기반: 질문 맥락 + 사용자 답변에서 프로필 필드 추출 (프로필과 독립 → 백그라운드 실행 가능)."""
+    if not user_message or not user_message.strip():
+        return []
+
+    prompt = build_profile_extract_prompt(
+        user_message=user_message.strip(),
+        question_text=question_text or "",
+        field_name=field_name or "",
+    )
+    try:
+        output = call_solar(prompt, reasoning_effort=None)
+    except Exception:
+        output = ""
+    return _profile_fields_from_output(output, user_message, field_name)
+
+
+@traced_stage("answer_extract")
+async def _aextract_profile_fields(
+    user_message: str,
+    question_text: str = "",
+    field_name: Optional[str] = None,
+) -> List[Tuple[str, str]]:
+    """_extract_profile_fields의 비동기 버전."""
+    if not user_message or not user_message.strip():
+        return []
+
+    prompt = build_profile_extract_prompt(
+        user_message=user_message.strip(),
+        question_text=question_text or "",
+        field_name=field_name or "",
+    )
+    try:
+        output = await acall_solar(prompt, reasoning_effort=None)
+    except Exception:
+        output = ""
+    return _profile_fields_from_output(output, user_message, field_name)
+
+
+def _resolve_pdf_path(pdf_path: Optional[str]) -> str:
+    """PDF 경로 확인 (없으면 기본 PDF). 파일이 없으면 FileNotFoundError."""
     actual_pdf_path = pdf_path or DEFAULT_PDF_PATH
-    
     if not os.path.exists(actual_pdf_path):
         raise FileNotFoundError(f"PDF 파일을 찾을 수 없습니다: {actual_pdf_path}")
+    return actual_pdf_path
 
-    print(f"\n📄 PDF 파싱 및 정보 추출 중 : {actual_pdf_path}")
+
+def load_policy(pdf_path: str) -> Tuple[PolicyIndex, Optional[str]]:
+    """Document Parse + Information Extraction을 병렬 실행하여 (정책 인덱스, ie_extract) 반환."""
+    doc_hash = _document_hash(pdf_path)  # 두 캐시 키에 공통으로 사용
     with ThreadPoolExecutor(max_workers=2) as executor:
-        future_parse = executor.submit(call_document_parse, actual_pdf_path)
-        future_ie = executor.submit(_safe_information_extract, actual_pdf_path)
+        # 워커 스레드에서도 같은 trace로 기록되도록 컨텍스트를 복사해 실행
+        future_parse = executor.submit(contextvars.copy_context().run, _load_parsed_doc, pdf_path, doc_hash)
+        future_ie = executor.submit(contextvars.copy_context().run, _safe_information_extract, pdf_path, doc_hash)
         parsed_doc = future_parse.result()
         ie_extract = future_ie.result()
-    policy_text = _policy_text_from_parsed_doc(parsed_doc)
-    print("✅ PDF 파싱 완료\n")
-
-    profile_for_prompts = _get_structured_profile(profile)
-
-    # Plan 단계 (1차 분석: 조건 판단·질문 생성)
-    print("🔍 Plan (1차 분석): 조건 판단·질문 생성 중...")
-    plan_result = _plan_phase(profile=profile_for_prompts, policy_text=policy_text, ie_extract=ie_extract)
-    c, u, q, a = (
-        plan_result.get("certain_conditions", []),
-        plan_result.get("uncertain_conditions", []),
-        plan_result.get("questions", []),
-        plan_result.get("action_candidates", []),
+    return _build_policy_index(parsed_doc), ie_extract
+
+
+async def aload_policy(pdf_path: str) -> Tuple[PolicyIndex, Optional[str]]:
+    """load_policy의 비동기 버전 (Parse/IE를 같은 이벤트 루프에서 동시 실행)."""
+    doc_hash = await asyncio.to_thread(_document_hash, pdf_path)
+    parsed_doc, ie_extract = await asyncio.gather(
+        _aload_parsed_doc(pdf_path, doc_hash),
+        _asafe_information_extract(pdf_path, doc_hash),
+    )
+    return _build_policy_index(parsed_doc), ie_extract
+
+
+def _conditions_prompt(policy: PolicyIndex, ie_extract: Optional[str]) -> str:
+    policy_text = policy.select_text(ELIGIBILITY_QUERY_TERMS, CONDITIONS_CONTEXT_CHARS)
+    return build_policy_conditions_prompt(policy_text=policy_text, ie_extract=ie_extract)
+
+
+def _conditions_from_output(output: str) -> List[Dict[str, Any]]:
+    """자격 조건 Solar 출력 → [{"id", "category", "condition", "field", "section", "group"}]. 파싱 실패 시 []."""
+    parsed = _parse_plan_json(output)
+    items = parsed.get("conditions") if parsed else None
+    conditions = []
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict) or not str(item.get("condition") or "").strip():
+            continue
+        conditions.append({
+            "id": f"C{len(conditions) + 1}",
+            "category": str(item.get("category") or "기타").strip(),
+            "condition": str(item["condition"]).strip(),
+            "field": str(item.get("field") or "").strip(),
+            "section": str(item.get("section") or "").strip(),
+            "group": str(item.get("group") or "").strip(),
+        })
+    return conditions
+
+
+@traced_stage("conditions")
+def _extract_policy_conditions(policy: PolicyIndex, ie_extract: Optional[str]) -> List[Dict[str, Any]]:
+    """Solar로 정책의 자격 조건 목록 추출 (프로필과 무관, 정책 팩 생성 시 1회)."""
+    output = call_solar(_conditions_prompt(policy, ie_extract), reasoning_effort="medium", max_tokens=8192)
+    return _conditions_from_output(output)
+
+
+@traced_stage("compile")
+def _compile_predicates(conditions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Solar 1회 호출로 자격 조건 → 로컬 평가용 조건식 (기준이 분명한 조건만). 실패 시 []."""
+    if not conditions:
+        return []
+    prompt = build_predicate_compile_prompt(conditions=json.dumps(conditions, ensure_ascii=False))
+    try:
+        output = call_solar(prompt, temperature=0.0, reasoning_effort="medium", max_tokens=8192)
+    except Exception:
+        return []
+    parsed = _parse_plan_json(output)
+    return predicates_from_output(parsed.get("predicates") if parsed else None, conditions)
+
+
+def ingest_policy(pdf_path: Optional[str] = None) -> Dict[str, Any]:
+    """정책 PDF를 한 번 처리하여 정책 팩(dict) 생성: 파싱 + IE → 청크 → 자격 조건 목록 → 조건식.
+
+    저장은 policy_pack.save_pack, 세션에서는 run(pack_path=...)로 사용.
+    """
+    actual_pdf_path = _resolve_pdf_path(pdf_path)
+    start_trace()
+    policy, ie_extract = load_policy(actual_pdf_path)
+    conditions = _extract_policy_conditions(policy, ie_extract)
+    predicates = _compile_predicates(conditions)
+    return build_pack(
+        actual_pdf_path, policy, ie_extract, conditions, predicates,
+        parse_params=DOCUMENT_PARSE_PARAMS, ie_schema=IE_SCHEMA,
+    )
+
+
+def load_policy_pack(pack_path: str) -> Tuple[PolicyIndex, Optional[str]]:
+    """정책 팩 파일 → (정책 인덱스, ie_extract). API 호출 없이 파일만 읽음."""
+    return pack_policy(load_pack(pack_path))
+
+
+def _final_query(profile: str, plan_result: Dict[str, Any], answered_fields: Dict[str, str]) -> str:
+    """Final 단계 검색 질의: 프로필 + Plan의 조건/행동 후보 + 추가 답변."""
+    parts = [profile]
+    for key in ("certain_conditions", "uncertain_conditions", "action_candidates"):
+        parts.extend(str(item) for item in plan_result.get(key) or [])
+    parts.extend(f"{field} {value}" for field, value in answered_fields.items())
+    return " ".join(parts)
+
+
+def _final_focus_query(plan_result: Dict[str, Any], answered_fields: Dict[str, str]) -> str:
+    """예산 적용 시 Final 검색 질의: 아직 불확실한 조건 + 행동 후보 + 추가 답변 (확정된 조건은 Plan 요약으로 충분)."""
+    parts = []
+    for key in ("uncertain_conditions", "action_candidates"):
+        parts.extend(str(item) for item in plan_result.get(key) or [])
+    parts.extend(f"{field} {value}" for field, value in answered_fields.items())
+    return " ".join(parts)
+
+
+def _final_prompt_full(
+    profile: str,
+    policy: PolicyIndex,
+    plan_result: Dict[str, Any],
+    answered_fields: Dict[str, str],
+    ie_extract: Optional[str],
+) -> str:
+    plan_json = json.dumps(plan_result, ensure_ascii=False)
+    answered_json = json.dumps(answered_fields, ensure_ascii=False) if answered_fields else None
+    policy_text, used_ids = _stable_policy_block(policy, int(FINAL_CONTEXT_CHARS * STABLE_POLICY_SHARE))
+    excerpts = _policy_excerpts(
+        policy,
+        _final_query(profile, plan_result, answered_fields),
+        FINAL_CONTEXT_CHARS - len(policy_text),
+        used_ids,
+    )
+    return build_solar_prompt(
+        profile=profile,
+        policy_text=policy_text,
+        agent_plan=plan_json,
+        answered_fields=answered_json,
+        ie_extract=ie_extract,
+        policy_excerpts=excerpts,
+    )
+
+
+def _final_prompt(
+    profile: str,
+    policy: PolicyIndex,
+    plan_result: Dict[str, Any],
+    answered_fields: Dict[str, str],
+    ie_extract: Optional[str],
+) -> str:
+    """Final 프롬프트. PROMPT_BUDGET_ENABLED면 Plan은 조건·행동 후보만, 추가 본문은 불확실 조건 관련 섹션 위주로
+    FINAL_PROMPT_TOKENS 안에서 구성하고 본문과 중복되는 IE 필드 제거."""
+    if not PROMPT_BUDGET_ENABLED:
+        return _final_prompt_full(profile, policy, plan_result, answered_fields, ie_extract)
+    answered_json = json.dumps(answered_fields, ensure_ascii=False) if answered_fields else None
+
+    budget = PromptBudget(FINAL_PROMPT_TOKENS)
+    budget.add("template", build_solar_prompt(profile="", policy_text="", agent_plan="", answered_fields=None, ie_extract=None))
+    budget.add("ie", ie_extract)
+    budget.reserve("user", FINAL_USER_RESERVE_TOKENS)
+    total_chars = budget.policy_chars(FINAL_CONTEXT_CHARS, MIN_PROMPT_POLICY_CHARS)
+    _warn_policy_trimmed("Final", total_chars, FINAL_CONTEXT_CHARS, FINAL_PROMPT_TOKENS)
+    policy_text, used_ids = _stable_policy_block(policy, int(total_chars * STABLE_POLICY_SHARE))
+    budget.add("policy", policy_text)
+    ie_compact = budget.add("ie", compact_ie_extract(ie_extract, policy_text))
+    budget.release("user")
+    budget.add("profile", profile)
+    budget.add("answered", answered_json)
+    plan_json = budget.add("plan", compact_plan(plan_result))
+    query = _final_focus_query(plan_result, answered_fields) or _final_query(profile, plan_result, answered_fields)
+    excerpts = budget.add("excerpts", _policy_excerpts(
+        policy,
+        query,
+        min(total_chars - len(policy_text), budget.policy_chars(FINAL_CONTEXT_CHARS, 0)),
+        used_ids,
+    ))
+    prompt = build_solar_prompt(
+        profile=profile,
+        policy_text=policy_text,
+        agent_plan=plan_json,
+        answered_fields=answered_json,
+        ie_extract=ie_compact,
+        policy_excerpts=excerpts,
     )
-    print("✅ 분석 완료\n")
+    _record_prompt_budget(
+        prompt, budget, lambda: _final_prompt_full(profile, policy, plan_result, answered_fields, ie_extract)
+    )
+    return prompt
+
+
+@traced_stage("final")
+def _final_phase(
+    profile: str,
+    policy: PolicyIndex,
+    plan_result: Dict[str, Any],
+    answered_fields: Dict[str, str],
+    ie_extract: Optional[str],
+    on_token: Optional[Callable[[str], None]] = None,
+) -> str:
+    """Solar Final 단계: 최종 상담 결과 생성 (필수 헤더 보정 포함).
+
+    on_token 지정 시 스트리밍: 굵은글씨를 제거한 토큰을 즉시 전달하고,
+    응답 완료 후 누락된 필수 헤더 섹션을 이어서 전달한다.
+    """
+    prompt = _final_prompt(profile, policy, plan_result, answered_fields, ie_extract)
+    if on_token is None:
+        output = call_solar(prompt, reasoning_effort="medium")
+        return _ensure_required_headers(_clean_terminal_output(output))
+
+    cleaner = _StreamCleaner(on_token)
+    output = call_solar(prompt, reasoning_effort="medium", on_token=cleaner.feed)
+    cleaner.close()
+    cleaned = _clean_terminal_output(output)
+    result = _ensure_required_headers(cleaned)
+    if result.startswith(cleaned) and len(result) > len(cleaned):
+        on_token(result[len(cleaned):])
+    return result
+
+
+@traced_stage("final")
+async def _afinal_phase(
+    profile: str,
+    policy: PolicyIndex,
+    plan_result: Dict[str, Any],
+    answered_fields: Dict[str, str],
+    ie_extract: Optional[str],
+) -> str:
+    """_final_phase의 비동기 버전."""
+    prompt = _final_prompt(profile, policy, plan_result, answered_fields, ie_extract)
+    output = await acall_solar(prompt, reasoning_effort="medium")
+    return _ensure_required_headers(_clean_terminal_output(output))
+
+
+def _ie_fields(ie_extract: Optional[str]) -> Dict[str, Any]:
+    try:
+        parsed = json.loads(ie_extract) if ie_extract else {}
+    except json.JSONDecodeError:
+        return {}
+    return parsed if isinstance(parsed, dict) else {}
+
+
+def _condition_line(entry: Dict[str, Any]) -> str:
+    value = f" (프로필: {entry['field']} {entry['value']})" if entry["value"] else ""
+    return f"{entry['condition']}{value}"
+
+
+def _prescreen_answer(verdict: Dict[str, Any], ie_extract: Optional[str]) -> str:
+    """규칙 사전 판정 결과 → REQUIRED_HEADERS 5개 섹션 템플릿 답변."""
+    ie = _ie_fields(ie_extract)
+    default_name = str(ie.get("program_name") or "정책")
+    eligible = [s for s in verdict["sections"] if s["eligible"]]
+
+    judgement = []
+    for section in verdict["sections"]:
+        name = section["section"] or default_name
+        if section["eligible"]:
+            reasons = ", ".join(_condition_line(e) for e in section["met"])
+            judgement.append(f"- {name}: 자격 충족 — {reasons}")
+        else:
+            reasons = ", ".join(_condition_line(e) for e in section["failed"])
+            judgement.append(f"- {name}: 자격 미충족 — {reasons}")
+
+    applicable = [f"- {s['section'] or default_name}" for s in eligible] or ["- 현재 프로필로 신청 가능한 정책이 없습니다."]
+    benefits = [f"- {ie['benefit']}"] if eligible and ie.get("benefit") else [
+        "- 정책 문서의 지원 내용을 확인하세요." if eligible else "- 해당 없음"
+    ]
+    if eligible:
+        steps = []
+        if ie.get("required_documents"):
+            steps.append(f"필요 서류 준비: {', '.join(str(d) for d in ie['required_documents'])}")
+        steps.append(str(ie.get("how_to_apply") or "정책 공고문의 신청 방법에 따라 신청"))
+    else:
+        steps = ["자격 요건이 다른 정책이 있는지 검토"]
+    period = " ~ ".join(str(ie[k]) for k in ("application_period_start", "application_period_end") if ie.get(k))
+    checks = ["- 규칙 기반 사전 판정 결과입니다. 소득 산정 기준일 등 세부 요건은 공고문에서 최종 확인하세요."]
+    if period:
+        checks.append(f"- 신청 기간: {period}")
+
+    bodies = [
+        judgement,
+        applicable,
+        benefits,
+        [f"{i}. {step}" for i, step in enumerate(steps, 1)],
+        checks,
+    ]
+    return "\n\n".join(f"{header}\n" + "\n".join(body) for header, body in zip(REQUIRED_HEADERS, bodies))
+
+
+def _prescreen_profile(profile_for_prompts: str, policy: PolicyIndex) -> Optional[Dict[str, Any]]:
+    """정책 팩 조건식으로 로컬 판정. 결론이 분명하지 않거나 조건식이 없으면 None."""
+    if not PRESCREEN_ENABLED or not policy.predicates:
+        return None
+    parsed = parse_profile_rules(profile_for_prompts)
+    return prescreen(parsed, policy.conditions or [], policy.predicates) if parsed else None
+
+
+def _prescreened_result(profile_for_prompts: str, verdict: Dict[str, Any], ie_extract: Optional[str]) -> Dict[str, Any]:
+    return {
+        "structured_profile": profile_for_prompts,
+        "plan": {},
+        "questions": [],
+        "prescreen": verdict,
+        "result": _prescreen_answer(verdict, ie_extract),
+    }
+
+
+def evaluate_profile(
+    profile: str, policy: PolicyIndex, ie_extract: Optional[str], structured: bool = False
+) -> Dict[str, Any]:
+    """비대화형 평가: 프로필 구조화 → Plan → Final. 질문은 묻지 않고 결과에 포함.
+
+    이미 파싱된 policy / ie_extract를 받으므로 여러 프로필이 공유할 수 있다 (배치 모드).
+    structured=True면 profile을 이미 구조화된 프로필로 보고 구조화 단계를 건너뛴다
+    (같은 프로필을 여러 정책과 대조할 때 정책마다 다시 구조화하지 않도록).
+    """
+    start_trace()
+    profile_for_prompts = profile if structured else _get_structured_profile(profile)
+    verdict = _prescreen_profile(profile_for_prompts, policy)
+    if verdict is not None:
+        return _prescreened_result(profile_for_prompts, verdict, ie_extract)
+    plan_result = _plan_phase(profile=profile_for_prompts, policy=policy, ie_extract=ie_extract)
+    result = _final_phase(profile_for_prompts, policy, plan_result, {}, ie_extract)
+    return {
+        "structured_profile": profile_for_prompts,
+        "plan": plan_result,
+        "questions": plan_result.get("questions", []),
+        "result": result,
+    }
+
+
+async def aevaluate_profile(
+    profile: str, policy: PolicyIndex, ie_extract: Optional[str], structured: bool = False
+) -> Dict[str, Any]:
+    """evaluate_profile의 비동기 버전."""
+    start_trace()
+    profile_for_prompts = profile if structured else await _aget_structured_profile(profile)
+    verdict = _prescreen_profile(profile_for_prompts, policy)
+    if verdict is not None:
+        return _prescreened_result(profile_for_prompts, verdict, ie_extract)
+    plan_result = await _aplan_phase(profile=profile_for_prompts, policy=policy, ie_extract=ie_extract)
+    result = await _afinal_phase(profile_for_prompts, policy, plan_result, {}, ie_extract)
+    return {
+        "structured_profile": profile_for_prompts,
+        "plan": plan_result,
+        "questions": plan_result.get("questions", []),
+        "result": result,
+    }
+
+
+_STAGE_START_MESSAGES = {
+    "plan": "\n🔍 Plan (1차 분석): 조건 판단·질문 생성 중...",
+}
+_STAGE_DONE_MESSAGES = {
+    "policy": "✅ PDF 파싱 완료",
+    "pack": "✅ 정책 팩 로드 완료",
+    "plan": "✅ 분석 완료\n",
+}
+
+
+def _print_parse_progress(done: int, total: int, start_page: int, end_page: int) -> None:
+    print(f"   · {start_page}-{end_page}쪽 파싱 완료 ({done}/{total})")
+
+
+def _print_stage_start(name: str) -> None:
+    message = _STAGE_START_MESSAGES.get(name)
+    if message:
+        print(message)
+
+
+def _print_stage_done(name: str, _result: Any) -> None:
+    message = _STAGE_DONE_MESSAGES.get(name)
+    if message:
+        print(message)
+
+
+def _print_prescreened(result: str, stream: bool) -> str:
+    """사전 판정 결과 출력 (run의 Final 단계 출력 형식과 동일)."""
+    print("⚡ 정책 팩 조건식으로 자격이 확정되어 Plan/Final 분석을 생략합니다.\n")
+    print("━" * 50)
+    print("📌 최종 상담 결과")
+    print("━" * 50)
+    if stream:
+        print(result)
+    return result
+
+
+def _ask_input(question_text: str) -> str:
+    return input(f"\n❓ {question_text}\n👉 ")
+
+
+def run(
+    profile: str,
+    pdf_path: Optional[str] = None,
+    stream: bool = False,
+    ask: Optional[Callable[[str], str]] = None,
+    pack_path: Optional[str] = None,
+) -> str:
+    """정책 에이전트 실행 (항상 대화형).
+
+    Args:
+        profile: 사용자 프로필 문자열
+        pdf_path: 정책 PDF 경로 (없으면 기본 PDF 사용)
+        stream: True면 최종 상담 결과를 토큰 단위로 바로 출력 (반환값도 동일한 전체 결과)
+        ask: 질문 문자열을 받아 사용자 답변을 돌려주는 함수 (없으면 터미널 입력)
+        pack_path: 정책 팩 경로 (지정 시 pdf_path 대신 사용, 파싱/IE 생략)
+
+    Returns:
+        최종 상담 결과 문자열
+    """
+    ask = ask or _ask_input
+    start_trace()
+
+    if pack_path:
+        print(f"\n📦 정책 팩 로드 중 : {pack_path}")
+        policy, ie_extract = load_policy_pack(pack_path)
+        # 팩 경로는 프로필 → (사전 판정) → Plan → 질문 필터가 순서대로 이어지므로 그래프 없이 실행
+        profile_for_prompts = _get_structured_profile(profile)
+        verdict = _prescreen_profile(profile_for_prompts, policy)
+        if verdict is not None:
+            return _print_prescreened(_prescreen_answer(verdict, ie_extract), stream)
+        print(_STAGE_DONE_MESSAGES["pack"])
+        _print_stage_start("plan")
+        plan_result = _plan_phase(profile=profile_for_prompts, policy=policy, ie_extract=ie_extract)
+        _print_stage_done("plan", plan_result)
+        questions = _plan_questions(profile_for_prompts, plan_result)
+    else:
+        # PDF 경로 설정 (기본값: finance_policy.pdf)
+        actual_pdf_path = _resolve_pdf_path(pdf_path)
+        print(f"\n📄 PDF 파싱 및 정보 추출 중 : {actual_pdf_path}")
+        # 파싱·IE·프로필 구조화는 서로 독립 → 동시 실행, Plan은 셋 다 끝난 뒤 실행
+        graph = StageGraph(max_workers=3)
+        doc_hash = _document_hash(actual_pdf_path)  # 파싱·IE 캐시 키에 공통으로 사용
+        graph.add("parse", _load_parsed_doc, actual_pdf_path, doc_hash, on_progress=_print_parse_progress)
+        graph.add("ie", _safe_information_extract, actual_pdf_path, doc_hash)
+        graph.add("profile", _get_structured_profile, profile)
+        graph.add("policy", _build_policy_index, deps=["parse"])
+        # Plan 단계 (1차 분석: 조건 판단·질문 생성)
+        graph.add("plan", _plan_phase, deps=["profile", "policy", "ie"])
+        graph.add("questions", _plan_questions, deps=["profile", "plan"])
+        stages = graph.run(on_done=_print_stage_done, on_start=_print_stage_start)
+        policy, ie_extract = stages["policy"], stages["ie"]
+        profile_for_prompts, plan_result = stages["profile"], stages["plan"]
+        questions = stages["questions"]
 
     answered_fields: Dict[str, str] = {}
 
     # 대화형 질문/응답 (항상 실행)
-    questions = _filter_questions_llm(profile_for_prompts, plan_result.get("questions", []))
     if questions:
         print("━" * 50)
         print("📋 추가 정보가 필요합니다:")
         print("━" * 50)
         
+        extractions = []
+        with ThreadPoolExecutor(max_workers=4) as extraction_pool:
+            for item in questions:
+                if isinstance(item, dict):
+                    field_name = item.get("field")
+                    question_text = item.get("question") or field_name
+                else:
+                    field_name = None
+                    question_text = str(item)
+
+                if not question_text:
+                    continue
+
+                answer = (ask(question_text) or "").strip()
+                if not answer:
+                    continue
+
+                # 답변 필드 추출은 백그라운드에서 (사용자가 다음 답변을 입력하는 동안 진행)
+                extractions.append(
+                    extraction_pool.submit(
+                        contextvars.copy_context().run, _extract_profile_fields, answer,
+                        question_text=question_text or "",
+                        field_name=field_name or "",
+                    )
+                )
+                if field_name:
+                    answered_fields[field_name] = answer
+
+            # 답변 순서대로 프로필에 병합
+            for future in extractions:
+                profile = _apply_profile_fields(profile, future.result())
+
+        # 재평가
+        print("\n🔄 Plan 재분석 중...")
+        profile_for_prompts = _get_structured_profile(profile)
+        plan_result = _replan_phase(profile_for_prompts, policy, ie_extract, plan_result, answered_fields)
+        print("✅ Plan 재분석 완료\n")
+
+    # Final 단계
+    if stream:
+        print("━" * 50)
+        print("📌 최종 상담 결과")
+        print("━" * 50)
+        result = _final_phase(
+            profile_for_prompts, policy, plan_result, answered_fields, ie_extract,
+            on_token=_print_stream,
+        )
+        print()
+        return result
+
+    print("📝 최종 상담 결과 생성 중...")
+    result = _final_phase(profile_for_prompts, policy, plan_result, answered_fields, ie_extract)
+    print("✅ 완료\n")
+
+    print("━" * 50)
+    print("📌 최종 상담 결과")
+    print("━" * 50)
+
+    return result
+
+
+async def _ask_stdin(question_text: str) -> str:
+    """기본 질문 입력: 터미널 input()을 스레드에서 실행하여 이벤트 루프를 막지 않음."""
+    return await asyncio.to_thread(input, f"\n❓ {question_text}\n👉 ")
+
+
+async def arun(
+    profile: str,
+    pdf_path: Optional[str] = None,
+    ask: Optional[Callable[[str], Awaitable[str]]] = None,
+    pack_path: Optional[str] = None,
+) -> str:
+    """run의 비동기 버전. 하나의 이벤트 루프에서 여러 세션을 동시에 처리할 때 사용.
+
+    진행 상황은 출력하지 않는다 (웹 서비스 등 내장용).
+
+    Args:
+        profile: 사용자 프로필 문자열
+        pdf_path: 정책 PDF 경로 (없으면 기본 PDF 사용)
+        ask: 질문 문자열을 받아 사용자 답변을 돌려주는 코루틴 함수 (없으면 터미널 입력)
+        pack_path: 정책 팩 경로 (지정 시 pdf_path 대신 사용, 파싱/IE 생략)
+
+    Returns:
+        최종 상담 결과 문자열
+    """
+    ask = ask or _ask_stdin
+    start_trace()
+
+    if pack_path:
+        (policy, ie_extract), profile_for_prompts = await asyncio.gather(
+            asyncio.to_thread(load_policy_pack, pack_path),
+            _aget_structured_profile(profile),
+        )
+        verdict = _prescreen_profile(profile_for_prompts, policy)
+        if verdict is not None:
+            return _prescreen_answer(verdict, ie_extract)
+    else:
+        (policy, ie_extract), profile_for_prompts = await asyncio.gather(
+            aload_policy(_resolve_pdf_path(pdf_path)),
+            _aget_structured_profile(profile),
+        )
+    plan_result = await _aplan_phase(profile=profile_for_prompts, policy=policy, ie_extract=ie_extract)
+
+    answered_fields: Dict[str, str] = {}
+    questions = await _aplan_questions(profile_for_prompts, plan_result)
+    if questions:
+        extractions = []
         for item in questions:
             if isinstance(item, dict):
                 field_name = item.get("field")
@@ -364,40 +1468,130 @@ def run(profile: str, pdf_path: Optional[str] = None) -> str:
             if not question_text:
                 continue
 
-            answer = input(f"\n❓ {question_text}\n👉 ").strip()
+            answer = (await ask(question_text) or "").strip()
             if not answer:
                 continue
 
-            profile = _update_profile_from_message_llm(
-                profile, answer,
-                question_text=question_text or "",
-                field_name=field_name or "",
+            extractions.append(
+                asyncio.create_task(
+                    _aextract_profile_fields(
+                        answer,
+                        question_text=question_text or "",
+                        field_name=field_name or "",
+                    )
+                )
             )
             if field_name:
                 answered_fields[field_name] = answer
 
+        for fields in await asyncio.gather(*extractions):
+            profile = _apply_profile_fields(profile, fields)
+
         # 재평가
-        print("\n🔄 Plan 재분석 중...")
-        profile_for_prompts = _get_structured_profile(profile)
-        plan_result = _plan_phase(profile=profile_for_prompts, policy_text=policy_text, ie_extract=ie_extract)
-        print("✅ Plan 재분석 완료\n")
+        profile_for_prompts = await _aget_structured_profile(profile)
+        plan_result = await _areplan_phase(profile_for_prompts, policy, ie_extract, plan_result, answered_fields)
 
-    # Final 단계
-    print("📝 최종 상담 결과 생성 중...")
-    plan_json = json.dumps(plan_result, ensure_ascii=False)
-    answered_json = json.dumps(answered_fields, ensure_ascii=False) if answered_fields else None
-    prompt = build_solar_prompt(
-        profile=profile_for_prompts,
-        policy_text=policy_text,
-        agent_plan=plan_json,
-        answered_fields=answered_json,
-        ie_extract=ie_extract,
-    )
-    output = call_solar(prompt, reasoning_effort="medium")
-    print("✅ 완료\n")
+    return await _afinal_phase(profile_for_prompts, policy, plan_result, answered_fields, ie_extract)
 
-    print("━" * 50)
-    print("📌 최종 상담 결과")
-    print("━" * 50)
 
-    return _ensure_required_headers(_clean_terminal_output(output))
+def _session_questions(questions: list) -> List[Dict[str, Any]]:
+    """질문 필터 결과 → 세션용 질문 목록 [{"id", "field", "question"}]."""
+    items: List[Dict[str, Any]] = []
+    for item in questions:
+        if isinstance(item, dict):
+            field_name = item.get("field") or ""
+            question_text = item.get("question") or field_name
+        else:
+            field_name, question_text = "", str(item)
+        if question_text:
+            items.append({"id": len(items), "field": field_name, "question": question_text})
+    return items
+
+
+async def astart_session(profile: str, policy: PolicyIndex, ie_extract: Optional[str]) -> Dict[str, Any]:
+    """재개 가능한 대화 흐름 1단계: 프로필 구조화 → (사전 판정) → Plan → 질문 필터.
+
+    arun의 질문 루프를 요청 단위로 나눈 것으로 (start → answers → final), 반환하는 세션 상태는
+    JSON으로 직렬화할 수 있어 세션 저장소에 그대로 저장한다. 정책(policy, ie_extract)은 상태에 넣지 않고
+    호출하는 쪽이 메모리에 유지한다.
+
+    Returns:
+        {"profile", "structured_profile", "plan", "questions", "answered", "answered_fields",
+         "status": "questions" | "ready" | "done", "result"}
+    """
+    start_trace()
+    profile_for_prompts = await _aget_structured_profile(profile)
+    state: Dict[str, Any] = {
+        "profile": profile,
+        "structured_profile": profile_for_prompts,
+        "plan": {},
+        "questions": [],
+        "answered": [],
+        "answered_fields": {},
+        "status": "ready",
+        "result": None,
+    }
+    verdict = _prescreen_profile(profile_for_prompts, policy)
+    if verdict is not None:
+        state.update(status="done", prescreen=verdict, result=_prescreen_answer(verdict, ie_extract))
+        return state
+    plan_result = await _aplan_phase(profile=profile_for_prompts, policy=policy, ie_extract=ie_extract)
+    questions = _session_questions(await _aplan_questions(profile_for_prompts, plan_result))
+    state.update(plan=plan_result, questions=questions, status="questions" if questions else "ready")
+    return state
+
+
+async def asubmit_answers(state: Dict[str, Any], answers: Dict[int, str]) -> Dict[str, Any]:
+    """2단계: 질문 답변 반영 (여러 번 나누어 보내도 됨). 답변별 프로필 필드 추출은 동시에 실행.
+
+    Args:
+        state: astart_session / asubmit_answers가 반환한 세션 상태
+        answers: {질문 id: 답변}. 빈 답변은 건너뜀
+
+    Raises:
+        ValueError: 없는 질문 id
+    """
+    start_trace()
+    by_id = {q["id"]: q for q in state["questions"]}
+    unknown = [qid for qid in answers if qid not in by_id]
+    if unknown:
+        raise ValueError(f"없는 질문 id입니다: {unknown}")
+    pending = [(by_id[qid], (answer or "").strip()) for qid, answer in answers.items()]
+    pending = [(question, answer) for question, answer in pending if answer]
+
+    extracted = await asyncio.gather(*(
+        _aextract_profile_fields(answer, question_text=question["question"], field_name=question["field"])
+        for question, answer in pending
+    ))
+    profile = state["profile"]
+    for fields in extracted:
+        profile = _apply_profile_fields(profile, fields)
+    answered_fields = dict(state["answered_fields"])
+    answered = set(state["answered"])
+    for question, answer in pending:
+        answered.add(question["id"])
+        if question["field"]:
+            answered_fields[question["field"]] = answer
+    return {
+        **state,
+        "profile": profile,
+        "answered": sorted(answered),
+        "answered_fields": answered_fields,
+        "status": "ready" if len(answered) == len(by_id) else "questions",
+    }
+
+
+async def afinish_session(state: Dict[str, Any], policy: PolicyIndex, ie_extract: Optional[str]) -> Dict[str, Any]:
+    """3단계: 재평가(질문이 있었으면) → Final. 답하지 않은 질문은 건너뛴 것으로 처리."""
+    if state["status"] == "done":
+        return state
+    start_trace()
+    profile_for_prompts = state["structured_profile"]
+    plan_result = state["plan"]
+    if state["questions"]:
+        profile_for_prompts = await _aget_structured_profile(state["profile"])
+        plan_result = await _areplan_phase(
+            profile_for_prompts, policy, ie_extract, plan_result, state["answered_fields"]
+        )
+    result = await _afinal_phase(profile_for_prompts, policy, plan_result, state["answered_fields"], ie_extract)
+    return {**state, "structured_profile": profile_for_prompts, "plan": plan_result, "status": "done", "result": result}
@@ -0,0 +1,104 @@
+"""배치 모드: 여러 프로필을 하나의 정책 PDF로 비대화형 평가
+
+PDF 파싱/IE는 한 번만 수행하고(정책 팩을 지정하면 파일만 읽음), 프로필별 (구조화 → Plan → Final) 체인을
+제한된 워커 풀에서 병렬 실행하여 결과를 JSONL로 스트리밍 기록합니다.
+
+입력 형식:
+- JSONL: 한 줄에 문자열 하나("29세/수도권/...") 또는 {"id": ..., "profile": ...} 객체
+- CSV: "profile" 컬럼 필수, "id" 컬럼 선택
+"""
+
+import csv
+import json
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterator, Optional
+
+from agent import _resolve_pdf_path, evaluate_profile, load_policy, load_policy_pack
+from retrieval import PolicyIndex
+from tracing import start_trace
+
+
+def read_profiles(path: str) -> Iterator[Dict[str, Any]]:
+    """JSONL/CSV 파일에서 {"id", "profile"} 레코드를 순서대로 읽음 (확장자로 형식 판단)."""
+    if path.lower().endswith(".csv"):
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            for index, row in enumerate(csv.DictReader(f)):
+                profile = (row.get("profile") or "").strip()
+                if profile:
+                    yield {"id": row.get("id") or index, "profile": profile}
+        return
+
+    with open(path, "r", encoding="utf-8") as f:
+        for index, line in enumerate(f):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError:
+                item = line  # 따옴표 없는 프로필 문자열 한 줄도 허용
+            if isinstance(item, str):
+                item = {"profile": item}
+            if not isinstance(item, dict) or not str(item.get("profile") or "").strip():
+                continue
+            yield {"id": item.get("id", index), "profile": str(item["profile"]).strip()}
+
+
+def _evaluate_record(record: Dict[str, Any], policy: PolicyIndex, ie_extract: Optional[str]) -> Dict[str, Any]:
+    """레코드 1건 평가. 실패해도 배치 전체를 멈추지 않도록 error 필드로 기록."""
+    try:
+        evaluated = evaluate_profile(record["profile"], policy, ie_extract)
+    except Exception as exc:
+        return {**record, "error": f"{type(exc).__name__}: {exc}"}
+    return {**record, **evaluated}
+
+
+def run_batch(
+    profiles_path: str,
+    output_path: str,
+    pdf_path: Optional[str] = None,
+    max_workers: int = 4,
+    pack_path: Optional[str] = None,
+) -> int:
+    """프로필 파일 전체를 평가하여 output_path(JSONL)에 완료 순서대로 기록.
+
+    Args:
+        profiles_path: 프로필 JSONL/CSV 경로
+        output_path: 결과 JSONL 경로
+        pdf_path: 정책 PDF 경로 (없으면 기본 PDF 사용)
+        max_workers: 동시에 평가할 프로필 수
+        pack_path: 정책 팩 경로 (지정 시 pdf_path 대신 사용)
+
+    Returns:
+        기록한 결과 수
+    """
+    if pack_path:
+        policy, ie_extract = load_policy_pack(pack_path)
+    else:
+        actual_pdf_path = _resolve_pdf_path(pdf_path)
+        start_trace()  # 공유 PDF 파싱/IE (프로필별 평가는 각자 trace)
+        policy, ie_extract = load_policy(actual_pdf_path)
+
+    max_workers = max(1, max_workers)
+    written = 0
+    records = read_profiles(profiles_path)
+    with open(output_path, "w", encoding="utf-8") as out, ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending: set = set()
+
+        def _drain(futures: set) -> None:
+            nonlocal written
+            for future in futures:
+                out.write(json.dumps(future.result(), ensure_ascii=False) + "\n")
+                out.flush()
+                written += 1
+
+        # 입력을 한꺼번에 제출하지 않고 in-flight 개수를 제한 (대용량 입력 메모리 보호)
+        for record in records:
+            if len(pending) >= max_workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                _drain(done)
+            future: Future = executor.submit(_evaluate_record, record, policy, ie_extract)
+            pending.add(future)
+        done, _ = wait(pending)
+        _drain(done)
+    return written
@@ -0,0 +1,359 @@
+"""오프라인 벤치마크 (Upstage API 대역 서버 사용)
+
+mock_upstage 서버를 띄우고 UPSTAGE_BASE_URL을 그 주소로 바꾼 뒤 에이전트를 실행하여
+단일(run) / 배치(run_batch) / 동시(arun 여러 세션) / 정책 팩(single_pack) 모드의 소요 시간과 처리량을 측정합니다.
+결과는 JSON 리포트로 저장하며, compare 명령으로 두 리포트를 비교해 성능 회귀를 찾습니다.
+
+    python src/benchmark.py run --output bench.json
+    python src/benchmark.py run --record --output bench.json   # 실제 API 응답 녹화 (API 키 필요)
+    python src/benchmark.py compare old.json new.json
+
+에이전트 모듈은 환경변수(config.py)를 import 시점에 읽으므로, 서버를 띄운 뒤에 import 합니다.
+로컬 캐시(Parse/IE/Solar 응답)는 기본적으로 끄고 측정합니다 (--warm-cache면 .env 설정 그대로).
+PDF별로 IE 업로드 요청 1건이 점유하는 최대 메모리(RSS / Python 힙 증가분)도 함께 기록합니다.
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+import typer
+from dotenv import load_dotenv
+
+from mock_upstage import DEFAULT_LATENCY, MockUpstageServer
+
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_PDFS = [
+    os.path.join(PROJECT_ROOT, "data", "finance_policy.pdf"),
+    os.path.join(PROJECT_ROOT, "data", "transportation_policy.pdf"),
+]
+DEFAULT_RECORDINGS_DIR = os.path.join(PROJECT_ROOT, "benchmarks", "recordings")
+# 규칙 파서로 처리되는 형식과 LLM 구조화가 필요한 형식을 섞음
+SAMPLE_PROFILES = [
+    "29세/수도권/중소기업/월250/미혼",
+    "25세/서울/대학생/월50/미혼",
+    "32세/부산/프리랜서/연3000/기혼/자녀1명",
+    "27세/경기/구직중/무소득/미혼/무주택",
+    "서른한 살 대구 사는 공무원이고 결혼 예정입니다",
+    "34세/인천/자영업/월400/기혼/전세",
+]
+SAMPLE_ANSWERS = ["아니오", "네", "무주택"]
+
+app = typer.Typer(add_completion=False)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _prepare_env(base_url: str, warm_cache: bool, cache_dir: str) -> None:
+    """에이전트 import 전에 대역 서버 주소와 캐시 설정을 환경변수로 지정."""
+    os.environ["UPSTAGE_BASE_URL"] = base_url
+    os.environ.setdefault("UPSTAGE_API_KEY", "offline")
+    os.environ.setdefault("SOLAR_MODEL", "solar-pro3")
+    os.environ["POLICY_CACHE_DIR"] = cache_dir
+    if not warm_cache:
+        os.environ["PARSE_CACHE_ENABLED"] = "0"
+        os.environ["IE_CACHE_ENABLED"] = "0"
+        os.environ["SOLAR_CACHE_ENABLED"] = "0"
+
+
+def _answerer() -> Callable[[str], str]:
+    answers = iter(SAMPLE_ANSWERS * 100)
+    return lambda _question: next(answers)
+
+
+def _summarize(durations: List[float], items_per_run: int) -> Dict[str, Any]:
+    median = statistics.median(durations)
+    ordered = sorted(durations)
+    return {
+        "runs": len(durations),
+        "items_per_run": items_per_run,
+        "median_s": round(median, 4),
+        "p95_s": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4),
+        "min_s": round(min(durations), 4),
+        "max_s": round(max(durations), 4),
+        "throughput_per_s": round(items_per_run / median, 4) if median else None,
+    }
+
+
+def _stage_summary(tracer) -> List[Dict[str, Any]]:
+    rows = tracer.summary()
+    for row in rows:
+        for key in ("total_ms", "max_ms", "avg_ms"):
+            row[key] = round(row[key], 1)
+    return rows
+
+
+def _measure(tracer, repeats: int, items_per_run: int, fn: Callable[[], Any]) -> Dict[str, Any]:
+    """fn을 repeats번 실행하여 소요 시간 요약 + 단계별 API 호출 집계(마지막 1회)."""
+    durations = []
+    for _ in range(repeats):
+        tracer.clear()
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn()
+        durations.append(time.perf_counter() - started)
+    return {**_summarize(durations, items_per_run), "stages": _stage_summary(tracer)}
+
+
+def _max_rss_mb() -> float:
+    # Linux는 KB, macOS는 바이트 단위
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _proc_status_mb(field: str) -> Optional[float]:
+    """/proc/self/status의 메모리 항목(VmRSS, VmHWM 등)을 MB로. Linux가 아니면 None."""
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith(f"{field}:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss() -> bool:
+    """프로세스 최대 RSS(VmHWM)를 현재 RSS로 초기화 (Linux 전용). 성공하면 True."""
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _traced_peak_bytes(fn: Callable[[], Any]) -> int:
+    """fn 실행 중 새로 할당된 Python 메모리의 최대치 (tracemalloc)."""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _upload_memory(pdf_path: str, sessions: int) -> Dict[str, Any]:
+    """IE 업로드 요청 1건당 최대 메모리: 단독 1건 / sessions개 동시 요청 (동시 실행 수로 나눔).
+
+    대역 서버도 같은 프로세스에서 요청 본문을 통째로 받으므로, 측정은 별도 프로세스(upload-memory 명령)에서 수행.
+    """
+    from config import IE_MAX_CONCURRENCY
+
+    rows = {}
+    for count in (1, sessions):
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "upload-memory", pdf_path, "--sessions", str(count)],
+            capture_output=True, text=True, check=True,
+        )
+        rows[count] = json.loads(completed.stdout.strip().splitlines()[-1])
+    in_flight = min(sessions, IE_MAX_CONCURRENCY) if IE_MAX_CONCURRENCY > 0 else sessions
+    return {
+        "file_mb": round(os.path.getsize(pdf_path) / (1024 * 1024), 3),
+        "ie_in_flight": in_flight,
+        "ie_peak_rss_mb_single": rows[1]["rss_mb"],
+        "ie_peak_rss_mb_per_in_flight": round(rows[sessions]["rss_mb"] / in_flight, 3),
+        "ie_peak_heap_mb_single": rows[1]["heap_mb"],
+        "ie_peak_heap_mb_per_in_flight": round(rows[sessions]["heap_mb"] / in_flight, 3),
+    }
+
+
+def _benchmark_pdf(pdf_path: str, profiles: List[str], repeats: int, workers: int, work_dir: str) -> Dict[str, Any]:
+    from agent import arun, ingest_policy, run
+    from batch import run_batch
+    from policy_pack import save_pack
+    from tracing import tracer
+    from upstage_client import aclose_clients
+
+    async def _concurrent() -> None:
+        async def ask(question: str) -> str:
+            return next(answers)
+
+        answers = iter(SAMPLE_ANSWERS * 100 * len(profiles))
+        try:
+            await asyncio.gather(*(arun(p, pdf_path, ask=ask) for p in profiles))
+        finally:
+            await aclose_clients()
+
+    profiles_path = os.path.join(work_dir, "profiles.jsonl")
+    with open(profiles_path, "w", encoding="utf-8") as f:
+        for index, profile in enumerate(profiles):
+            f.write(json.dumps({"id": index, "profile": profile}, ensure_ascii=False) + "\n")
+    output_path = os.path.join(work_dir, "batch_output.jsonl")
+    # 정책 팩은 측정 밖에서 한 번만 생성 (pack 모드 = 팩 로드 + 프로필별 작업만)
+    pack_path = os.path.join(work_dir, "policy.pack.json")
+    with contextlib.redirect_stdout(io.StringIO()):
+        save_pack(ingest_policy(pdf_path), pack_path)
+
+    return {
+        "single": _measure(tracer, repeats, 1, lambda: run(profiles[0], pdf_path, ask=_answerer())),
+        "batch": _measure(
+            tracer, repeats, len(profiles),
+            lambda: run_batch(profiles_path, output_path, pdf_path=pdf_path, max_workers=workers),
+        ),
+        "concurrent": _measure(tracer, repeats, len(profiles), lambda: asyncio.run(_concurrent())),
+        "single_pack": _measure(tracer, repeats, 1, lambda: run(profiles[0], ask=_answerer(), pack_path=pack_path)),
+    }
+
+
+@app.command("run")
+def run_benchmark(
+    output: str = typer.Option("benchmark_report.json", "--output", help="결과 JSON 리포트 경로"),
+    pdf: Optional[List[str]] = typer.Option(None, "--pdf", help="측정할 정책 PDF (여러 번 지정 가능, 기본: data/의 PDF 2종)"),
+    repeats: int = typer.Option(3, "--repeats", help="모드별 반복 횟수 (중앙값 보고)"),
+    profiles: int = typer.Option(len(SAMPLE_PROFILES), "--profiles", help="배치/동시 모드 프로필 수"),
+    workers: int = typer.Option(4, "--workers", help="배치 모드 워커 수"),
+    latency_scale: float = typer.Option(1.0, "--latency-scale", help="대역 서버 지연 시간 배율 (0이면 지연 없음)"),
+    recordings: str = typer.Option(DEFAULT_RECORDINGS_DIR, "--recordings", help="녹화 응답 디렉터리"),
+    record: bool = typer.Option(False, "--record", help="실제 API로 요청을 전달하며 응답 녹화 (.env의 API 키 사용)"),
+    error_rate: float = typer.Option(0.0, "--error-rate", help="대역 서버가 503으로 응답할 확률 (재시도 측정)"),
+    slow_rate: float = typer.Option(0.0, "--slow-rate", help="대역 서버 응답이 10배 느려질 확률 (꼬리 지연 측정)"),
+    warm_cache: bool = typer.Option(False, "--warm-cache", help="로컬 캐시(Parse/IE/Solar 응답)를 .env 설정대로 사용"),
+) -> None:
+    """대역 서버로 단일/배치/동시 모드를 측정하여 JSON 리포트 저장."""
+    load_dotenv()
+    latency = {name: round(seconds * latency_scale, 4) for name, seconds in DEFAULT_LATENCY.items()}
+    server = MockUpstageServer(
+        recordings_dir=recordings,
+        latency=latency,
+        stream_chunk_delay=0.02 * latency_scale,
+        upstream=os.getenv("UPSTAGE_BASE_URL") if record else None,
+        api_key=os.getenv("UPSTAGE_API_KEY") if record else None,
+        error_rate=error_rate,
+        slow_rate=slow_rate,
+    )
+    base_url = server.start()
+    sample = [SAMPLE_PROFILES[i % len(SAMPLE_PROFILES)] for i in range(max(1, profiles))]
+
+    with tempfile.TemporaryDirectory(prefix="policy-bench-") as work_dir:
+        _prepare_env(base_url, warm_cache, os.path.join(work_dir, "cache"))
+        from tracing import tracer
+        from upstage_client import connection_stats, limiter_stats, solar_cache_stats
+
+        tracer.enable()
+        results = {}
+        memory = {}
+        try:
+            for pdf_path in pdf or DEFAULT_PDFS:
+                print(f"⏱️  {os.path.basename(pdf_path)} 측정 중...")
+                results[os.path.basename(pdf_path)] = _benchmark_pdf(pdf_path, sample, repeats, workers, work_dir)
+                memory[os.path.basename(pdf_path)] = _upload_memory(pdf_path, len(sample))
+        finally:
+            tracer.disable()
+            server.stop()
+
+    report = {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "mode": "record" if record else "replay",
+            "latency_s": latency,
+            "error_rate": error_rate,
+            "slow_rate": slow_rate,
+            "repeats": repeats,
+            "profiles": len(sample),
+            "workers": workers,
+            "warm_cache": warm_cache,
+            "server": server.stats,
+            "connections": connection_stats(),
+            "solar_cache": solar_cache_stats(),
+            "limiters": limiter_stats(),
+            "max_rss_mb": _max_rss_mb(),
+        },
+        "results": results,
+        "memory": memory,
+    }
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    for pdf_name, modes in results.items():
+        for mode, row in modes.items():
+            print(f"{pdf_name:<28}{mode:<12}{row['median_s']:>9.3f}s{row['throughput_per_s']:>9.2f}/s")
+    for pdf_name, row in memory.items():
+        print(
+            f"{pdf_name:<28}{'ie_upload':<12}{row['ie_peak_rss_mb_per_in_flight']:>8.2f}MB/요청"
+            f" (파일 {row['file_mb']:.2f}MB, 동시 {row['ie_in_flight']}건)"
+        )
+    print(f"✅ 리포트 저장 → {output} (녹화 재생 {server.stats['replayed']}건, 기본 응답 {server.stats['canned']}건)")
+
+
+@app.command("upload-memory", hidden=True)
+def upload_memory(
+    pdf_path: str = typer.Argument(..., help="업로드할 PDF"),
+    sessions: int = typer.Option(1, "--sessions", help="동시 IE 요청 수"),
+) -> None:
+    """(내부용) IE 업로드 중 늘어난 최대 RSS / Python 힙을 JSON 한 줄로 출력. 환경변수는 run 명령에서 상속."""
+    from agent import IE_SCHEMA
+    from upstage_client import acall_information_extract, aclose_clients
+
+    async def _upload() -> None:
+        try:
+            await asyncio.gather(*(acall_information_extract(pdf_path, IE_SCHEMA) for _ in range(sessions)))
+        finally:
+            await aclose_clients()
+
+    # 모듈 import로 이미 올라간 최대 RSS는 빼고, 업로드 중 늘어난 양만 측정
+    if _reset_peak_rss():
+        baseline = _proc_status_mb("VmRSS")
+        asyncio.run(_upload())
+        rss_mb = _proc_status_mb("VmHWM") - baseline
+    else:
+        baseline = _max_rss_mb()
+        asyncio.run(_upload())
+        rss_mb = _max_rss_mb() - baseline  # 최대치를 초기화할 수 없으면 import 시점 최대치에 가려질 수 있음
+    rss_mb = max(0.0, rss_mb)
+    # tracemalloc 추적은 메모리를 더 쓰므로 RSS 측정이 끝난 뒤 한 번 더 실행
+    heap_mb = _traced_peak_bytes(lambda: asyncio.run(_upload())) / (1024 * 1024)
+    print(json.dumps({"rss_mb": round(rss_mb, 3), "heap_mb": round(heap_mb, 3)}))
+
+
+@app.command()
+def compare(
+    baseline: str = typer.Argument(..., help="기준 리포트 (이전 커밋)"),
+    current: str = typer.Argument(..., help="비교할 리포트"),
+    threshold: float = typer.Option(0.10, "--threshold", help="회귀로 판단할 중앙값 증가 비율"),
+) -> None:
+    """두 리포트의 모드별 중앙값을 비교. 회귀가 있으면 종료 코드 1."""
+    with open(baseline, "r", encoding="utf-8") as f:
+        old = json.load(f)["results"]
+    with open(current, "r", encoding="utf-8") as f:
+        new = json.load(f)["results"]
+
+    regressions = 0
+    for pdf_name, modes in new.items():
+        for mode, row in modes.items():
+            previous = (old.get(pdf_name) or {}).get(mode)
+            if not previous:
+                continue
+            change = (row["median_s"] - previous["median_s"]) / previous["median_s"] if previous["median_s"] else 0.0
+            flag = "❌" if change > threshold else "  "
+            regressions += change > threshold
+            print(f"{flag} {pdf_name:<28}{mode:<12}{previous['median_s']:>9.3f}s → {row['median_s']:>9.3f}s ({change:+.1%})")
+    if regressions:
+        print(f"\n성능 회귀 {regressions}건 (기준 +{threshold:.0%} 초과)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    app()
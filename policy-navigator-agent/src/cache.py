@@ -0,0 +1,283 @@
+"""로컬 디스크 캐시 모듈
+
+Upstage API 응답을 "파일 내용 해시 + 요청 파라미터" 키로 저장하여
+같은 정책 PDF에 대한 반복 호출을 건너뛸 수 있게 합니다.
+
+DiskCache (Document Parse / IE 결과처럼 큰 JSON)
+- 엔트리 1개 = JSON 파일 1개 (<key>.json)
+- 조회 시 mtime 갱신 → mtime 기준 LRU 제거
+- 용량(max_bytes) / 개수(max_entries) 제한, 선택적 TTL(ttl_seconds)
+
+ResponseCache (Solar 응답처럼 작고 많은 문자열)
+- 메모리 LRU → SQLite 파일 2단 조회, 적중/미스 지표 집계
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    """파일 내용의 SHA-256 해시 (전체를 메모리에 올리지 않고 청크 단위로 계산)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def make_key(*parts: Any) -> str:
+    """JSON 직렬화 가능한 값들로 캐시 키 생성 (dict 키 순서 무관)."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """JSON 값을 저장하는 LRU 디스크 캐시.
+
+    Args:
+        directory: 캐시 파일 저장 디렉토리 (첫 저장 시 생성)
+        max_bytes: 전체 용량 상한 (None이면 무제한)
+        max_entries: 엔트리 개수 상한 (None이면 무제한)
+        ttl_seconds: 저장 후 유효 시간 (None이면 만료 없음)
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        *,
+        max_bytes: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+    ) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Any]:
+        """키에 해당하는 값을 반환. 없거나 만료/손상된 경우 None."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            # 손상된 엔트리는 제거하고 미스로 처리
+            self._remove(path)
+            return None
+        if not isinstance(entry, dict) or "value" not in entry:
+            self._remove(path)
+            return None
+        created_at = entry.get("created_at") or 0
+        if self.ttl_seconds is not None and time.time() - created_at > self.ttl_seconds:
+            self._remove(path)
+            return None
+        try:
+            os.utime(path, None)  # LRU: 최근 사용 시각 갱신
+        except OSError:
+            pass
+        return entry["value"]
+
+    def set(self, key: str, value: Any) -> None:
+        """값 저장 (임시 파일에 쓴 뒤 원자적으로 교체) 후 상한 초과분 제거."""
+        entry = {"created_at": time.time(), "value": value}
+        data = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+        if self.max_bytes is not None and len(data) > self.max_bytes:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            self._remove(tmp_path)
+            raise
+        self._evict()
+
+    def clear(self) -> None:
+        """모든 엔트리 삭제."""
+        with self._lock:
+            for path, _, _ in self._entries():
+                self._remove(path)
+
+    def _entries(self) -> list:
+        """(경로, mtime, 크기) 목록을 오래된 순으로 반환."""
+        entries = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return entries
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, stat.st_mtime, stat.st_size))
+        entries.sort(key=lambda e: e[1])
+        return entries
+
+    def _evict(self) -> None:
+        if self.max_bytes is None and self.max_entries is None:
+            return
+        with self._lock:
+            entries = self._entries()
+            total = sum(size for _, _, size in entries)
+            while entries and (
+                (self.max_entries is not None and len(entries) > self.max_entries)
+                or (self.max_bytes is not None and total > self.max_bytes)
+            ):
+                path, _, size = entries.pop(0)
+                self._remove(path)
+                total -= size
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class ResponseCache:
+    """메모리 LRU + SQLite 2단 문자열 캐시. 여러 스레드에서 공유 가능.
+
+    Args:
+        path: SQLite 파일 경로 (None이면 메모리 캐시만 사용, 첫 저장 시 디렉토리 생성)
+        max_memory_entries: 메모리 LRU 엔트리 수
+        max_disk_entries: SQLite 엔트리 수 상한 (None이면 무제한, 최근 사용 순으로 유지)
+        ttl_seconds: 저장 후 유효 시간 (None이면 만료 없음)
+    """
+
+    def __init__(
+        self,
+        path: Optional[str],
+        *,
+        max_memory_entries: int = 1000,
+        max_disk_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+    ) -> None:
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._counts = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0}
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """SQLite 연결 (지연 생성). 호출 측에서 self._lock 보유."""
+        if self.path is None:
+            return None
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+            self._db.execute("PRAGMA journal_mode=WAL")  # 여러 프로세스가 동시에 읽기 가능
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, used_at REAL NOT NULL)"
+            )
+        return self._db
+
+    def _existing_db(self) -> Optional[sqlite3.Connection]:
+        """조회용: SQLite 파일이 이미 있을 때만 연결 (읽기만으로 파일을 만들지 않음)."""
+        if self._db is None and not (self.path and os.path.exists(self.path)):
+            return None
+        return self._connect()
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl_seconds is not None and time.time() - created_at > self.ttl_seconds
+
+    def _remember(self, key: str, value: str, created_at: float) -> None:
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        """메모리 → SQLite 순으로 조회. 없거나 만료된 경우 None."""
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None and not self._expired(cached[1]):
+                self._memory.move_to_end(key)
+                self._counts["memory_hits"] += 1
+                return cached[0]
+            self._memory.pop(key, None)
+
+            row = None
+            db = self._existing_db()
+            if db is not None:
+                try:
+                    row = db.execute("SELECT value, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+                    if row is not None and self._expired(row[1]):
+                        db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                        db.commit()
+                        row = None
+                    elif row is not None:
+                        db.execute("UPDATE responses SET used_at = ? WHERE key = ?", (time.time(), key))
+                        db.commit()
+                except sqlite3.Error:
+                    row = None  # 캐시 오류는 미스로 처리
+            if row is None:
+                self._counts["misses"] += 1
+                return None
+            self._counts["disk_hits"] += 1
+            self._remember(key, row[0], row[1])
+            return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        """메모리와 SQLite에 저장 후 상한 초과분 제거."""
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            self._counts["stores"] += 1
+            db = self._connect()
+            if db is None:
+                return
+            try:
+                db.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, created_at, used_at) VALUES (?, ?, ?, ?)",
+                    (key, value, now, now),
+                )
+                if self.max_disk_entries is not None:
+                    db.execute(
+                        "DELETE FROM responses WHERE key NOT IN "
+                        "(SELECT key FROM responses ORDER BY used_at DESC LIMIT ?)",
+                        (self.max_disk_entries,),
+                    )
+                db.commit()
+            except sqlite3.Error:
+                pass
+
+    def clear(self) -> None:
+        """모든 엔트리 삭제 (지표는 유지)."""
+        with self._lock:
+            self._memory.clear()
+            db = self._existing_db()
+            if db is not None:
+                db.execute("DELETE FROM responses")
+                db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """적중/미스 지표: memory_hits, disk_hits, misses, stores, hit_rate."""
+        with self._lock:
+            counts = dict(self._counts)
+        lookups = counts["memory_hits"] + counts["disk_hits"] + counts["misses"]
+        counts["hit_rate"] = round((counts["memory_hits"] + counts["disk_hits"]) / lookups, 4) if lookups else 0.0
+        return counts
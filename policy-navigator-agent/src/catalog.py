@@ -0,0 +1,243 @@
+"""정책 카탈로그: 프로필 1개를 정책 팩 여러 개와 대조하여 신청 가능한 정책 순위 목록 생성
+
+정책마다 run을 반복하면 정책 수만큼 Plan/Final이 순차 실행되므로,
+1차로 API 호출 없는 로컬 선별을 하고 상위 후보만 전체 분석(Plan → Final)을 동시에 실행합니다.
+- 1차 선별: 팩 조건식 사전 판정(eligibility.prescreen)으로 확실히 미충족인 정책 제외
+  + 정책 단위 BM25(IE 슬롯·자격 조건·대상 관련 청크)로 프로필과의 관련도 점수
+- 2차 분석: 상위 top_k개만 aevaluate_profile을 동시 실행 (사전 판정이 확정된 정책은 LLM 생략)
+- 결과: 신청 가능 → 판단 필요 → 신청 불가 순, 같은 그룹 안에서는 1차 점수 순
+"""
+
+import asyncio
+import glob
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+from agent import (
+    ELIGIBILITY_QUERY_TERMS,
+    REQUIRED_HEADERS,
+    _aget_structured_profile,
+    _ie_fields,
+    aevaluate_profile,
+)
+from config import CATALOG_TOP_K, CATALOG_WORKERS
+from eligibility import prescreen
+from policy_pack import load_pack, pack_policy
+from profile_parser import parse_profile_rules
+from retrieval import BM25Index, PolicyIndex
+from upstage_client import aclose_clients
+
+
+# 정책 단위 색인 문서에 넣을 IE 슬롯 (신청 기간·서류 등은 관련도와 무관하므로 제외)
+_INDEX_IE_FIELDS = ("program_name", "target_eligibility", "benefit", "notes")
+# 정책 단위 색인 문서에 포함할 본문 길이 (자격 요건 관련 청크 위주)
+_INDEX_TEXT_CHARS = 3000
+# "신청 가능 정책" 섹션의 한 줄 전체가 "해당 없음"류 문장인지 (예: "현재 신청 가능한 정책이 없습니다.", "- 해당 없음").
+# "소득 제한 없음", "중복 신청 불가"처럼 정책 설명 중에 나오는 표현은 줄 전체가 아니므로 해당하지 않음
+_NONE_LINE_RE = re.compile(
+    r"^(?:현재|지금)?\s*(?:[^,.:]{0,30}?(?:정책|사업|지원)(?:이|은|는)?\s*)?"
+    r"(?:없음|없습니다|없어요|해당\s*(?:사항\s*)?없음|해당\s*사항이\s*없습니다|해당하지\s*않습니다)[.。!]?$"
+)
+_BULLET_RE = re.compile(r"^(?:[-*•·]|\d+[.)])\s*")
+
+APPLICABLE = "신청 가능"
+UNDECIDED = "판단 필요"
+NOT_APPLICABLE = "신청 불가"
+_STATUS_ORDER = {APPLICABLE: 0, UNDECIDED: 1, NOT_APPLICABLE: 2}
+
+
+class Catalog:
+    """정책 팩 여러 개 + 정책 단위 BM25 인덱스.
+
+    Args:
+        entries: [{"path", "name", "policy": PolicyIndex, "ie_extract"}, ...]
+    """
+
+    def __init__(self, entries: List[Dict[str, Any]]) -> None:
+        self.entries = entries
+        self._bm25 = BM25Index([
+            {"heading": entry["name"], "text": _index_text(entry["policy"], entry["ie_extract"])}
+            for entry in entries
+        ])
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def scores(self, query: str) -> List[float]:
+        return self._bm25.scores(query) if self.entries else []
+
+
+def _index_text(policy: PolicyIndex, ie_extract: Optional[str]) -> str:
+    """정책 1건의 색인 문서: IE 슬롯 + 자격 조건 + 자격 요건 관련 청크."""
+    ie = _ie_fields(ie_extract)
+    parts = [str(ie[key]) for key in _INDEX_IE_FIELDS if ie.get(key)]
+    parts.extend(c["condition"] for c in policy.conditions or [])
+    parts.append(policy.select_text(ELIGIBILITY_QUERY_TERMS, _INDEX_TEXT_CHARS))
+    return " ".join(parts)
+
+
+def _pack_paths(sources: Iterable[str]) -> List[str]:
+    """디렉터리는 그 안의 *.pack.json 전체, 파일은 그대로 (중복 제거, 이름순)."""
+    paths = set()
+    for source in sources:
+        if os.path.isdir(source):
+            paths.update(glob.glob(os.path.join(source, "*.pack.json")))
+        else:
+            paths.add(source)
+    return sorted(paths)
+
+
+def load_catalog(sources: Iterable[str]) -> Catalog:
+    """정책 팩 파일/디렉터리 목록 → Catalog. API 호출 없이 파일만 읽음."""
+    entries = []
+    for path in _pack_paths(sources):
+        pack = load_pack(path)
+        policy, ie_extract = pack_policy(pack)
+        name = str(_ie_fields(ie_extract).get("program_name") or pack["source"]["name"])
+        entries.append({"path": path, "name": name, "policy": policy, "ie_extract": ie_extract})
+    if not entries:
+        raise FileNotFoundError(f"정책 팩을 찾을 수 없습니다: {', '.join(sources)}")
+    return Catalog(entries)
+
+
+def shortlist(catalog: Catalog, profile_for_prompts: str, top_k: int) -> Dict[str, List[Dict[str, Any]]]:
+    """1차 선별 (로컬 계산만). 사전 판정 미충족 정책은 제외, 나머지는 관련도 순 상위 top_k.
+
+    Returns:
+        {"candidates": [{"index", "score"}, ...], "excluded": [{"index", "score", "prescreen"}, ...]}
+        사전 판정으로 충족이 확정된 정책은 점수와 관계없이 후보 앞쪽에 둠
+    """
+    parsed = parse_profile_rules(profile_for_prompts)
+    scores = catalog.scores(profile_for_prompts)
+    ranked, excluded = [], []
+    for index, entry in enumerate(catalog.entries):
+        policy = entry["policy"]
+        verdict = prescreen(parsed, policy.conditions or [], policy.predicates) if parsed and policy.predicates else None
+        item = {"index": index, "score": round(scores[index], 3)}
+        if verdict is not None and not any(s["eligible"] for s in verdict["sections"]):
+            excluded.append({**item, "prescreen": verdict})
+            continue
+        ranked.append((verdict is None, -scores[index], index, item))
+    ranked.sort(key=lambda row: row[:3])
+    return {"candidates": [row[3] for row in ranked[: max(1, top_k)]], "excluded": excluded}
+
+
+def _section_body(text: str, header: str) -> str:
+    """최종 답변에서 header 섹션 본문만 추출."""
+    start = text.find(header)
+    if start == -1:
+        return ""
+    start += len(header)
+    ends = [text.find(h, start) for h in REQUIRED_HEADERS if text.find(h, start) != -1]
+    return text[start : min(ends) if ends else len(text)].strip()
+
+
+def _none_lines(body: str) -> List[bool]:
+    """섹션 본문의 줄마다 "해당 없음"류 문장인지 (글머리표·강조 표시 제거 후 줄 전체로 판단)."""
+    lines = [_BULLET_RE.sub("", line.strip().replace("**", "")).strip() for line in body.splitlines()]
+    return [bool(_NONE_LINE_RE.match(line)) for line in lines if line]
+
+
+def _status(evaluated: Dict[str, Any]) -> str:
+    """평가 결과 → 신청 가능 / 판단 필요 / 신청 불가."""
+    verdict = evaluated.get("prescreen")
+    if verdict is not None:
+        return APPLICABLE if any(s["eligible"] for s in verdict["sections"]) else NOT_APPLICABLE
+    none_lines = _none_lines(_section_body(evaluated.get("result") or "", REQUIRED_HEADERS[1]))
+    if not none_lines:
+        return UNDECIDED
+    if all(none_lines):
+        return NOT_APPLICABLE
+    if any(none_lines):  # "없습니다" + 조건부 안내가 섞인 경우
+        return UNDECIDED
+    return UNDECIDED if evaluated.get("questions") else APPLICABLE
+
+
+async def amatch_catalog(
+    profile: str,
+    catalog: Catalog,
+    top_k: int = CATALOG_TOP_K,
+    max_concurrency: int = CATALOG_WORKERS,
+) -> Dict[str, Any]:
+    """프로필 1개를 카탈로그 전체와 대조하여 정책 순위 목록 반환.
+
+    Args:
+        profile: 사용자 프로필 문자열
+        catalog: load_catalog 결과
+        top_k: 전체 분석(Plan → Final)할 후보 수
+        max_concurrency: 동시에 분석할 정책 수
+
+    Returns:
+        {"structured_profile", "policies": [{"rank", "name", "pack", "status", "score",
+         "structured_profile", "plan", "questions", "result", ...}], "excluded": [{"name", "pack", "score"}],
+         "total": 카탈로그 정책 수}
+    """
+    profile_for_prompts = await _aget_structured_profile(profile)  # 정책마다 다시 구조화하지 않도록 1회
+    selection = shortlist(catalog, profile_for_prompts, top_k)
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def _evaluate(candidate: Dict[str, Any]) -> Dict[str, Any]:
+        entry = catalog.entries[candidate["index"]]
+        header = {"name": entry["name"], "pack": entry["path"], "score": candidate["score"]}
+        async with semaphore:
+            try:
+                evaluated = await aevaluate_profile(
+                    profile_for_prompts, entry["policy"], entry["ie_extract"], structured=True
+                )
+            except Exception as exc:  # 정책 1건 실패가 전체 매칭을 멈추지 않도록
+                return {**header, "status": UNDECIDED, "error": f"{type(exc).__name__}: {exc}"}
+        return {**header, "status": _status(evaluated), **evaluated}
+
+    evaluated = await asyncio.gather(*(_evaluate(c) for c in selection["candidates"]))
+    order = {c["index"]: position for position, c in enumerate(selection["candidates"])}
+    policies = sorted(
+        zip(selection["candidates"], evaluated),
+        key=lambda pair: (_STATUS_ORDER[pair[1]["status"]], order[pair[0]["index"]]),
+    )
+    return {
+        "structured_profile": profile_for_prompts,
+        "policies": [{"rank": rank, **result} for rank, (_, result) in enumerate(policies, 1)],
+        "excluded": [
+            {"name": catalog.entries[e["index"]]["name"], "pack": catalog.entries[e["index"]]["path"], "score": e["score"]}
+            for e in selection["excluded"]
+        ],
+        "total": len(catalog),
+    }
+
+
+def match_catalog(
+    profile: str,
+    catalog: Catalog,
+    top_k: int = CATALOG_TOP_K,
+    max_concurrency: int = CATALOG_WORKERS,
+) -> Dict[str, Any]:
+    """amatch_catalog의 동기 래퍼 (CLI용. 이미 이벤트 루프 안이면 amatch_catalog를 직접 await)."""
+
+    async def _run() -> Dict[str, Any]:
+        try:
+            return await amatch_catalog(profile, catalog, top_k=top_k, max_concurrency=max_concurrency)
+        finally:
+            await aclose_clients()  # 이 루프의 클라이언트는 루프가 끝나면 쓸 수 없으므로 닫고 종료
+
+    return asyncio.run(_run())
+
+
+def format_matches(matches: Dict[str, Any]) -> str:
+    """매칭 결과 → 터미널 출력용 텍스트 (정책별 기존 5개 섹션 답변 포함)."""
+    lines = [
+        f"📚 정책 {matches['total']}건 중 {len(matches['policies'])}건 분석"
+        f" (사전 판정 제외 {len(matches['excluded'])}건)",
+    ]
+    for item in matches["policies"]:
+        lines.append(f"\n{'=' * 60}\n{item['rank']}. {item['name']} — {item['status']} (관련도 {item['score']})")
+        lines.append(f"   팩: {item['pack']}")
+        if item.get("error"):
+            lines.append(f"   ⚠️ 분석 실패: {item['error']}")
+            continue
+        lines.append("")
+        lines.append(item["result"])
+    if matches["excluded"]:
+        lines.append(f"\n{'=' * 60}\n🚫 사전 판정으로 제외된 정책:")
+        lines.extend(f"- {e['name']} ({e['pack']})" for e in matches["excluded"])
+    return "\n".join(lines)
@@ -17,3 +17,98 @@ if not UPSTAGE_BASE_URL:
     raise ValueError("UPSTAGE_BASE_URL 환경변수가 필요합니다.")
 if not SOLAR_MODEL:
     raise ValueError("SOLAR_MODEL 환경변수가 필요합니다.")
+
+# 로컬 캐시 (선택). 기본 위치: 프로젝트 루트의 .cache/
+CACHE_DIR = os.getenv(
+    "POLICY_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache"),
+)
+# Document Parse 결과 캐시. "0"이면 비활성화
+PARSE_CACHE_ENABLED = os.getenv("PARSE_CACHE_ENABLED", "1") != "0"
+PARSE_CACHE_MAX_MB = int(os.getenv("PARSE_CACHE_MAX_MB", "512"))
+PARSE_CACHE_MAX_ENTRIES = int(os.getenv("PARSE_CACHE_MAX_ENTRIES", "200"))
+# Information Extraction 결과 캐시. 키에 IE 스키마 지문이 포함되어 스키마 변경 시 자동 무효화
+IE_CACHE_ENABLED = os.getenv("IE_CACHE_ENABLED", "1") != "0"
+IE_CACHE_TTL_HOURS = float(os.getenv("IE_CACHE_TTL_HOURS", "168"))
+IE_CACHE_MAX_ENTRIES = int(os.getenv("IE_CACHE_MAX_ENTRIES", "200"))
+# Solar 응답 캐시 (선택, 기본 꺼짐). 같은 프롬프트·모델·temperature·reasoning_effort 요청의 응답 재사용
+SOLAR_CACHE_ENABLED = os.getenv("SOLAR_CACHE_ENABLED", "0") == "1"
+# 캐시를 적용할 단계 (쉼표 구분, "*"이면 전체). 단계 이름은 tracing.traced_stage 기준
+SOLAR_CACHE_STAGES = {
+    stage.strip()
+    for stage in os.getenv("SOLAR_CACHE_STAGES", "profile_parse,question_filter,answer_extract").split(",")
+    if stage.strip()
+}
+# 이 값보다 temperature가 높은 요청은 캐시하지 않음 (응답 다양성이 의미 있는 요청)
+SOLAR_CACHE_MAX_TEMPERATURE = float(os.getenv("SOLAR_CACHE_MAX_TEMPERATURE", "0.3"))
+SOLAR_CACHE_MEMORY_ENTRIES = int(os.getenv("SOLAR_CACHE_MEMORY_ENTRIES", "1000"))
+SOLAR_CACHE_MAX_ENTRIES = int(os.getenv("SOLAR_CACHE_MAX_ENTRIES", "50000"))
+SOLAR_CACHE_TTL_HOURS = float(os.getenv("SOLAR_CACHE_TTL_HOURS", "168"))
+
+# 대용량 PDF 분할 파싱 (pypdf 필요). 페이지 수가 PARSE_SPLIT_MIN_PAGES를 넘으면 PARSE_SPLIT_PAGES쪽씩 나누어 동시 파싱
+PARSE_SPLIT_ENABLED = os.getenv("PARSE_SPLIT_ENABLED", "1") != "0"
+PARSE_SPLIT_MIN_PAGES = int(os.getenv("PARSE_SPLIT_MIN_PAGES", "40"))
+PARSE_SPLIT_PAGES = int(os.getenv("PARSE_SPLIT_PAGES", "20"))
+PARSE_SPLIT_WORKERS = int(os.getenv("PARSE_SPLIT_WORKERS", "4"))
+# 구간 1개가 (요청 단위 재시도 후에도) 실패했을 때 그 구간만 다시 시도하는 횟수
+PARSE_RANGE_RETRIES = int(os.getenv("PARSE_RANGE_RETRIES", "1"))
+
+# Upstage HTTP 커넥션 풀 (프로세스 단위 공유 클라이언트)
+UPSTAGE_POOL_MAX_CONNECTIONS = int(os.getenv("UPSTAGE_POOL_MAX_CONNECTIONS", "50"))
+UPSTAGE_POOL_MAX_KEEPALIVE = int(os.getenv("UPSTAGE_POOL_MAX_KEEPALIVE", "20"))
+UPSTAGE_KEEPALIVE_EXPIRY = float(os.getenv("UPSTAGE_KEEPALIVE_EXPIRY", "60"))
+UPSTAGE_CONNECT_TIMEOUT = float(os.getenv("UPSTAGE_CONNECT_TIMEOUT", "10"))
+UPSTAGE_READ_TIMEOUT = float(os.getenv("UPSTAGE_READ_TIMEOUT", "600"))
+
+# 재시도: 429/5xx/연결 오류 시 지터를 넣은 지수 백오프 (Retry-After 헤더가 있으면 따름)
+UPSTAGE_MAX_RETRIES = int(os.getenv("UPSTAGE_MAX_RETRIES", "3"))
+UPSTAGE_RETRY_BASE_DELAY = float(os.getenv("UPSTAGE_RETRY_BASE_DELAY", "0.5"))
+UPSTAGE_RETRY_MAX_DELAY = float(os.getenv("UPSTAGE_RETRY_MAX_DELAY", "20"))
+# Solar 헤지 요청 (선택, 기본 꺼짐): 응답이 최근 p95 지연을 넘기면 같은 요청을 한 번 더 보내 먼저 온 응답 사용
+SOLAR_HEDGE_ENABLED = os.getenv("SOLAR_HEDGE_ENABLED", "0") == "1"
+SOLAR_HEDGE_MIN_SAMPLES = int(os.getenv("SOLAR_HEDGE_MIN_SAMPLES", "20"))
+SOLAR_HEDGE_INITIAL_DELAY = float(os.getenv("SOLAR_HEDGE_INITIAL_DELAY", "20"))
+SOLAR_HEDGE_MIN_DELAY = float(os.getenv("SOLAR_HEDGE_MIN_DELAY", "2"))
+# 단계별 마감 시간(초). 예: "plan=90,replan=60,final=180" (단계 이름은 tracing.traced_stage 기준)
+STAGE_DEADLINES = {
+    name.strip(): float(seconds)
+    for name, _, seconds in (
+        item.partition("=") for item in os.getenv("STAGE_DEADLINES", "").split(",") if "=" in item
+    )
+}
+
+# 클라이언트 측 속도 제한 (프로세스 전체 공유). RPS/TPM은 0이면 제한 없음, 동시 요청 수는 0이면 무제한
+SOLAR_RPS = float(os.getenv("SOLAR_RPS", "0"))
+SOLAR_TPM = float(os.getenv("SOLAR_TPM", "0"))
+SOLAR_MAX_CONCURRENCY = int(os.getenv("SOLAR_MAX_CONCURRENCY", "16"))
+DOCUMENT_PARSE_RPS = float(os.getenv("DOCUMENT_PARSE_RPS", "0"))
+DOCUMENT_PARSE_MAX_CONCURRENCY = int(os.getenv("DOCUMENT_PARSE_MAX_CONCURRENCY", "4"))
+IE_RPS = float(os.getenv("IE_RPS", "0"))
+IE_MAX_CONCURRENCY = int(os.getenv("IE_MAX_CONCURRENCY", "4"))
+
+# 정책 팩 조건식으로 결론이 분명한 프로필은 Plan/Final LLM 호출 없이 템플릿 답변 ("0"이면 항상 LLM)
+PRESCREEN_ENABLED = os.getenv("PRESCREEN_ENABLED", "1") != "0"
+
+# 카탈로그 매칭: 1차 로컬 선별 후 전체 분석(Plan → Final)할 정책 수, 동시에 분석할 정책 수
+CATALOG_TOP_K = int(os.getenv("CATALOG_TOP_K", "5"))
+CATALOG_WORKERS = int(os.getenv("CATALOG_WORKERS", "4"))
+
+# 서버 모드 (serve 명령): 서비스할 정책 PDF / 정책 팩 경로 (쉼표 구분, 비우면 기본 PDF)
+SERVER_POLICIES = [p.strip() for p in os.getenv("SERVER_POLICIES", "").split(",") if p.strip()]
+# 세션 상태 보관: 마지막 요청 후 유지 시간(분), 프로세스당 최대 세션 수 (넘으면 오래된 것부터 삭제)
+SESSION_TTL_MINUTES = float(os.getenv("SESSION_TTL_MINUTES", "30"))
+SESSION_MAX_COUNT = int(os.getenv("SESSION_MAX_COUNT", "10000"))
+# 서버 시작 시 정책 미리 로드 ("0"이면 처음 요청될 때 로드), 정책 파일 변경 확인 최소 간격(초, 음수면 확인 안 함)
+POLICY_PRELOAD = os.getenv("POLICY_PRELOAD", "1") != "0"
+POLICY_CHECK_SECONDS = float(os.getenv("POLICY_CHECK_SECONDS", "5"))
+
+# 프롬프트 예산: Plan/Final 프롬프트 입력 토큰(추정) 상한. 정책 본문 길이를 남은 예산에 맞추고
+# 본문과 중복되는 IE 필드, Final에 불필요한 Plan 질문 목록을 제외. 예산이 모자라면 정책 본문이 줄어들어
+# 답변 품질에 영향을 줄 수 있으므로 기본은 끔 ("1"이면 사용, 본문이 잘리면 경고 로그)
+PROMPT_BUDGET_ENABLED = os.getenv("PROMPT_BUDGET_ENABLED", "0") == "1"
+PLAN_PROMPT_TOKENS = int(os.getenv("PLAN_PROMPT_TOKENS", "5000"))
+FINAL_PROMPT_TOKENS = int(os.getenv("FINAL_PROMPT_TOKENS", "6000"))
+
+# Plan이 질문 필터링까지 수행 (프로필에 있는 항목을 함께 전달 + field 이름 로컬 대조).
+# 로컬로 판단할 수 없는 질문이 있을 때만 질문 필터 Solar 호출 ("0"이면 항상 별도 호출)
+PLAN_FILTERS_QUESTIONS = os.getenv("PLAN_FILTERS_QUESTIONS", "1") != "0"
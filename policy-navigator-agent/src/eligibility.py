@@ -0,0 +1,212 @@
+"""규칙 기반 자격 사전 판정 (prescreen)
+
+정책 팩의 자격 조건 중 나이·소득·지역처럼 기준이 분명한 조건은 ingest 때 한 번 Solar로
+구조화된 조건식(predicate)으로 변환해 두고, 세션에서는 규칙으로 파싱된 프로필을 로컬에서 대조합니다.
+정책(섹션)마다 결론이 분명할 때만 판정하고, 하나라도 애매하면 None → 기존 Plan/Final로 진행합니다.
+
+조건식 형식 (금액 단위: 만원):
+    {"condition_id": "C1", "field": "나이", "op": "range", "min": 19, "max": 34}
+    {"condition_id": "C3", "field": "지역", "op": "in", "values": ["서울", "경기", "인천"]}
+    {"condition_id": "C4", "field": "혼인상태", "op": "in", "values": ["신혼"], "either": true}
+
+AND/OR 구성:
+- 조건 1개의 조건식들은 모두 충족해야 함. 단 "either": true인 조건식끼리는 하나만 충족하면 됨
+  (예: "만 34세 이하 청년 또는 신혼부부" → 나이 range + 혼인상태 in, 둘 다 either)
+- 섹션 안에서 group이 같은(빈 문자열 제외) 조건끼리는 대안 — 하나만 충족하면 됨 (예: "소득 A 이하 또는 자산 B 이하").
+  group이 빈 조건은 모두 충족해야 함
+
+판정 원칙 (보수적):
+- 숫자 조건(range): 프로필 값이 있으면 충족/미충족 확정
+- 지역: 광역 단위로 펼쳐 비교 (수도권 = 서울·경기·인천). 일부만 겹치면 판단 보류
+- 그 밖의 범주(직업 등): 표기가 달라도 같은 뜻일 수 있으므로 목록에 정확히 있을 때만 확정
+  (in이면 충족, not_in이면 미충족). 목록에 없으면 판단 보류
+- 결합은 3값 논리: AND는 하나라도 미충족이면 미충족, OR는 하나라도 충족이면 충족, 그 밖의 보류는 보류
+- 섹션 판정: 필수 조건(또는 대안 그룹)이 하나라도 미충족이면 미충족, 모두 충족이면 충족
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+from profile_parser import REGIONS
+
+
+NUMERIC_FIELDS = {"나이", "월소득", "연소득", "자녀"}
+CATEGORY_FIELDS = {"지역", "직업", "혼인상태", "주거"}
+OPS = {"range", "in", "not_in"}
+
+CAPITAL_AREA = {"서울", "경기", "인천"}
+_PROVINCES = REGIONS - {"수도권", "비수도권", "지방", "농어촌", "읍면"}
+_NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+
+
+def _number(value: Any) -> Optional[float]:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    match = _NUMBER_RE.search(str(value or "").replace(",", ""))
+    return float(match.group()) if match else None
+
+
+def _region_set(value: str) -> Optional[set]:
+    """지역 표기 → 광역시·도 집합 ("수도권" → {서울, 경기, 인천}). 알 수 없으면 None."""
+    compact = re.sub(r"\s+", "", str(value))
+    for suffix in ("특별자치시", "특별자치도", "특별시", "광역시", "시", "도"):
+        if compact.endswith(suffix) and compact[: -len(suffix)] in REGIONS:
+            compact = compact[: -len(suffix)]
+            break
+    if compact == "수도권":
+        return set(CAPITAL_AREA)
+    if compact in ("비수도권", "지방"):
+        return _PROVINCES - CAPITAL_AREA
+    if compact in _PROVINCES:
+        return {compact}
+    return None
+
+
+def predicates_from_output(items: Any, conditions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Solar가 만든 조건식 목록 검증. 형식이 맞지 않거나 없는 조건을 가리키면 버림."""
+    condition_ids = {c["id"] for c in conditions}
+    predicates = []
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict) or item.get("condition_id") not in condition_ids:
+            continue
+        field, op = item.get("field"), item.get("op")
+        if op not in OPS or field not in NUMERIC_FIELDS | CATEGORY_FIELDS:
+            continue
+        predicate: Dict[str, Any] = {"condition_id": item["condition_id"], "field": field, "op": op}
+        if item.get("either") is True:
+            predicate["either"] = True
+        if op == "range":
+            if field not in NUMERIC_FIELDS:
+                continue
+            low, high = _number(item.get("min")), _number(item.get("max"))
+            if low is None and high is None:
+                continue
+            predicate.update(min=low, max=high)
+        else:
+            values = [str(v).strip() for v in item.get("values") or [] if str(v).strip()]
+            if field not in CATEGORY_FIELDS or not values:
+                continue
+            if field == "지역" and any(_region_set(v) is None for v in values):
+                continue
+            predicate["values"] = values
+        predicates.append(predicate)
+    return predicates
+
+
+def _profile_number(profile: Dict[str, str], field: str) -> Optional[float]:
+    """프로필의 숫자 값. 월소득/연소득은 다른 쪽에서 환산."""
+    if field in profile:
+        return _number(profile[field])
+    if field == "월소득" and "연소득" in profile:
+        annual = _number(profile["연소득"])
+        return annual / 12 if annual is not None else None
+    if field == "연소득" and "월소득" in profile:
+        monthly = _number(profile["월소득"])
+        return monthly * 12 if monthly is not None else None
+    return None
+
+
+def evaluate_predicate(predicate: Dict[str, Any], profile: Dict[str, str]) -> Optional[bool]:
+    """조건식 1개 평가: True(충족) / False(미충족) / None(판단 보류)."""
+    field, op = predicate["field"], predicate["op"]
+    if op == "range":
+        value = _profile_number(profile, field)
+        if value is None:
+            return None
+        low, high = predicate.get("min"), predicate.get("max")
+        return (low is None or value >= low) and (high is None or value <= high)
+
+    raw = profile.get(field)
+    if raw is None:
+        return None
+    if field == "지역":
+        have = _region_set(raw)
+        if have is None:
+            return None
+        allowed = set().union(*(_region_set(v) for v in predicate["values"]))
+        inside = True if have <= allowed else False if not (have & allowed) else None
+        if inside is None:
+            return None
+        return inside if op == "in" else not inside
+    listed = str(raw).strip() in predicate["values"]
+    if not listed:
+        return None
+    return op == "in"
+
+
+def _all(outcomes: List[Optional[bool]]) -> Optional[bool]:
+    """3값 AND: 미충족이 있으면 False, 모두 충족이면 True, 그 밖에는 None."""
+    if False in outcomes:
+        return False
+    return True if outcomes and all(outcomes) else None
+
+
+def _any(outcomes: List[Optional[bool]]) -> Optional[bool]:
+    """3값 OR: 충족이 있으면 True, 모두 미충족이면 False, 그 밖에는 None."""
+    if True in outcomes:
+        return True
+    return False if outcomes and all(o is False for o in outcomes) else None
+
+
+def evaluate_condition(predicates: List[Dict[str, Any]], profile: Dict[str, str]) -> Optional[bool]:
+    """조건 1개의 조건식들을 결합: either가 아닌 조건식 AND (either 조건식들의 OR). 조건식이 없으면 None."""
+    required = [evaluate_predicate(p, profile) for p in predicates if not p.get("either")]
+    alternatives = [evaluate_predicate(p, profile) for p in predicates if p.get("either")]
+    if alternatives:
+        required.append(_any(alternatives))
+    return _all(required)
+
+
+def prescreen(
+    profile: Dict[str, str],
+    conditions: List[Dict[str, Any]],
+    predicates: List[Dict[str, Any]],
+) -> Optional[Dict[str, Any]]:
+    """정책(섹션)별 자격 판정. 모든 섹션의 결론이 분명할 때만 결과, 아니면 None.
+
+    Args:
+        profile: parse_profile_rules 형식의 프로필 dict
+        conditions: 정책 팩 자격 조건 목록 (group이 같은 조건끼리는 대안)
+        predicates: predicates_from_output 결과
+
+    Returns:
+        {"sections": [{"section", "eligible", "met": [...], "failed": [...]}]}
+        met / failed 항목은 {"condition", "field", "value"}. 대안 그룹은 충족 시 충족한 조건만,
+        미충족 시 그룹의 모든 조건을 기록
+    """
+    if not profile or not conditions or not predicates:
+        return None
+    by_condition: Dict[str, List[Dict[str, Any]]] = {}
+    for predicate in predicates:
+        by_condition.setdefault(predicate["condition_id"], []).append(predicate)
+
+    # 섹션 → 항(term) 목록. 항 = 필수 조건 1개 또는 같은 group의 대안 조건 묶음
+    sections: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+    for condition in conditions:
+        terms = sections.setdefault(condition.get("section") or "", {})
+        group = str(condition.get("group") or "").strip()
+        terms.setdefault(f"group:{group}" if group else f"id:{condition['id']}", []).append(condition)
+
+    results = []
+    for name, terms in sections.items():
+        met: List[Dict[str, Any]] = []
+        failed: List[Dict[str, Any]] = []
+        term_outcomes = []
+        for members in terms.values():
+            outcomes = [evaluate_condition(by_condition.get(c["id"], []), profile) for c in members]
+            outcome = _any(outcomes)
+            term_outcomes.append(outcome)
+            if outcome is True:
+                met.extend(_entry(c, profile) for c, o in zip(members, outcomes) if o is True)
+            elif outcome is False:
+                failed.extend(_entry(c, profile) for c in members)
+        eligible = _all(term_outcomes)
+        if eligible is None:
+            return None
+        results.append({"section": name, "eligible": eligible, "met": met, "failed": failed})
+    return {"sections": results}
+
+
+def _entry(condition: Dict[str, Any], profile: Dict[str, str]) -> Dict[str, Any]:
+    field = condition.get("field") or ""
+    return {"condition": condition["condition"], "field": field, "value": profile.get(field, "")}
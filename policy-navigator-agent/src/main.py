@@ -1,19 +1,173 @@
-from typing import Optional
+import json
+import os
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
 
 import typer
 
-from agent import run
+from agent import DEFAULT_PDF_PATH, _resolve_pdf_path, ingest_policy, load_policy, load_policy_pack, run
+from batch import run_batch
+from catalog import format_matches, load_catalog, match_catalog
+from config import CATALOG_TOP_K, CATALOG_WORKERS
+from policy_pack import save_pack
+from prefix_check import compare_sessions, format_report
+from tracing import tracer
+from upstage_client import close_clients, limiter_stats, solar_cache_stats
 
 app = typer.Typer(add_completion=False)
 
+TRACE_HELP = "단계별 API 호출 시간·토큰·전송량 요약 표 출력"
+TRACE_FILE_HELP = "API 호출 span을 JSONL(OpenTelemetry 필드명)로 저장할 경로"
+PACK_HELP = "정책 팩 경로 (ingest로 생성, 지정 시 --pdf 대신 사용하며 파싱/IE 생략)"
 
-@app.command()
+
+def _check_source(pdf: Optional[str], pack: Optional[str]) -> None:
+    if pdf and pack:
+        raise typer.BadParameter("--pdf와 --pack은 함께 사용할 수 없습니다.", param_hint="--pack")
+
+
+@contextmanager
+def _tracing(trace: bool, trace_file: Optional[str]) -> Iterator[None]:
+    """--trace / --trace-file 지정 시 계측을 켜고, 종료 시 요약 출력·파일 저장."""
+    if not (trace or trace_file):
+        yield
+        return
+    if trace_file:
+        open(trace_file, "w", encoding="utf-8").close()  # span은 기록될 때마다 이어 씀 (중단돼도 남음)
+    tracer.enable(sink_path=trace_file)
+    try:
+        yield
+    finally:
+        tracer.disable()
+        if trace_file:
+            print(f"🧭 span {len(tracer.spans())}건 저장 → {trace_file}")
+        if trace:
+            print("\n" + tracer.format_summary())
+            cache_stats = solar_cache_stats()
+            if cache_stats is not None:
+                print(f"Solar 응답 캐시: {cache_stats}")
+            for name, stats in limiter_stats().items():
+                if stats["waited"]:
+                    print(f"대기열 {name}: {stats['waited']}회 대기, 평균 {stats['avg_wait_s']}초, 최대 {stats['max_wait_s']}초")
+
+
+@app.callback(invoke_without_command=True)
 def main(
-    profile: str = typer.Option(..., "--profile", help="사용자 프로필 문자열 (예: '29세/수도권/중소기업/월250/미혼')"),
+    ctx: typer.Context,
+    profile: Optional[str] = typer.Option(None, "--profile", help="사용자 프로필 문자열 (예: '29세/수도권/중소기업/월250/미혼')"),
     pdf: Optional[str] = typer.Option(None, "--pdf", help="정책 PDF 경로 (기본: data/finance_policy.pdf. 예: data/transportation_policy.pdf)"),
+    pack: Optional[str] = typer.Option(None, "--pack", help=PACK_HELP),
+    stream: bool = typer.Option(False, "--stream", help="최종 상담 결과를 생성되는 대로 바로 출력"),
+    trace: bool = typer.Option(False, "--trace", help=TRACE_HELP),
+    trace_file: Optional[str] = typer.Option(None, "--trace-file", help=TRACE_FILE_HELP),
+) -> None:
+    if ctx.invoked_subcommand is not None:
+        return
+    if not profile:
+        raise typer.BadParameter("--profile 옵션이 필요합니다.", param_hint="--profile")
+    _check_source(pdf, pack)
+    with _tracing(trace, trace_file):
+        result = run(profile=profile, pdf_path=pdf, stream=stream, pack_path=pack)
+        if not stream:  # 스트리밍 모드는 이미 출력됨
+            print(result)
+
+
+@app.command()
+def batch(
+    profiles: str = typer.Option(..., "--profiles", help="프로필 목록 파일 (JSONL 또는 CSV, CSV는 'profile' 컬럼 필수)"),
+    output: str = typer.Option(..., "--output", help="결과 JSONL 파일 경로"),
+    pdf: Optional[str] = typer.Option(None, "--pdf", help="정책 PDF 경로 (기본: data/finance_policy.pdf)"),
+    pack: Optional[str] = typer.Option(None, "--pack", help=PACK_HELP),
+    workers: int = typer.Option(4, "--workers", help="동시에 평가할 프로필 수"),
+    trace: bool = typer.Option(False, "--trace", help=TRACE_HELP),
+    trace_file: Optional[str] = typer.Option(None, "--trace-file", help=TRACE_FILE_HELP),
+) -> None:
+    """여러 프로필을 비대화형으로 평가 (PDF 파싱은 1회)."""
+    _check_source(pdf, pack)
+    with _tracing(trace, trace_file):
+        try:
+            count = run_batch(
+                profiles_path=profiles, output_path=output, pdf_path=pdf, max_workers=workers, pack_path=pack
+            )
+        finally:
+            close_clients()  # 배치는 동기 클라이언트만 사용
+        print(f"✅ {count}건 평가 완료 → {output}")
+
+
+@app.command()
+def ingest(
+    pdf: Optional[str] = typer.Option(None, "--pdf", help="정책 PDF 경로 (기본: data/finance_policy.pdf)"),
+    output: Optional[str] = typer.Option(None, "--output", help="정책 팩 저장 경로 (기본: PDF와 같은 위치의 <이름>.pack.json)"),
+    trace: bool = typer.Option(False, "--trace", help=TRACE_HELP),
+    trace_file: Optional[str] = typer.Option(None, "--trace-file", help=TRACE_FILE_HELP),
 ) -> None:
-    result = run(profile=profile, pdf_path=pdf)
-    print(result)
+    """정책 PDF를 한 번 처리하여 정책 팩 생성 (파싱·IE·청크·자격 조건 목록)."""
+    with _tracing(trace, trace_file):
+        pack = ingest_policy(pdf)
+    output = output or f"{os.path.splitext(os.path.normpath(pdf or DEFAULT_PDF_PATH))[0]}.pack.json"
+    save_pack(pack, output)
+    print(f"✅ 정책 팩 저장 → {output} (청크 {len(pack['chunks'])}개, 자격 조건 {len(pack['conditions'])}개)")
+
+
+@app.command()
+def catalog(
+    profile: str = typer.Option(..., "--profile", help="사용자 프로필 문자열"),
+    packs: List[str] = typer.Option(..., "--packs", help="정책 팩 파일 또는 *.pack.json이 있는 디렉터리 (여러 번 지정 가능)"),
+    top_k: int = typer.Option(CATALOG_TOP_K, "--top-k", help="1차 선별 후 전체 분석(Plan → Final)할 정책 수"),
+    workers: int = typer.Option(CATALOG_WORKERS, "--workers", help="동시에 분석할 정책 수"),
+    output: Optional[str] = typer.Option(None, "--output", help="결과 JSON 저장 경로 (지정 시 터미널에는 요약만 출력)"),
+    trace: bool = typer.Option(False, "--trace", help=TRACE_HELP),
+    trace_file: Optional[str] = typer.Option(None, "--trace-file", help=TRACE_FILE_HELP),
+) -> None:
+    """프로필 1개를 정책 팩 여러 개와 대조하여 신청 가능한 정책 순위 출력."""
+    policies = load_catalog(packs)
+    with _tracing(trace, trace_file):
+        matches = match_catalog(profile, policies, top_k=top_k, max_concurrency=workers)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(matches, f, ensure_ascii=False, indent=2)
+        for item in matches["policies"]:
+            print(f"{item['rank']}. {item['name']} — {item['status']} (관련도 {item['score']})")
+        print(f"✅ 결과 저장 → {output}")
+    else:
+        print(format_matches(matches))
+
+
+@app.command("prefix-check")
+def prefix_check(
+    profiles: List[str] = typer.Option(..., "--profile", help="비교할 프로필 2개 (--profile을 두 번 지정)"),
+    pdf: Optional[str] = typer.Option(None, "--pdf", help="정책 PDF 경로 (기본: data/finance_policy.pdf)"),
+    pack: Optional[str] = typer.Option(None, "--pack", help=PACK_HELP),
+) -> None:
+    """두 세션의 Plan/재분석/Final 프롬프트 공통 접두부 길이 보고 (서버 측 prefix 캐시 재사용 가능량)."""
+    if len(profiles) != 2:
+        raise typer.BadParameter("--profile을 정확히 두 번 지정하세요.", param_hint="--profile")
+    _check_source(pdf, pack)
+    policy, ie_extract = load_policy_pack(pack) if pack else load_policy(_resolve_pdf_path(pdf))
+    print(format_report(compare_sessions(policy, ie_extract, profiles[0], profiles[1])))
+
+
+@app.command()
+def serve(
+    policy: List[str] = typer.Option([], "--policy", help="서비스할 정책 PDF 또는 정책 팩 경로 (여러 번 지정 가능, 기본: SERVER_POLICIES 또는 기본 PDF)"),
+    host: str = typer.Option("127.0.0.1", "--host", help="바인드 주소"),
+    port: int = typer.Option(8000, "--port", help="포트"),
+    workers: int = typer.Option(1, "--workers", help="워커 프로세스 수 (2 이상이면 세션 저장소를 외부 저장소로 교체 권장)"),
+) -> None:
+    """HTTP 서버 모드: 대화형 질문 루프를 요청 단위로 처리 (ASGI, uvicorn 필요)."""
+    try:
+        import uvicorn
+    except ImportError:
+        raise typer.BadParameter("서버 모드에는 uvicorn이 필요합니다: pip install uvicorn") from None
+    if workers > 1:
+        # 워커 프로세스는 설정을 다시 읽으므로 정책 목록을 환경 변수로 전달
+        if policy:
+            os.environ["SERVER_POLICIES"] = ",".join(os.path.abspath(p) for p in policy)
+        uvicorn.run("server:create_app", factory=True, host=host, port=port, workers=workers)
+    else:
+        from server import create_app
+
+        uvicorn.run(create_app(list(policy) or None), host=host, port=port)
 
 
 if __name__ == "__main__":
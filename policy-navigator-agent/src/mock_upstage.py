@@ -0,0 +1,374 @@
+"""Upstage API 오프라인 대역 (벤치마크·개발용 로컬 HTTP 서버)
+
+UPSTAGE_BASE_URL을 이 서버 주소로 지정하면 Document Parse / Information Extraction / Solar
+요청을 실제 API 대신 로컬에서 응답합니다. 응답에는 지정한 지연 시간(초)을 넣어
+네트워크·모델 처리 시간을 흉내 냅니다.
+
+- replay: 녹화된 응답(recordings 디렉터리)이 있으면 그대로 재생하고, 없으면 요청 종류별 기본 응답 사용
+- record: upstream(실제 Upstage API)으로 요청을 전달하고 응답을 녹화한 뒤 그대로 돌려줌
+
+녹화 키는 요청 경로 + 본문(멀티파트는 파트별 내용) 해시이므로, 프롬프트가 바뀌면 새로 녹화해야 합니다.
+Solar 스트리밍 요청(stream=true)은 SSE 이벤트 단위로 나누어 전송합니다.
+"""
+
+import email.parser
+import email.policy
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+
+# 요청 종류별 기본 지연 시간 (초). 실제 API 관측치를 대략 반영
+DEFAULT_LATENCY = {
+    "document_parse": 3.0,
+    "information_extract": 4.0,
+    "solar": 1.5,
+}
+# 스트리밍 응답에서 SSE 이벤트 사이 간격 (초)
+DEFAULT_STREAM_CHUNK_DELAY = 0.02
+
+
+def _endpoint(path: str, body: Dict[str, Any]) -> str:
+    if "document-digitization" in path:
+        return "document_parse"
+    if "information-extraction" in path or body.get("model") == "information-extract":
+        return "information_extract"
+    return "solar"
+
+
+def _multipart_parts(content_type: str, body: bytes) -> Dict[str, bytes]:
+    """multipart/form-data 본문을 {필드명: 내용}으로 분리."""
+    message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode("latin-1") + body
+    )
+    parts: Dict[str, bytes] = {}
+    for part in message.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        if name:
+            parts[name] = part.get_payload(decode=True) or b""
+    return parts
+
+
+def request_key(path: str, content_type: str, body: bytes) -> str:
+    """녹화 키: 경로 + 본문 해시 (멀티파트 경계 문자열처럼 매번 바뀌는 값은 제외)."""
+    digest = hashlib.sha256(path.encode("utf-8"))
+    if content_type.startswith("multipart/form-data"):
+        for name, payload in sorted(_multipart_parts(content_type, body).items()):
+            digest.update(name.encode("utf-8"))
+            digest.update(hashlib.sha256(payload).digest())
+    else:
+        try:
+            digest.update(json.dumps(json.loads(body), sort_keys=True, ensure_ascii=False).encode("utf-8"))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            digest.update(body)
+    return digest.hexdigest()
+
+
+class Recordings:
+    """녹화 응답 저장소: 키 1개 = JSON 파일 1개 ({"status", "content_type", "body"})."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, self._path(key))
+
+
+# ---------------------------------------------------------------------------
+# 기본 응답 (녹화가 없을 때). 프롬프트 마지막 Query 문장으로 요청 종류를 구분
+# ---------------------------------------------------------------------------
+
+_CANNED_QUESTIONS = [
+    {"field": "주택소유여부", "question": "현재 주택을 소유하고 있나요?"},
+    {"field": "기존지원수혜여부", "question": "다른 청년 지원사업을 받고 있나요?"},
+]
+_CANNED_PLAN = {
+    "certain_conditions": ["연령: 만 19~34세 청년 요건 충족", "소득: 기준 이하로 판단"],
+    "uncertain_conditions": ["주택 소유 여부: 프로필에 정보 없음"],
+    "questions": _CANNED_QUESTIONS,
+    "action_candidates": ["청년 지원사업 신청 가능", "소득 증빙 서류 준비"],
+}
+_CANNED_CONDITIONS = [
+    {"category": "연령", "condition": "만 19세 이상 34세 이하", "field": "나이", "section": "청년 지원사업", "group": ""},
+    {"category": "소득", "condition": "월소득 300만원 이하", "field": "월소득", "section": "청년 지원사업", "group": ""},
+    {"category": "주택", "condition": "무주택자", "field": "주택소유여부", "section": "청년 지원사업", "group": ""},
+]
+_CANNED_PREDICATES = [
+    {"condition_id": "C1", "field": "나이", "op": "range", "min": 19, "max": 34},
+    {"condition_id": "C2", "field": "월소득", "op": "range", "min": None, "max": 300},
+    {"condition_id": "C3", "field": "주거", "op": "in", "values": ["무주택"]},
+]
+_CANNED_FINAL = """[자격 판단]
+- **연령·소득 요건을 충족**합니다.
+
+[신청 가능 정책]
+- 청년 지원사업
+
+[예상 혜택]
+- 월 최대 10만원 지원
+
+[다음 단계]
+1. 온라인 신청서 작성
+2. 소득 증빙 서류 제출
+
+[확인 필요 사항]
+- 중복 수혜 여부를 확인하세요."""
+_CANNED_POLICY_ELEMENTS = [
+    ("heading1", "청년 지원사업 안내"),
+    ("paragraph", "지원 대상: 만 19세 이상 34세 이하 청년으로서 가구 소득이 기준 중위소득 150% 이하인 자."),
+    ("table", "구분 지원금액 지원기간 청년 월 10만원 최대 24개월"),
+    ("heading2", "신청 방법"),
+    ("paragraph", "주소지 관할 주민센터 또는 온라인 포털에서 신청하며 소득 증빙 서류를 제출해야 합니다."),
+    ("heading2", "제외 대상"),
+    ("paragraph", "주택을 소유한 자, 유사 청년 지원사업을 받고 있는 자는 제외됩니다."),
+]
+
+
+def _canned_document_parse() -> Dict[str, Any]:
+    elements = [
+        {"id": i, "category": category, "page": 1, "content": {"html": f"<p>{text}</p>", "text": text}}
+        for i, (category, text) in enumerate(_CANNED_POLICY_ELEMENTS)
+    ]
+    html = "".join(element["content"]["html"] for element in elements)
+    return {"api": "2.0", "model": "document-parse", "content": {"html": html}, "elements": elements}
+
+
+def _canned_solar_content(prompt: str) -> str:
+    if "JSON 객체로 변환하세요" in prompt:
+        return json.dumps({"나이": "29세", "지역": "수도권", "직업": "중소기업"}, ensure_ascii=False)
+    if "조건식 목록으로 변환하세요" in prompt:
+        return json.dumps({"predicates": _CANNED_PREDICATES}, ensure_ascii=False)
+    if "자격 조건 목록을 JSON으로 추출하세요" in prompt:
+        return json.dumps({"conditions": _CANNED_CONDITIONS}, ensure_ascii=False)
+    if "JSON 배열로 반환하세요" in prompt:
+        return json.dumps(_CANNED_QUESTIONS, ensure_ascii=False)
+    if "프로필 필드를 추출하여" in prompt:
+        return json.dumps({"주택소유여부": "아니오"}, ensure_ascii=False)
+    if "JSON을 생성하세요" in prompt:
+        return json.dumps(_CANNED_PLAN, ensure_ascii=False)
+    return _CANNED_FINAL
+
+
+def _chat_completion(content: str, prompt_chars: int) -> Dict[str, Any]:
+    return {
+        "id": "chatcmpl-offline",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": "offline",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+        "usage": {
+            "prompt_tokens": prompt_chars // 2,
+            "completion_tokens": len(content) // 2,
+            "total_tokens": prompt_chars // 2 + len(content) // 2,
+        },
+    }
+
+
+def _sse_body(completion: Dict[str, Any], pieces: int = 20) -> str:
+    """완성 응답을 OpenAI 스트리밍(SSE) 본문으로 변환 (마지막에 usage 청크)."""
+    content = completion["choices"][0]["message"]["content"]
+    size = max(1, -(-len(content) // pieces))
+    events = []
+    base = {"id": completion["id"], "object": "chat.completion.chunk", "created": completion["created"], "model": completion["model"]}
+    for start in range(0, len(content), size):
+        chunk = {**base, "choices": [{"index": 0, "delta": {"content": content[start : start + size]}, "finish_reason": None}]}
+        events.append(json.dumps(chunk, ensure_ascii=False))
+    events.append(json.dumps({**base, "choices": [], "usage": completion["usage"]}))
+    return "".join(f"data: {event}\n\n" for event in events) + "data: [DONE]\n\n"
+
+
+def _canned_response(endpoint: str, body: Dict[str, Any]) -> Dict[str, Any]:
+    """녹화가 없을 때 돌려줄 응답 ({"status", "content_type", "body"})."""
+    if endpoint == "document_parse":
+        payload = json.dumps(_canned_document_parse(), ensure_ascii=False)
+        return {"status": 200, "content_type": "application/json", "body": payload}
+    if endpoint == "information_extract":
+        schema = ((body.get("response_format") or {}).get("json_schema") or {}).get("schema") or {}
+        extracted = {name: ([] if spec.get("type") == "array" else "") for name, spec in (schema.get("properties") or {}).items()}
+        extracted.update({"program_name": "청년 지원사업", "target_eligibility": "만 19~34세 청년"})
+        completion = _chat_completion(json.dumps(extracted, ensure_ascii=False), 0)
+        return {"status": 200, "content_type": "application/json", "body": json.dumps(completion, ensure_ascii=False)}
+    prompt = "".join(str(m.get("content") or "") for m in body.get("messages") or [])
+    completion = _chat_completion(_canned_solar_content(prompt), len(prompt))
+    if body.get("stream"):
+        return {"status": 200, "content_type": "text/event-stream", "body": _sse_body(completion)}
+    return {"status": 200, "content_type": "application/json", "body": json.dumps(completion, ensure_ascii=False)}
+
+
+# ---------------------------------------------------------------------------
+# 서버
+# ---------------------------------------------------------------------------
+
+
+class MockUpstageServer:
+    """Upstage API 대역 서버.
+
+    Args:
+        recordings_dir: 녹화 응답 디렉터리 (None이면 항상 기본 응답)
+        latency: 요청 종류별 지연 시간(초) {"document_parse", "information_extract", "solar"}
+        stream_chunk_delay: 스트리밍 응답의 SSE 이벤트 간격(초)
+        upstream: 지정 시 record 모드. 실제 Upstage API 주소로 요청을 전달하고 응답을 녹화
+        api_key: record 모드에서 upstream으로 보낼 API 키
+        error_rate: replay 모드에서 503(Retry-After: 0)으로 응답할 확률 (재시도 동작 측정용)
+        slow_rate: replay 모드에서 지연 시간에 slow_factor를 곱할 확률 (꼬리 지연 측정용)
+        slow_factor: 느린 응답의 지연 시간 배율
+    """
+
+    def __init__(
+        self,
+        recordings_dir: Optional[str] = None,
+        latency: Optional[Dict[str, float]] = None,
+        stream_chunk_delay: float = DEFAULT_STREAM_CHUNK_DELAY,
+        upstream: Optional[str] = None,
+        api_key: Optional[str] = None,
+        error_rate: float = 0.0,
+        slow_rate: float = 0.0,
+        slow_factor: float = 10.0,
+    ) -> None:
+        self.recordings = Recordings(recordings_dir) if recordings_dir else None
+        self.latency = {**DEFAULT_LATENCY, **(latency or {})}
+        self.stream_chunk_delay = stream_chunk_delay
+        self.upstream = re.sub(r"/v1/?$", "", upstream.rstrip("/")) if upstream else None
+        self.api_key = api_key
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_factor = slow_factor
+        self.stats = {"requests": 0, "replayed": 0, "canned": 0, "recorded": 0, "injected_errors": 0, "slowed": 0}
+        self._stats_lock = threading.Lock()
+        self._upstream_client = httpx.Client(timeout=600) if upstream else None
+        self._httpd: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """백그라운드 스레드에서 서버 시작. base URL 반환 (port=0이면 빈 포트 자동 선택)."""
+        handler = type("_Handler", (_MockHandler,), {"server_state": self})
+        self._httpd = ThreadingHTTPServer((host, port), handler)
+        self._httpd.daemon_threads = True
+        threading.Thread(target=self._httpd.serve_forever, name="mock-upstage", daemon=True).start()
+        return self.base_url
+
+    def stop(self) -> None:
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+        if self._upstream_client is not None:
+            self._upstream_client.close()
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def respond(self, path: str, headers: Dict[str, str], body: bytes) -> Tuple[str, Dict[str, Any]]:
+        """요청 1건에 대한 (요청 종류, 응답) 결정."""
+        content_type = headers.get("content-type", "")
+        try:
+            parsed = json.loads(body) if content_type.startswith("application/json") else {}
+        except json.JSONDecodeError:
+            parsed = {}
+        endpoint = _endpoint(path, parsed)
+        key = request_key(path, content_type, body)
+        self._count("requests")
+
+        if self.upstream:
+            entry = self._forward(path, content_type, body)
+            if entry["status"] == 200 and self.recordings is not None:
+                self.recordings.put(key, entry)
+                self._count("recorded")
+            return endpoint, entry
+
+        if random.random() < self.error_rate:
+            self._count("injected_errors")
+            return endpoint, {"status": 503, "content_type": "application/json", "body": '{"error": "injected"}'}
+        entry = self.recordings.get(key) if self.recordings is not None else None
+        if entry is not None:
+            self._count("replayed")
+            return endpoint, entry
+        self._count("canned")
+        return endpoint, _canned_response(endpoint, parsed)
+
+    def delay_for(self, endpoint: str) -> float:
+        """replay 모드 응답 지연 시간 (slow_rate 확률로 slow_factor배)."""
+        delay = self.latency.get(endpoint, 0.0)
+        if self.slow_rate and random.random() < self.slow_rate:
+            self._count("slowed")
+            delay *= self.slow_factor
+        return delay
+
+    def _forward(self, path: str, content_type: str, body: bytes) -> Dict[str, Any]:
+        response = self._upstream_client.post(
+            f"{self.upstream}{path}",
+            content=body,
+            headers={"Authorization": f"Bearer {self.api_key}", "Content-Type": content_type},
+        )
+        return {
+            "status": response.status_code,
+            "content_type": response.headers.get("content-type", "application/json"),
+            "body": response.text,
+        }
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive (커넥션 풀 재사용 확인 가능)
+    server_state: MockUpstageServer
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length)
+        state = self.server_state
+        headers = {k.lower(): v for k, v in self.headers.items()}
+        endpoint, entry = state.respond(self.path, headers, body)
+        if not state.upstream:
+            time.sleep(state.delay_for(endpoint))
+
+        payload = entry["body"].encode("utf-8")
+        self.send_response(entry["status"])
+        self.send_header("Content-Type", entry["content_type"])
+        if entry["status"] == 503:
+            self.send_header("Retry-After", "0")
+        if not entry["content_type"].startswith("text/event-stream"):
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+
+        # SSE: 이벤트 단위로 chunked 전송
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        events: List[str] = [e for e in entry["body"].split("\n\n") if e.strip()]
+        for event in events:
+            data = f"{event}\n\n".encode("utf-8")
+            self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+            self.wfile.flush()
+            if not state.upstream:
+                time.sleep(state.stream_chunk_delay)
+        self.wfile.write(b"0\r\n\r\n")
@@ -0,0 +1,169 @@
+"""대용량 PDF 분할 Document Parse
+
+페이지 수가 많은 PDF는 한 번에 보내면 요청 1건이 수 분 걸리거나 타임아웃되므로,
+로컬에서 페이지 구간(range)별 PDF로 나누어 동시에 파싱한 뒤 elements를 페이지 순서로 합칩니다.
+- 구간 PDF 생성: pypdf (선택 의존성, 없으면 분할하지 않고 전체를 한 번에 파싱)
+- 구간별 결과의 page 번호는 원본 기준으로 보정, id는 문서 순서대로 다시 매김
+- 구간 1개가 실패하면 그 구간만 다시 요청 (이미 끝난 구간은 재사용)
+- on_progress(완료 수, 전체 수, 시작 페이지, 끝 페이지)로 구간별 진행 상황 전달
+"""
+
+import asyncio
+import contextvars
+import io
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# 파싱할 구간 PDF 1개 = {"start": 시작 페이지, "end": 끝 페이지(포함), "data": PDF 바이트}
+PageRange = Dict[str, Any]
+ProgressCallback = Callable[[int, int, int, int], None]
+
+
+def _pdf_reader(pdf_path: str):
+    """pypdf.PdfReader (pypdf가 없으면 None)."""
+    try:
+        import pypdf
+    except ImportError:
+        return None
+    logging.getLogger("pypdf").setLevel(logging.ERROR)  # 손상된 xref 경고 등은 출력하지 않음
+    return pypdf.PdfReader(pdf_path)
+
+
+def page_count(pdf_path: str) -> Optional[int]:
+    """PDF 페이지 수 (pypdf가 없거나 읽을 수 없으면 None)."""
+    try:
+        reader = _pdf_reader(pdf_path)
+        return len(reader.pages) if reader is not None else None
+    except Exception:
+        return None
+
+
+def split_pdf(pdf_path: str, pages_per_range: int) -> List[PageRange]:
+    """PDF를 pages_per_range쪽씩 나눈 구간 PDF 목록 (1-based 페이지 번호)."""
+    import pypdf
+
+    reader = _pdf_reader(pdf_path)
+    ranges: List[PageRange] = []
+    total = len(reader.pages)
+    for start in range(0, total, pages_per_range):
+        writer = pypdf.PdfWriter()
+        for index in range(start, min(total, start + pages_per_range)):
+            writer.add_page(reader.pages[index])
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        ranges.append({"start": start + 1, "end": min(total, start + pages_per_range), "data": buffer.getvalue()})
+    return ranges
+
+
+def range_filename(pdf_path: str, page_range: PageRange) -> str:
+    stem, ext = os.path.splitext(os.path.basename(pdf_path))
+    return f"{stem}_p{page_range['start']}-{page_range['end']}{ext or '.pdf'}"
+
+
+def merge_parsed_ranges(ranges: List[PageRange], results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """구간별 Document Parse 결과를 원본 문서 하나의 결과 형태로 병합.
+
+    Args:
+        ranges: split_pdf 결과 (페이지 순서)
+        results: ranges와 같은 순서의 Document Parse 응답
+    """
+    merged: Dict[str, Any] = {key: value for key, value in results[0].items() if key not in ("elements", "content", "usage")}
+    elements: List[Dict[str, Any]] = []
+    content: Dict[str, str] = {}
+    pages = 0
+    for page_range, result in zip(ranges, results):
+        offset = page_range["start"] - 1
+        for element in result.get("elements") or []:
+            if not isinstance(element, dict):
+                continue
+            element = dict(element)
+            if isinstance(element.get("page"), int):
+                element["page"] += offset
+            element["id"] = len(elements)
+            elements.append(element)
+        for fmt, value in (result.get("content") or {}).items():
+            if isinstance(value, str) and value:
+                content[fmt] = f"{content[fmt]}\n{value}" if content.get(fmt) else value
+        pages += ((result.get("usage") or {}).get("pages") or (page_range["end"] - page_range["start"] + 1))
+    merged["elements"] = elements
+    merged["content"] = content
+    merged["usage"] = {"pages": pages}
+    return merged
+
+
+def parse_in_ranges(
+    ranges: List[PageRange],
+    parse_range: Callable[[PageRange], Dict[str, Any]],
+    max_workers: int,
+    range_retries: int = 1,
+    on_progress: Optional[ProgressCallback] = None,
+) -> List[Dict[str, Any]]:
+    """구간을 스레드 풀에서 동시에 파싱. 실패한 구간만 range_retries회까지 다시 요청.
+
+    Returns:
+        ranges와 같은 순서의 파싱 결과
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(ranges)
+    pending = list(range(len(ranges)))
+    done_count = 0
+    for attempt in range(range_retries + 1):
+        failures: Dict[int, Exception] = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending)))) as executor:
+            # trace/마감 시간 contextvars를 워커 스레드로 전달
+            futures = {executor.submit(contextvars.copy_context().run, parse_range, ranges[i]): i for i in pending}
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    results[index] = future.result()
+                except Exception as exc:
+                    failures[index] = exc
+                    continue
+                done_count += 1
+                if on_progress is not None:
+                    on_progress(done_count, len(ranges), ranges[index]["start"], ranges[index]["end"])
+        if not failures:
+            return results
+        pending = sorted(failures)
+        if attempt == range_retries:
+            first = ranges[pending[0]]
+            raise RuntimeError(
+                f"PDF {first['start']}-{first['end']}쪽 구간 파싱에 실패했습니다: {failures[pending[0]]}"
+            ) from failures[pending[0]]
+    return results
+
+
+async def aparse_in_ranges(
+    ranges: List[PageRange],
+    parse_range: Callable[[PageRange], Awaitable[Dict[str, Any]]],
+    max_workers: int,
+    range_retries: int = 1,
+    on_progress: Optional[ProgressCallback] = None,
+) -> List[Dict[str, Any]]:
+    """parse_in_ranges의 비동기 버전 (동시에 진행하는 구간 수를 max_workers로 제한)."""
+    results: List[Optional[Dict[str, Any]]] = [None] * len(ranges)
+    semaphore = asyncio.Semaphore(max(1, max_workers))
+    done_count = 0
+
+    async def _parse(index: int) -> None:
+        nonlocal done_count
+        async with semaphore:
+            results[index] = await parse_range(ranges[index])
+        done_count += 1
+        if on_progress is not None:
+            on_progress(done_count, len(ranges), ranges[index]["start"], ranges[index]["end"])
+
+    pending = list(range(len(ranges)))
+    for attempt in range(range_retries + 1):
+        outcomes = await asyncio.gather(*(_parse(i) for i in pending), return_exceptions=True)
+        failures = {i: exc for i, exc in zip(pending, outcomes) if isinstance(exc, Exception)}
+        if not failures:
+            return results
+        pending = sorted(failures)
+        if attempt == range_retries:
+            first = ranges[pending[0]]
+            raise RuntimeError(
+                f"PDF {first['start']}-{first['end']}쪽 구간 파싱에 실패했습니다: {failures[pending[0]]}"
+            ) from failures[pending[0]]
+    return results
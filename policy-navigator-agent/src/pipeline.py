@@ -0,0 +1,90 @@
+"""단계(stage) 의존성 그래프 실행기
+
+각 단계는 이름, 함수, 선행 단계 목록으로 등록합니다. 선행 단계가 모두 끝난 단계부터
+스레드 풀에서 바로 실행하므로, 서로 독립적인 단계(예: PDF 파싱과 프로필 구조화)는 동시에 진행됩니다.
+
+    graph = StageGraph()
+    graph.add("parse", _load_parsed_doc, pdf_path)
+    graph.add("policy", _build_policy_index, deps=["parse"])
+    results = graph.run()
+
+선행 단계 결과는 deps 순서대로 함수의 앞쪽 위치 인자로 전달되고, add()에 준 인자가 그 뒤에 붙습니다.
+"""
+
+import contextvars
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+class StageGraph:
+    """의존성 있는 단계들을 제한된 스레드 풀에서 실행하는 작은 DAG."""
+
+    def __init__(self, max_workers: int = 4) -> None:
+        self.max_workers = max_workers
+        self._stages: Dict[str, Dict[str, Any]] = {}
+
+    def add(
+        self,
+        name: str,
+        fn: Callable[..., Any],
+        *args: Any,
+        deps: Sequence[str] = (),
+        **kwargs: Any,
+    ) -> None:
+        """단계 등록. deps는 먼저 등록된 단계 이름이어야 함."""
+        if name in self._stages:
+            raise ValueError(f"이미 등록된 단계입니다: {name}")
+        unknown = [dep for dep in deps if dep not in self._stages]
+        if unknown:
+            raise ValueError(f"등록되지 않은 선행 단계: {', '.join(unknown)}")
+        self._stages[name] = {"fn": fn, "args": args, "kwargs": kwargs, "deps": list(deps)}
+
+    def run(
+        self,
+        on_done: Optional[Callable[[str, Any], None]] = None,
+        on_start: Optional[Callable[[str], None]] = None,
+    ) -> Dict[str, Any]:
+        """모든 단계를 실행하고 {단계명: 결과}를 반환.
+
+        Args:
+            on_done: 단계가 끝날 때마다 (단계명, 결과)로 호출 (진행 표시용, 메인 스레드에서 호출)
+            on_start: 단계를 실행하기 직전(선행 단계가 모두 끝난 뒤)에 단계명으로 호출 (메인 스레드에서 호출)
+
+        한 단계라도 예외가 나면 새 단계 제출을 멈추고, 실행 중인 단계가 끝난 뒤 그 예외를 다시 발생시킨다.
+        """
+        results: Dict[str, Any] = {}
+        remaining: List[str] = list(self._stages)
+        running: Dict[Future, str] = {}
+        error: Optional[Exception] = None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while remaining or running:
+                if error is None:
+                    for name in [n for n in remaining if all(d in results for d in self._stages[n]["deps"])]:
+                        stage = self._stages[name]
+                        dep_results = [results[d] for d in stage["deps"]]
+                        if on_start is not None:
+                            on_start(name)
+                        # 호출 스레드의 contextvars(trace id 등)를 워커 스레드로 전달
+                        future = executor.submit(
+                            contextvars.copy_context().run,
+                            stage["fn"], *dep_results, *stage["args"], **stage["kwargs"],
+                        )
+                        running[future] = name
+                        remaining.remove(name)
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as exc:
+                        if error is None:
+                            error = exc
+                        continue
+                    if on_done is not None:
+                        on_done(name, results[name])
+        if error is not None:
+            raise error
+        return results
@@ -0,0 +1,108 @@
+"""정책 팩 (policy pack): 정책 PDF 1건을 미리 처리해 둔 파일
+
+정책 쪽 정보(파싱 → 정규화 본문, 청크, IE 슬롯, 프로필과 무관한 자격 조건)는 사용자마다 같으므로
+ingest 명령으로 한 번만 만들고, 세션은 팩 파일을 읽어 프로필에 따라 달라지는 LLM 작업만 수행합니다.
+자격 조건 중 기준이 분명한 것은 조건식(predicates)으로도 저장되어 로컬 사전 판정에 쓰입니다 (eligibility.py).
+
+- 형식: JSON 1개 파일. PACK_VERSION이 다르면 로드하지 않음 (다시 ingest)
+- source.sha256 / parse_params / ie_schema_key로 어떤 PDF·설정에서 만들었는지 기록
+- 저장은 임시 파일에 쓴 뒤 원자적으로 교체 (실행 중인 세션이 반쯤 쓴 팩을 읽지 않도록)
+"""
+
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from cache import file_sha256, make_key
+from retrieval import PolicyIndex
+
+
+PACK_FORMAT = "policy-pack"
+# 팩 구조가 바뀌면 올림 (이전 버전 팩은 로드 시 거부)
+PACK_VERSION = 3
+
+
+def build_pack(
+    pdf_path: str,
+    policy: PolicyIndex,
+    ie_extract: Optional[str],
+    conditions: List[Dict[str, Any]],
+    predicates: List[Dict[str, Any]],
+    *,
+    parse_params: Dict[str, Any],
+    ie_schema: Dict[str, Any],
+) -> Dict[str, Any]:
+    """처리 결과를 팩 dict로 구성.
+
+    Args:
+        pdf_path: 원본 정책 PDF 경로
+        policy: 청크 + 정규화 본문
+        ie_extract: Information Extraction 결과 JSON 문자열 (실패 시 None)
+        conditions: 자격 조건 목록
+        predicates: 자격 조건의 조건식 (eligibility.predicates_from_output 결과)
+        parse_params: Document Parse 요청 파라미터
+        ie_schema: IE 스키마
+    """
+    return {
+        "format": PACK_FORMAT,
+        "version": PACK_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "source": {
+            "name": os.path.basename(pdf_path),
+            "sha256": file_sha256(pdf_path),
+            "size": os.path.getsize(pdf_path),
+        },
+        "parse_params": parse_params,
+        "ie_schema_key": make_key(ie_schema),
+        "text": policy.text,
+        "chunks": policy.chunks,
+        "ie": json.loads(ie_extract) if ie_extract else None,
+        "conditions": conditions,
+        "predicates": predicates,
+    }
+
+
+def save_pack(pack: Dict[str, Any], path: str) -> None:
+    """팩을 JSON 파일로 저장 (임시 파일에 쓴 뒤 원자적으로 교체)."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(pack, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def load_pack(path: str) -> Dict[str, Any]:
+    """팩 파일을 읽어 형식/버전 확인 후 반환. 다른 버전이면 ValueError (다시 ingest 필요)."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"정책 팩 파일을 찾을 수 없습니다: {path}")
+    with open(path, "r", encoding="utf-8") as f:
+        pack = json.load(f)
+    if not isinstance(pack, dict) or pack.get("format") != PACK_FORMAT:
+        raise ValueError(f"정책 팩 파일이 아닙니다: {path}")
+    if pack.get("version") != PACK_VERSION:
+        raise ValueError(
+            f"정책 팩 버전({pack.get('version')})이 현재 버전({PACK_VERSION})과 다릅니다. ingest로 다시 생성하세요: {path}"
+        )
+    return pack
+
+
+def pack_policy(pack: Dict[str, Any]) -> Tuple[PolicyIndex, Optional[str]]:
+    """팩 → (정책 인덱스, ie_extract). load_policy와 같은 형태로 반환."""
+    policy = PolicyIndex(
+        pack.get("chunks") or [],
+        pack.get("text") or "",
+        conditions=pack.get("conditions") or [],
+        predicates=pack.get("predicates") or [],
+    )
+    ie = pack.get("ie")
+    return policy, (json.dumps(ie, ensure_ascii=False) if ie else None)
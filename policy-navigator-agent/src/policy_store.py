@@ -0,0 +1,159 @@
+"""상주 정책 저장소: 서비스할 정책을 시작 시 미리 로드하고 파일이 바뀌면 다시 로드
+
+프로세스가 뜬 직후 첫 요청이 정책 파싱/IE(또는 캐시 읽기)를 기다리지 않도록, 설정된 정책 PDF·정책 팩을
+시작 시점에 동시에 로드(preload)하여 메모리에 유지하고 모든 세션이 공유합니다.
+- 로드: PDF는 aload_policy (파싱/IE 디스크 캐시가 있으면 API 호출 없음), 팩은 파일 읽기
+- 핫 리로드: 요청 시 POLICY_CHECK_SECONDS 간격으로 파일 mtime/크기 확인 → 바뀌었으면 sha256 비교 →
+  내용이 다르면 백그라운드에서 다시 로드. 새 버전이 준비될 때까지는 이전 버전으로 응답 (요청이 로드를 기다리지 않음)
+- 메모리: 정책별 상주 객체(청크·BM25 색인·본문·IE)의 대략적 크기를 memory_stats()로 보고
+"""
+
+import asyncio
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from agent import aload_policy, load_policy_pack
+from cache import file_sha256
+from config import POLICY_CHECK_SECONDS
+from retrieval import PolicyIndex
+
+
+def policy_name(source: str) -> str:
+    """정책 경로 → 요청에서 쓰는 이름 (파일 이름에서 .pdf / .pack.json 제거)."""
+    name = os.path.basename(source)
+    for suffix in (".pack.json", ".pdf"):
+        if name.lower().endswith(suffix):
+            return name[: -len(suffix)]
+    return name
+
+
+def _deep_sizeof(value: Any, seen: Optional[set] = None) -> int:
+    """객체와 그 안의 dict/list/문자열 등을 따라가며 합산한 대략적 메모리 크기 (bytes)."""
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_deep_sizeof(k, seen) + _deep_sizeof(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_deep_sizeof(item, seen) for item in value)
+    elif hasattr(value, "__dict__"):
+        size += _deep_sizeof(vars(value), seen)
+    return size
+
+
+def _file_signature(path: str) -> Tuple[float, int]:
+    stat = os.stat(path)
+    return stat.st_mtime, stat.st_size
+
+
+class PolicyStore:
+    """정책 이름 → (정책 인덱스, ie_extract) 상주 저장소 (이벤트 루프 1개에서 사용).
+
+    Args:
+        sources: 정책 PDF / 정책 팩 경로 목록
+        check_seconds: 파일 변경 확인 최소 간격 (0이면 요청마다 확인, 음수면 확인하지 않음)
+    """
+
+    def __init__(self, sources: List[str], check_seconds: float = POLICY_CHECK_SECONDS) -> None:
+        self.sources = {policy_name(source): source for source in sources}
+        self.check_seconds = check_seconds
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._loading: Dict[str, "asyncio.Task[Dict[str, Any]]"] = {}
+        self.reloads = 0
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.sources
+
+    async def _load(self, name: str) -> Dict[str, Any]:
+        source = self.sources[name]
+        signature, sha256 = await asyncio.to_thread(
+            lambda: (_file_signature(source), file_sha256(source))
+        )
+        started = time.perf_counter()
+        if source.lower().endswith(".pack.json"):
+            policy, ie_extract = await asyncio.to_thread(load_policy_pack, source)
+        else:
+            policy, ie_extract = await aload_policy(source)
+        entry = {
+            "policy": policy,
+            "ie_extract": ie_extract,
+            "signature": signature,
+            "sha256": sha256,
+            "loaded_at": time.time(),
+            "load_seconds": round(time.perf_counter() - started, 3),
+            "checked_at": time.monotonic(),
+        }
+        if name in self._entries:
+            self.reloads += 1
+        self._entries[name] = entry
+        return entry
+
+    def _start_load(self, name: str) -> "asyncio.Task[Dict[str, Any]]":
+        task = self._loading.get(name)
+        if task is None or task.done():
+            task = asyncio.ensure_future(self._load(name))
+            self._loading[name] = task  # 동시에 들어온 요청은 같은 로드를 기다림
+            task.add_done_callback(lambda done: self._load_done(name, done))
+        return task
+
+    def _load_done(self, name: str, task: "asyncio.Task[Dict[str, Any]]") -> None:
+        if self._loading.get(name) is task:
+            del self._loading[name]
+        if not task.cancelled() and task.exception() is not None and name in self._entries:
+            # 다시 로드 실패 (파일을 쓰는 중 등) → 이전 버전 유지, 다음 확인 때 재시도
+            self._entries[name]["signature"] = None
+
+    async def preload(self) -> None:
+        """모든 정책을 동시에 로드. 하나라도 실패하면 예외 (잘못된 설정으로 서비스가 뜨지 않도록)."""
+        await asyncio.gather(*(self._start_load(name) for name in self.sources))
+
+    async def _changed(self, name: str, entry: Dict[str, Any]) -> bool:
+        """파일 mtime/크기가 바뀌었고 내용(sha256)도 다르면 True. 내용이 같으면 서명만 갱신."""
+        source = self.sources[name]
+        try:
+            signature = await asyncio.to_thread(_file_signature, source)
+        except OSError:
+            return False  # 교체 중이거나 삭제됨 → 기존 버전 유지
+        if signature == entry["signature"]:
+            return False
+        sha256 = await asyncio.to_thread(file_sha256, source)
+        if sha256 == entry["sha256"]:
+            entry["signature"] = signature
+            return False
+        return True
+
+    async def get(self, name: str) -> Tuple[PolicyIndex, Optional[str]]:
+        """정책 반환. 아직 로드되지 않았으면 로드를 기다리고, 파일이 바뀌었으면 백그라운드에서 다시 로드."""
+        entry = self._entries.get(name)
+        if entry is None:
+            entry = await asyncio.shield(self._start_load(name))
+        elif self.check_seconds >= 0 and time.monotonic() - entry["checked_at"] >= self.check_seconds:
+            entry["checked_at"] = time.monotonic()
+            if name not in self._loading and await self._changed(name, entry):
+                self._start_load(name)  # 완료되면 다음 요청부터 새 버전
+        return entry["policy"], entry["ie_extract"]
+
+    def memory_stats(self) -> Dict[str, Any]:
+        """정책별 상주 메모리(대략) + 로드 정보."""
+        policies = {}
+        for name, entry in self._entries.items():
+            policy: PolicyIndex = entry["policy"]
+            policies[name] = {
+                "source": self.sources[name],
+                "sha256": entry["sha256"][:12],
+                "loaded_at": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(entry["loaded_at"])),
+                "load_seconds": entry["load_seconds"],
+                "chunks": len(policy.chunks),
+                "text_chars": len(policy.text),
+                "memory_mb": round(_deep_sizeof((policy, entry["ie_extract"])) / 1024 / 1024, 2),
+            }
+        return {
+            "policies": policies,
+            "total_mb": round(sum(p["memory_mb"] for p in policies.values()), 2),
+            "reloads": self.reloads,
+            "loading": sorted(self._loading),
+        }
@@ -0,0 +1,79 @@
+"""프롬프트 접두부 공유 확인 도구
+
+같은 정책에 대해 서로 다른 두 세션(프로필)의 Plan / 재분석 / Final 프롬프트를 API 호출 없이 만들어
+바이트 단위 공통 접두부 길이를 보고합니다. 정책 블록이 사용자별 섹션보다 앞에 있고 세션 간 같은 바이트이면
+공통 접두부가 프롬프트 대부분을 차지하며, prefix/KV 캐시를 지원하는 백엔드는 그만큼 계산을 재사용할 수 있습니다.
+- Plan 결과·답변은 프로필로 만든 가상 값을 사용 (배치만 확인하므로 내용은 중요하지 않음)
+- 정책은 정책 팩(파일만 읽음) 또는 PDF(파싱/IE 캐시가 없으면 API 호출)로 로드
+"""
+
+import os
+from typing import Any, Dict, List, Optional
+
+from agent import _final_prompt, _plan_prompt, _replan_prompt, _rule_structured_profile
+from ratelimit import estimate_tokens
+from retrieval import PolicyIndex
+
+
+def shared_prefix_length(first: str, second: str) -> int:
+    """두 문자열의 공통 접두부 길이 (문자)."""
+    return len(os.path.commonprefix([first, second]))
+
+
+def _session_prompts(profile: str, policy: PolicyIndex, ie_extract: Optional[str]) -> Dict[str, str]:
+    """세션 1개의 단계별 프롬프트 (가상 Plan 결과·답변 사용)."""
+    structured = _rule_structured_profile(profile) or profile
+    answered_fields = {"추가정보": f"{profile} 기준 답변"}
+    plan_result = {
+        "certain_conditions": [f"프로필 조건: {structured}"],
+        "uncertain_conditions": ["추가정보: 프로필만으로 판단 불가"],
+        "questions": [{"field": "추가정보", "question": "추가 정보가 있나요?"}],
+        "action_candidates": ["정책 검토 필요"],
+    }
+    return {
+        "plan": _plan_prompt(structured, policy, ie_extract),
+        "replan": _replan_prompt(structured, policy, plan_result, answered_fields),
+        "final": _final_prompt(structured, policy, plan_result, answered_fields, ie_extract),
+    }
+
+
+def compare_sessions(
+    policy: PolicyIndex,
+    ie_extract: Optional[str],
+    profile_a: str,
+    profile_b: str,
+) -> List[Dict[str, Any]]:
+    """두 프로필의 단계별 프롬프트 공통 접두부.
+
+    Returns:
+        [{"stage", "chars_a", "chars_b", "shared_chars", "shared_tokens", "shared_ratio"}, ...]
+        shared_ratio = 공통 접두부 / 짧은 쪽 프롬프트 길이
+    """
+    prompts_a = _session_prompts(profile_a, policy, ie_extract)
+    prompts_b = _session_prompts(profile_b, policy, ie_extract)
+    rows = []
+    for stage, prompt_a in prompts_a.items():
+        prompt_b = prompts_b[stage]
+        shared = shared_prefix_length(prompt_a, prompt_b)
+        shortest = min(len(prompt_a), len(prompt_b)) or 1
+        rows.append({
+            "stage": stage,
+            "chars_a": len(prompt_a),
+            "chars_b": len(prompt_b),
+            "shared_chars": shared,
+            "shared_tokens": estimate_tokens(prompt_a[:shared]) if shared else 0,
+            "shared_ratio": round(shared / shortest, 3),
+        })
+    return rows
+
+
+def format_report(rows: List[Dict[str, Any]]) -> str:
+    """compare_sessions 결과를 터미널 표로 변환."""
+    header = f"{'stage':<10}{'chars_a':>10}{'chars_b':>10}{'shared':>10}{'~tokens':>10}{'ratio':>8}"
+    lines = [header, "-" * len(header)]
+    for row in rows:
+        lines.append(
+            f"{row['stage']:<10}{row['chars_a']:>10}{row['chars_b']:>10}{row['shared_chars']:>10}"
+            f"{row['shared_tokens']:>10}{row['shared_ratio']:>8.1%}"
+        )
+    return "\n".join(lines)
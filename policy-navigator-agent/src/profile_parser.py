@@ -0,0 +1,118 @@
+"""규칙 기반 프로필 파서
+
+"29세/수도권/중소기업/월250/미혼" 같은 슬래시 구분 프로필을 LLM 호출 없이 파싱합니다.
+build_profile_parse_prompt와 같은 한국어 키(나이/지역/직업/월소득/혼인상태 ...)를 사용하며,
+인식하지 못한 토큰이 하나라도 있으면 None을 반환하여 LLM 파싱으로 넘깁니다.
+"필드명: 값" 토큰은 PROFILE_FIELDS의 필드명일 때만 인식합니다 (그 외 키는 자유 서술일 수 있으므로 LLM으로).
+"""
+
+import re
+from typing import Dict, Optional
+
+
+REGIONS = {
+    "수도권", "비수도권", "지방", "농어촌", "읍면",
+    "서울", "경기", "인천", "부산", "대구", "광주", "대전", "울산", "세종",
+    "강원", "충북", "충남", "전북", "전남", "경북", "경남", "제주",
+}
+OCCUPATIONS = {
+    "중소기업", "중견기업", "대기업", "공기업", "공공기관", "공무원", "군인",
+    "직장인", "회사원", "정규직", "비정규직", "계약직", "재직중", "재직",
+    "대학생", "대학원생", "고등학생", "학생", "휴학생",
+    "구직중", "취준생", "취업준비생", "무직", "실업", "미취업",
+    "자영업", "자영업자", "소상공인", "개인사업자", "사업자", "창업", "프리랜서", "예술인",
+    "아르바이트", "알바", "주부", "은퇴", "농업인", "어업인",
+}
+MARITAL_STATUSES = {"미혼", "기혼", "신혼", "예비신혼", "결혼", "이혼", "사별", "한부모"}
+HOUSING_STATUSES = {"무주택", "유주택", "1주택", "다주택", "자가", "전세", "월세"}
+
+# 규칙 파서가 만드는 필드명 ("필드명: 값" 토큰은 이 이름일 때만 인식)
+PROFILE_FIELDS = ("나이", "지역", "직업", "월소득", "연소득", "혼인상태", "주거", "자녀")
+
+# 금액: 250 / 2,500 / 2.5, 단위 만원(생략 가능) 또는 원
+_AMOUNT = r"(\d{1,3}(?:,\d{3})+|\d+(?:\.\d+)?)\s*(만\s*원?|원)?"
+_AGE_RE = re.compile(r"^(?:만\s*)?(\d{1,3})\s*(?:세|살)$")
+_MONTHLY_INCOME_RE = re.compile(rf"^(?:월\s*소득|월)\s*{_AMOUNT}$")
+_ANNUAL_INCOME_RE = re.compile(rf"^(?:연\s*소득|연봉|연)\s*{_AMOUNT}$")
+_CHILDREN_RE = re.compile(r"^자녀\s*(\d+)\s*(?:명)?$")
+_KEY_VALUE_RE = re.compile(r"^([^:：]+)[:：]\s*(.+)$")
+_NO_INCOME = {"무소득", "소득없음", "소득0"}
+_NO_CHILDREN = {"무자녀", "자녀없음"}
+# 토큰 구분: "/" 또는 숫자 사이가 아닌 "," ("연소득 3,000만원"의 천 단위 쉼표는 나누지 않음)
+_TOKEN_SPLIT_RE = re.compile(r"/|(?<!\d),|,(?!\d)")
+
+
+def _strip_region_suffix(token: str) -> str:
+    """"서울시", "경기도", "서울특별시" → 지역 약칭."""
+    for suffix in ("특별자치시", "특별자치도", "특별시", "광역시", "시", "도"):
+        if token.endswith(suffix) and token[: -len(suffix)] in REGIONS:
+            return token[: -len(suffix)]
+    return token
+
+
+def _amount_in_manwon(number: str, unit: Optional[str]) -> str:
+    """금액 표기 → 만원 단위 숫자 문자열 ("2,500,000", "원" → "250")."""
+    value = float(number.replace(",", ""))
+    if unit == "원":
+        value /= 10000
+    return f"{value:g}"
+
+
+def _classify(token: str) -> Optional[tuple]:
+    """토큰 1개를 (필드명, 값)으로 분류. 인식 불가 시 None."""
+    compact = re.sub(r"\s+", "", token)
+    key_value = _KEY_VALUE_RE.match(token)
+    if key_value:
+        # 구조화된 프로필("나이: 29세, ...")·대화 중 추가된 "필드명: 값". 모르는 필드명은 LLM으로
+        field = key_value.group(1).strip()
+        return (field, key_value.group(2).strip()) if field in PROFILE_FIELDS else None
+    match = _AGE_RE.match(compact)
+    if match:
+        return "나이", f"{int(match.group(1))}세"
+    match = _MONTHLY_INCOME_RE.match(compact)
+    if match:
+        return "월소득", f"월{_amount_in_manwon(*match.groups())}"
+    if compact in _NO_INCOME:
+        return "월소득", "월0"
+    match = _ANNUAL_INCOME_RE.match(compact)
+    if match:
+        return "연소득", f"연{_amount_in_manwon(*match.groups())}"
+    match = _CHILDREN_RE.match(compact)
+    if match:
+        return "자녀", f"{int(match.group(1))}명"
+    if compact in _NO_CHILDREN:
+        return "자녀", "0명"
+    if _strip_region_suffix(compact) in REGIONS:
+        return "지역", compact
+    if compact in OCCUPATIONS:
+        return "직업", compact
+    if compact in MARITAL_STATUSES:
+        return "혼인상태", compact
+    if compact in HOUSING_STATUSES:
+        return "주거", compact
+    return None
+
+
+def parse_profile_rules(profile: str) -> Optional[Dict[str, str]]:
+    """슬래시 구분 프로필을 규칙으로 파싱.
+
+    Args:
+        profile: 프로필 문자열 (예: "29세/수도권/중소기업/월250/미혼")
+
+    Returns:
+        {"나이": "29세", "지역": "수도권", ...} 또는
+        인식 불가/중복 토큰이 있으면 None (LLM 파싱으로 대체)
+    """
+    tokens = [t.strip() for t in _TOKEN_SPLIT_RE.split(profile or "") if t.strip()]
+    if not tokens:
+        return None
+    parsed: Dict[str, str] = {}
+    for token in tokens:
+        classified = _classify(token)
+        if classified is None:
+            return None
+        field, value = classified
+        if field in parsed and parsed[field] != value:
+            return None  # 같은 항목이 두 번 (예: "29세/31세") → 규칙으로 판단하지 않음
+        parsed[field] = value
+    return parsed
@@ -5,10 +5,20 @@ Solar Pro 2 Prompting Handbook의 베스트 프랙티스를 따릅니다:
 - JSON 출력: "Return ONLY the JSON object" 명시
 - 중요 제약: CRITICAL, MUST, NEVER 등 대문자 강조
 - 셀프 검증: VERIFICATION CHECKLIST 추가
+
+정책 본문이 들어가는 프롬프트(Plan / 재분석 / Final)는 접두부가 세션 간에 같도록 배치합니다:
+고정 지시문 → 정책 블록(본문·자격 조건·IE, 정책마다 같은 바이트) → 사용자별 섹션(프로필·답변·Plan·추가 본문).
+서버 측 prefix/KV 캐시가 있는 백엔드는 같은 정책의 접두부 계산을 재사용할 수 있습니다 (prefix_check.py로 확인).
+
+프롬프트 예산 (PromptBudget): 섹션별 토큰을 추정하여 정해진 예산 안에서 정책 본문 길이를 정하고,
+본문과 중복되는 IE 필드·Final에 필요 없는 Plan 항목을 덜어냅니다.
 """
 
 import json
-from typing import Optional
+import re
+from typing import Any, Dict, Optional
+
+from ratelimit import estimate_tokens
 
 
 def build_profile_parse_prompt(profile: str) -> str:
@@ -70,13 +80,23 @@ def format_profile_structured(parsed: dict) -> str:
     return ", ".join(parts) if parts else ""
 
 
-def build_plan_prompt(profile: str, policy_text: str, ie_extract: Optional[str]) -> str:
+def build_plan_prompt(
+    profile: str,
+    policy_text: str,
+    ie_extract: Optional[str],
+    policy_conditions: Optional[str] = None,
+    policy_excerpts: Optional[str] = None,
+    known_fields: Optional[str] = None,
+) -> str:
     """정책 분석 Plan 단계 프롬프트 생성.
     
     Args:
         profile: 구조화된 프로필 문자열
-        policy_text: Document Parse로 추출한 정책 본문
+        policy_text: 정책 본문 (프로필과 무관하게 고른 고정 블록)
         ie_extract: Information Extraction 결과 (선택)
+        policy_conditions: 정책 팩에 미리 정리된 자격 조건 목록 JSON 문자열 (선택)
+        policy_excerpts: 프로필과 관련해 추가로 고른 본문 (선택, 사용자별 섹션에 배치)
+        known_fields: 프로필에 이미 값이 있는 항목명 (쉼표 구분, 선택). 지정 시 질문 필터링까지 Plan에서 수행
     
     Returns:
         Solar에 전달할 프롬프트 문자열
@@ -86,6 +106,28 @@ def build_plan_prompt(profile: str, policy_text: str, ie_extract: Optional[str])
         ie_section = f"""
 ## 추출된 핵심 정보 (참고용)
 {ie_extract}
+"""
+    
+    conditions_section = ""
+    if policy_conditions:
+        conditions_section = f"""
+## 정책 자격 조건 목록 (사전 정리, 프로필과 무관)
+정책 본문에서 조건을 다시 찾지 말고, 아래 조건 하나하나를 사용자 프로필과 대조하여 certain/uncertain으로 분류하세요.
+{policy_conditions}
+"""
+    
+    excerpts_section = ""
+    if policy_excerpts:
+        excerpts_section = f"""
+## 관련 정책 본문 (추가)
+{policy_excerpts}
+"""
+    
+    known_section = ""
+    if known_fields:
+        known_section = f"""
+## 프로필에 이미 있는 항목 (질문 금지)
+{known_fields}
 """
     
     return f"""# Role
@@ -103,7 +145,8 @@ def build_plan_prompt(profile: str, policy_text: str, ie_extract: Optional[str])
 - **certain_conditions에 이미 결론 낸 내용은 절대 questions에 넣지 말 것**
   - 예: certain에 "자녀 없음"이면 "자녀 있나요?" 질문 금지
   - 예: certain에 "월소득 0으로 신용카드 혜택 불가"면 "신용카드 사용 여부" 질문 금지
-- **프로필에 이미 답이 있는 내용은 질문하지 않음**
+- **프로필에 이미 답이 있는 내용은 질문하지 않음** ("프로필에 이미 있는 항목"이 주어지면 그 항목은 절대 질문 금지)
+- **field는 프로필 항목과 같은 뜻이면 같은 이름 사용**: 나이, 지역, 직업, 월소득, 연소득, 혼인상태, 주거, 자녀
 - **질문은 한 문장으로 짧고 간결하게**
   - 정책명, 혜택 설명 등을 질문에 포함하지 말 것
   - 바람직: "자녀가 있나요?", "신용카드를 사용하고 있나요?"
@@ -141,15 +184,207 @@ def build_plan_prompt(profile: str, policy_text: str, ie_extract: Optional[str])
 5. questions 배열의 각 항목에 field와 question이 모두 있는가?
 
 # Context
+## 정책 문서
+{policy_text}
+{conditions_section}{ie_section}
 ## 사용자 프로필
 {profile}
+{known_section}{excerpts_section}
+# Query
+위 프로필과 정책을 종합 분석하여 JSON을 생성하세요. 코드 블록 없이 JSON만 출력하세요."""
 
+
+def build_policy_conditions_prompt(policy_text: str, ie_extract: Optional[str]) -> str:
+    """정책 문서에서 프로필과 무관한 자격 조건 목록을 뽑는 프롬프트 생성 (정책 팩 생성 시 1회).
+    
+    Args:
+        policy_text: 자격 요건 관련 정책 본문
+        ie_extract: Information Extraction 결과 (선택)
+    
+    Returns:
+        Solar에 전달할 프롬프트 문자열
+    """
+    ie_section = ""
+    if ie_extract:
+        ie_section = f"""
+## 추출된 핵심 정보 (참고용)
+{ie_extract}
+"""
+    
+    return f"""# Role
+당신은 정부 정책 문서에서 신청 자격 조건을 빠짐없이 정리하는 정책 분석 전문가입니다.
+
+# Instructions
+정책 문서에 적힌 자격 조건(지원 대상, 제외 대상, 소득·연령·거주·재직 등 요건)을 조건 하나당 한 항목으로 정리하세요.
+특정 사용자를 가정하지 말고, 문서에 적힌 조건 자체만 기술합니다.
+
+## 항목 작성 원칙 (CRITICAL)
+- **condition**: 판단 가능한 한 문장 (예: "만 19세 이상 34세 이하", "무주택 세대주")
+- **category**: 연령 / 소득 / 거주지 / 직업 / 가구 / 주택 / 자산 / 기타 중 하나
+- **field**: 이 조건을 판단하려면 필요한 사용자 정보의 한국어 필드명 (예: "나이", "월소득", "주택소유여부")
+- **section**: 조건이 나온 정책(사업)명 또는 섹션 제목
+- **group**: 서로 대안인 조건("A 또는 B", "다음 중 하나")은 같은 section 안에서 같은 그룹 이름(예: "소득·자산 중 하나"), 반드시 충족해야 하는 조건은 빈 문자열 ""
+- 문서 안에 여러 정책이 있으면 정책별로 나누어 모두 포함
+- 문서에 근거 없는 조건 생성 금지
+
+# Constraints
+- CRITICAL: Return ONLY valid JSON object
+- NEVER add markdown code blocks (```json) or explanations
+- 조건이 없으면 {{"conditions": []}}
+
+# Format
+{{
+  "conditions": [
+    {{"category": "연령", "condition": "만 19세 이상 34세 이하", "field": "나이", "section": "청년도약계좌", "group": ""}},
+    {{"category": "소득", "condition": "개인소득 연 7,500만원 이하", "field": "연소득", "section": "청년도약계좌", "group": "소득·자산 중 하나"}},
+    {{"category": "자산", "condition": "가구 자산 3억원 이하", "field": "자산", "section": "청년도약계좌", "group": "소득·자산 중 하나"}}
+  ]
+}}
+
+# Context
 ## 정책 문서
-{policy_text[:8000]}
+{policy_text}
 {ie_section}
 
 # Query
-위 프로필과 정책을 종합 분석하여 JSON을 생성하세요. 코드 블록 없이 JSON만 출력하세요."""
+위 정책 문서의 자격 조건 목록을 JSON으로 추출하세요. 코드 블록 없이 JSON만 출력하세요."""
+
+
+def build_predicate_compile_prompt(conditions: str) -> str:
+    """자격 조건 목록을 로컬에서 평가할 조건식(predicate)으로 변환하는 프롬프트 생성 (정책 팩 생성 시 1회).
+    
+    Args:
+        conditions: 자격 조건 목록 JSON 문자열 (id, category, condition, field, section, group)
+    
+    Returns:
+        Solar에 전달할 프롬프트 문자열
+    """
+    return f"""# Role
+당신은 정책 자격 조건을 프로그램이 평가할 수 있는 조건식으로 변환하는 규칙 설계 전문가입니다.
+
+# Instructions
+각 자격 조건 중 **기준이 명확한 조건만** 아래 형식의 조건식으로 변환하세요.
+
+## 사용 가능한 필드와 연산
+- 숫자 필드 (op: "range", min/max 포함 경계, 없는 쪽은 null)
+  - "나이": 만 나이 (세)
+  - "월소득", "연소득": 만원 단위 (예: 월 250만원 → 250, 연 3천만원 → 3000)
+  - "자녀": 자녀 수 (명)
+- 범주 필드 (op: "in" 또는 "not_in", values 목록)
+  - "지역": 광역시·도 약칭(서울, 경기, 부산 ...) 또는 "수도권" / "비수도권"
+  - "직업", "혼인상태"(미혼/기혼/신혼 ...), "주거"(무주택/유주택/자가/전세/월세 ...)
+
+## 변환 원칙 (CRITICAL)
+- 조건 1개가 여러 조건식이 될 수 있음 (예: 연령 + 소득이 함께 적힌 조건). 조건식들은 모두 충족해야 하는 것으로 평가됨
+- 조건 문장 안에 "또는", "~이거나"로 이어진 대안이 있으면 대안 조건식마다 "either": true (그중 하나만 충족하면 됨)
+- 중위소득 비율, 재산 기준, 가구원 수에 따라 달라지는 기준처럼 **프로필 필드만으로 판단할 수 없는 조건은 변환하지 말고 생략**
+- 조건 문장에 없는 숫자·지역을 만들지 말 것
+- condition_id는 입력 조건의 id를 그대로 사용
+
+# Constraints
+- CRITICAL: Return ONLY valid JSON object
+- NEVER add markdown code blocks (```json) or explanations
+- 변환할 조건이 없으면 {{"predicates": []}}
+
+# Format
+{{
+  "predicates": [
+    {{"condition_id": "C1", "field": "나이", "op": "range", "min": 19, "max": 34}},
+    {{"condition_id": "C2", "field": "연소득", "op": "range", "min": null, "max": 7500}},
+    {{"condition_id": "C3", "field": "주거", "op": "in", "values": ["무주택"]}},
+    {{"condition_id": "C4", "field": "나이", "op": "range", "min": null, "max": 34, "either": true}},
+    {{"condition_id": "C4", "field": "혼인상태", "op": "in", "values": ["신혼"], "either": true}}
+  ]
+}}
+
+# Context
+## 자격 조건 목록
+{conditions}
+
+# Query
+위 자격 조건을 조건식 목록으로 변환하세요. 코드 블록 없이 JSON만 출력하세요."""
+
+
+def build_replan_prompt(
+    profile: str,
+    previous_plan: str,
+    answered_fields: str,
+    policy_text: str,
+    policy_excerpts: Optional[str] = None,
+) -> str:
+    """사용자 답변 반영 증분 재분석(Re-plan) 프롬프트 생성.
+    
+    1차 Plan 결과를 처음부터 다시 도출하지 않고, 새로 답변된 필드로
+    uncertain_conditions / action_candidates만 갱신하도록 요청합니다.
+    
+    Args:
+        profile: 구조화된 프로필 문자열 (답변 반영 후)
+        previous_plan: 1차 Plan 결과 JSON 문자열
+        answered_fields: 사용자가 새로 답한 필드 JSON 문자열
+        policy_text: 정책 본문 일부 (프로필과 무관하게 고른 고정 블록)
+        policy_excerpts: 불확실 조건·답변과 관련해 추가로 고른 본문 (선택)
+    
+    Returns:
+        Solar에 전달할 프롬프트 문자열
+    """
+    excerpts_section = ""
+    if policy_excerpts:
+        excerpts_section = f"""
+## 관련 정책 본문 (추가)
+{policy_excerpts}
+"""
+
+    return f"""# Role
+당신은 기존 정책 분석 결과를 사용자의 추가 답변으로 갱신하는 정책 분석 전문가입니다.
+
+# Instructions
+1차 분석 결과(JSON)와 사용자가 새로 답한 정보를 비교하여 분석 결과를 **갱신**하세요.
+처음부터 다시 분석하지 말고, 답변으로 달라지는 부분만 수정합니다.
+
+## 갱신 원칙 (CRITICAL)
+- 답변으로 해소된 uncertain_conditions → 결론과 함께 certain_conditions로 이동
+- 답변과 무관한 uncertain_conditions → 그대로 유지
+- 기존 certain_conditions → 답변과 모순되지 않는 한 그대로 유지
+- action_candidates → 갱신된 조건에 맞게 "신청 가능" / "검토 필요" / 제외를 조정
+- questions → 아직 해소되지 않은 조건에 대한 질문만 남김 (없으면 [])
+- 정책 본문 일부에 근거 없는 내용 생성 금지
+
+# Constraints
+- CRITICAL: Return ONLY valid JSON object
+- NEVER add markdown code blocks (```json) or explanations
+- 1차 분석 결과와 같은 4개 키를 모두 포함 (빈 배열이라도 [] 표시)
+- questions 배열: 각 항목은 {{"field": "필드명", "question": "질문 전문"}} 구조 필수
+
+# Format
+{{
+  "certain_conditions": ["조건1: 설명"],
+  "uncertain_conditions": ["불확실 조건1: 이유"],
+  "questions": [],
+  "action_candidates": ["정책A 신청 가능", "정책B 검토 필요"]
+}}
+
+# VERIFICATION CHECKLIST
+응답 전 반드시 확인:
+1. 새 답변으로 해소된 조건이 uncertain_conditions에 남아 있지 않은가?
+2. 답변과 무관한 기존 조건을 임의로 삭제하지 않았는가?
+3. action_candidates가 갱신된 조건과 일치하는가?
+4. JSON 구조가 위 Format과 정확히 일치하는가?
+
+# Context
+## 정책 본문
+{policy_text}
+
+## 사용자 프로필
+{profile}
+
+## 새로 답변된 정보
+{answered_fields}
+
+## 1차 분석 결과
+{previous_plan}
+{excerpts_section}
+# Query
+새로 답변된 정보를 반영하여 1차 분석 결과를 갱신한 JSON을 생성하세요. 코드 블록 없이 JSON만 출력하세요."""
 
 
 def build_question_filter_prompt(profile: str, questions: list) -> str:
@@ -257,15 +492,17 @@ def build_solar_prompt(
     agent_plan: str,
     answered_fields: Optional[str],
     ie_extract: Optional[str],
+    policy_excerpts: Optional[str] = None,
 ) -> str:
     """최종 상담 결과 생성 프롬프트.
     
     Args:
         profile: 구조화된 프로필 문자열
-        policy_text: 정책 본문
+        policy_text: 정책 본문 (프로필과 무관하게 고른 고정 블록)
         agent_plan: Plan 단계 결과 JSON 문자열
         answered_fields: 사용자가 답한 필드 JSON 문자열 (선택)
         ie_extract: Information Extraction 결과 (선택)
+        policy_excerpts: 불확실 조건·행동 후보와 관련해 추가로 고른 본문 (선택, 사용자별 섹션에 배치)
     
     Returns:
         Solar에 전달할 프롬프트 문자열
@@ -282,6 +519,13 @@ def build_solar_prompt(
         ie_section = f"""
 ## 추출된 핵심 정보 (참고용)
 {ie_extract}
+"""
+    
+    excerpts_section = ""
+    if policy_excerpts:
+        excerpts_section = f"""
+## 관련 정책 본문 (추가)
+{policy_excerpts}
 """
     
     return f"""# Role
@@ -331,16 +575,94 @@ def build_solar_prompt(
 7. 정책 본문에 근거한 내용인가?
 
 # Context
+## 정책 문서
+{policy_text}
+{ie_section}
 ## 사용자 프로필
 {profile}
 {answered_section}
-
 ## Agent 분석 결과
 {agent_plan}
-
-## 정책 문서
-{policy_text}
-{ie_section}
-
+{excerpts_section}
 # Query
 위 정보를 종합하여 최종 상담 결과를 생성하세요. 5개 필수 섹션을 모두 포함하고, 구체적이고 실행 가능한 안내를 제공하세요."""
+
+
+# ---- 프롬프트 예산 ----
+
+# 토큰 추정 기준 (ratelimit.estimate_tokens와 같은 비율: 한국어 대략 2자당 1토큰)
+CHARS_PER_TOKEN = 2
+# IE 필드 값의 단어 중 이 비율 이상이 정책 본문에 있으면 본문과 중복으로 보고 제외
+IE_REDUNDANT_COVERAGE = 0.9
+_WORD_RE = re.compile(r"[0-9A-Za-z가-힣]+")
+
+
+def _covered(value: str, policy_words: set) -> bool:
+    words = _WORD_RE.findall(value)
+    return bool(words) and sum(word in policy_words for word in words) / len(words) >= IE_REDUNDANT_COVERAGE
+
+
+def compact_ie_extract(ie_extract: Optional[str], policy_text: str) -> Optional[str]:
+    """IE 결과에서 프롬프트에 들어갈 정책 본문에 이미 있는 필드(배열은 항목) 제거. 남는 것이 없으면 None."""
+    if not ie_extract:
+        return None
+    try:
+        parsed = json.loads(ie_extract)
+    except json.JSONDecodeError:
+        return ie_extract
+    if not isinstance(parsed, dict):
+        return ie_extract
+    policy_words = set(_WORD_RE.findall(policy_text))
+    kept: Dict[str, Any] = {}
+    for key, value in parsed.items():
+        if isinstance(value, list):
+            items = [item for item in value if not _covered(str(item), policy_words)]
+            if items:
+                kept[key] = items
+        elif value not in (None, "") and not _covered(str(value), policy_words):
+            kept[key] = value
+    return json.dumps(kept, ensure_ascii=False) if kept else None
+
+
+def compact_plan(plan_result: Dict[str, Any]) -> str:
+    """Final용 Plan 요약: 질문 목록(이미 묻고 답을 받음)은 빼고 조건·행동 후보만."""
+    return json.dumps(
+        {key: plan_result.get(key) or [] for key in ("certain_conditions", "uncertain_conditions", "action_candidates")},
+        ensure_ascii=False,
+    )
+
+
+class PromptBudget:
+    """프롬프트 1개의 토큰 예산.
+
+    템플릿·프로필 등 고정 섹션을 먼저 add()로 등록하고, 남은 예산(policy_chars)만큼 정책 본문을 고른 뒤
+    다시 add()로 등록합니다. sections에 섹션별 추정 토큰이 남아 절약량 보고에 쓰입니다.
+
+    Args:
+        max_tokens: 프롬프트 전체 입력 토큰 예산 (추정치 기준)
+    """
+
+    def __init__(self, max_tokens: int) -> None:
+        self.max_tokens = max_tokens
+        self.sections: Dict[str, int] = {}
+
+    def add(self, name: str, text: Optional[str]) -> Optional[str]:
+        """섹션 등록 (같은 이름이면 덮어씀). text를 그대로 반환."""
+        self.sections[name] = estimate_tokens(text) if text else 0
+        return text
+
+    def reserve(self, name: str, tokens: int) -> None:
+        """아직 내용이 정해지지 않은 섹션 몫을 미리 떼어 둠 (release로 해제)."""
+        self.sections[name] = tokens
+
+    def release(self, name: str) -> None:
+        self.sections.pop(name, None)
+
+    @property
+    def used(self) -> int:
+        return sum(self.sections.values())
+
+    def policy_chars(self, cap_chars: int, min_chars: int) -> int:
+        """남은 예산으로 넣을 수 있는 정책 본문 문자 수 (cap_chars 이하, 최소 min_chars)."""
+        remaining = (self.max_tokens - self.used) * CHARS_PER_TOKEN
+        return max(min_chars, min(cap_chars, remaining))
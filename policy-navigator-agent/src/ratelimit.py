@@ -0,0 +1,216 @@
+"""클라이언트 측 요청 속도 제한 / 동시 요청 수 제한
+
+프로세스 안의 모든 세션(run, batch 워커, arun 태스크)이 엔드포인트별 제한기를 공유합니다.
+- 토큰 버킷: 초당 요청 수(RPS), 분당 토큰 수(TPM, Solar). 0이면 제한 없음
+- 동시 요청 수 상한: 엔드포인트별 세마포어 (동기 호출은 스레드 간, 비동기 호출은 이벤트 루프별로 공유)
+- 대기열 지표: 대기 횟수·총/최대 대기 시간·현재 실행/대기 중인 요청 수 (limiter_stats)
+
+버킷은 "예약" 방식입니다. 요청마다 토큰을 먼저 차감하고 부족한 만큼의 시간을 기다리므로,
+동기/비동기 호출이 같은 버킷을 공유하면서도 도착 순서대로 공정하게 배분됩니다.
+TPM은 요청 전 추정 토큰으로 예약하고, 응답의 실제 usage로 차이를 정산합니다.
+속도 제한 대기를 먼저 마친 뒤 동시 요청 슬롯을 잡으므로, 대기 중인 요청이 슬롯을 막지 않습니다.
+마감 시간 초과·취소(헤지 경쟁에서 진 요청 포함)로 요청을 보내지 못하면 예약한 토큰을 반환합니다.
+"""
+
+import asyncio
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+
+from resilience import DeadlineExceeded, check_hedge_cancelled, remaining
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지는 토큰 버킷 (최대 capacity개).
+
+    Args:
+        rate: 초당 보충 토큰 수
+        capacity: 버킷 크기 (순간 허용량)
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """amount개를 예약하고, 사용 가능해질 때까지 기다려야 할 시간(초)을 반환."""
+        with self._lock:
+            self._refill()
+            self._tokens -= amount
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def adjust(self, amount: float) -> None:
+        """예약량 정산: 양수면 추가 차감, 음수면 반환."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens - amount)
+
+
+def estimate_tokens(text: str) -> int:
+    """요청 전 토큰 수 추정 (한국어 위주 텍스트 기준 대략 2자당 1토큰)."""
+    return max(1, len(text) // 2)
+
+
+class EndpointLimiter:
+    """엔드포인트 1개의 RPS / TPM / 동시 요청 수 제한과 대기 지표.
+
+    Args:
+        name: 엔드포인트 이름 (지표 표시용)
+        rps: 초당 요청 수 상한 (0이면 제한 없음)
+        max_concurrency: 동시 요청 수 상한 (0이면 제한 없음)
+        tpm: 분당 토큰 수 상한 (0이면 제한 없음)
+    """
+
+    def __init__(self, name: str, rps: float = 0, max_concurrency: int = 0, tpm: float = 0) -> None:
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self._requests = TokenBucket(rps, max(1.0, rps)) if rps > 0 else None
+        self._tokens = TokenBucket(tpm / 60.0, tpm) if tpm > 0 else None
+        self._semaphore = threading.BoundedSemaphore(max_concurrency) if max_concurrency > 0 else None
+        self._async_semaphores: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._metrics = {"requests": 0, "waited": 0, "total_wait_s": 0.0, "max_wait_s": 0.0, "in_flight": 0, "queued": 0}
+
+    def _rate_wait(self, tokens: int) -> float:
+        wait = self._requests.reserve(1) if self._requests is not None else 0.0
+        if self._tokens is not None and tokens:
+            wait = max(wait, self._tokens.reserve(tokens))
+        return wait
+
+    def _refund(self, tokens: int) -> None:
+        """요청을 보내지 않고 끝난 예약 반환 (_rate_wait의 반대)."""
+        if self._requests is not None:
+            self._requests.adjust(-1)
+        if self._tokens is not None and tokens:
+            self._tokens.adjust(-tokens)
+
+    def _check_deadline(self, wait: float) -> None:
+        left = remaining()
+        if left is not None and wait >= left:
+            raise DeadlineExceeded(f"{self.name} 요청 대기({wait:.1f}초)가 마감 시간을 넘습니다.")
+
+    def _update(self, **changes: float) -> None:
+        with self._lock:
+            for key, delta in changes.items():
+                self._metrics[key] += delta
+
+    def _finish_wait(self, started: float, attributes: Optional[Dict[str, Any]]) -> None:
+        waited = time.monotonic() - started
+        with self._lock:
+            self._metrics["requests"] += 1
+            self._metrics["queued"] -= 1
+            self._metrics["in_flight"] += 1
+            if waited > 0.001:
+                self._metrics["waited"] += 1
+                self._metrics["total_wait_s"] += waited
+                self._metrics["max_wait_s"] = max(self._metrics["max_wait_s"], waited)
+        if attributes is not None:
+            attributes["queue_wait_ms"] = attributes.get("queue_wait_ms", 0.0) + round(waited * 1000, 1)
+
+    def _async_semaphore(self) -> Optional[asyncio.Semaphore]:
+        if self.max_concurrency <= 0:
+            return None
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._async_semaphores.get(loop)
+            if semaphore is None:
+                semaphore = asyncio.Semaphore(self.max_concurrency)
+                self._async_semaphores[loop] = semaphore
+            return semaphore
+
+    @contextmanager
+    def limit(self, tokens: int = 0, attributes: Optional[Dict[str, Any]] = None) -> Iterator[None]:
+        """RPS/TPM 제한만큼 대기한 뒤, 블록 실행 동안 동시 요청 슬롯 1개를 점유.
+
+        Args:
+            tokens: TPM 예약 토큰 수 (추정치)
+            attributes: trace span 속성 (queue_wait_ms 누적)
+        """
+        started = time.monotonic()
+        self._update(queued=1)
+        reserved = acquired = False
+        try:
+            wait = self._rate_wait(tokens)
+            reserved = True
+            self._check_deadline(wait)
+            if wait > 0:
+                time.sleep(wait)
+            if self._semaphore is not None:
+                timeout = remaining()
+                if not self._semaphore.acquire(timeout=max(0.0, timeout) if timeout is not None else None):
+                    raise DeadlineExceeded(f"{self.name} 동시 요청 슬롯을 마감 시간 안에 얻지 못했습니다.")
+                acquired = True
+            check_hedge_cancelled()  # 기다리는 사이 헤지 경쟁이 끝났으면 요청을 보내지 않음
+        except BaseException:
+            self._update(queued=-1)
+            if acquired:
+                self._semaphore.release()
+            if reserved:
+                self._refund(tokens)
+            raise
+        self._finish_wait(started, attributes)
+        try:
+            yield
+        finally:
+            self._update(in_flight=-1)
+            if acquired:
+                self._semaphore.release()
+
+    @asynccontextmanager
+    async def alimit(self, tokens: int = 0, attributes: Optional[Dict[str, Any]] = None) -> AsyncIterator[None]:
+        """limit의 비동기 버전 (동시 요청 상한은 이벤트 루프별로 적용)."""
+        started = time.monotonic()
+        self._update(queued=1)
+        semaphore = self._async_semaphore()
+        reserved = acquired = False
+        try:
+            wait = self._rate_wait(tokens)
+            reserved = True
+            self._check_deadline(wait)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            if semaphore is not None:
+                timeout = remaining()
+                try:
+                    await asyncio.wait_for(semaphore.acquire(), timeout=max(0.0, timeout) if timeout is not None else None)
+                except asyncio.TimeoutError:
+                    raise DeadlineExceeded(f"{self.name} 동시 요청 슬롯을 마감 시간 안에 얻지 못했습니다.") from None
+                acquired = True
+            check_hedge_cancelled()
+        except BaseException:
+            self._update(queued=-1)
+            if acquired:
+                semaphore.release()
+            if reserved:
+                self._refund(tokens)
+            raise
+        self._finish_wait(started, attributes)
+        try:
+            yield
+        finally:
+            self._update(in_flight=-1)
+            if acquired:
+                semaphore.release()
+
+    def settle_tokens(self, estimated: int, actual: Optional[int]) -> None:
+        """응답 usage로 TPM 예약량 정산 (usage가 없으면 추정치 유지)."""
+        if self._tokens is not None and actual is not None:
+            self._tokens.adjust(actual - estimated)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics = dict(self._metrics)
+        metrics["total_wait_s"] = round(metrics["total_wait_s"], 3)
+        metrics["max_wait_s"] = round(metrics["max_wait_s"], 3)
+        metrics["avg_wait_s"] = round(metrics["total_wait_s"] / metrics["waited"], 3) if metrics["waited"] else 0.0
+        return metrics
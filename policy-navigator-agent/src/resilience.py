@@ -0,0 +1,357 @@
+"""Upstage 호출 복원력 모듈: 재시도 / 헤지 요청 / 마감 시간
+
+- 재시도: 429 / 5xx / 연결·타임아웃 오류에 지터(full jitter)를 넣은 지수 백오프.
+  Retry-After 헤더가 있으면 그 시간 이상 기다림. 재시도 횟수는 trace span의 retries 속성에 기록
+- 헤지 요청 (Solar, 선택): 응답이 단계별 최근 p95 지연을 넘기면 같은 요청을 한 번 더 보내고
+  먼저 도착한 응답을 사용 (꼬리 지연 감소). 비용이 늘어나므로 SOLAR_HEDGE_ENABLED=1일 때만.
+  주 요청·헤지 요청은 각각 SOLAR_MAX_CONCURRENCY 크기의 풀에서 실행하고, 진 쪽은 재시도·다음 시도를 하지 않음
+- 마감 시간: deadline(초) 블록 또는 STAGE_DEADLINES(단계별, 단계 시작 시각 기준)이 지나면
+  DeadlineExceeded. 요청 타임아웃도 남은 시간 이하로 줄임.
+  contextvars 기반이므로 StageGraph 워커 스레드·asyncio 태스크로 그대로 전달됨
+"""
+
+import asyncio
+import contextvars
+import email.utils
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, TypeVar
+
+import httpx
+import openai
+
+from config import (
+    SOLAR_HEDGE_ENABLED,
+    SOLAR_HEDGE_INITIAL_DELAY,
+    SOLAR_HEDGE_MIN_DELAY,
+    SOLAR_HEDGE_MIN_SAMPLES,
+    SOLAR_MAX_CONCURRENCY,
+    STAGE_DEADLINES,
+    UPSTAGE_MAX_RETRIES,
+    UPSTAGE_RETRY_BASE_DELAY,
+    UPSTAGE_RETRY_MAX_DELAY,
+)
+from tracing import current_stage, stage_started_at
+
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+_deadline: contextvars.ContextVar = contextvars.ContextVar("deadline", default=None)
+# 헤지 경쟁 중인 호출의 취소 신호 (상대가 먼저 끝나면 set)
+_hedge_cancel: contextvars.ContextVar = contextvars.ContextVar("hedge_cancel", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """단계/요청 마감 시간 초과."""
+
+
+class HedgeCancelled(Exception):
+    """헤지 경쟁에서 다른 쪽이 먼저 끝나 중단한 호출 (결과는 쓰이지 않음)."""
+
+
+class RetryableHTTPError(Exception):
+    """재시도 대상 HTTP 응답 (OpenAI SDK를 거치지 않는 httpx 직접 호출용)."""
+
+    def __init__(self, response: httpx.Response) -> None:
+        super().__init__(f"HTTP {response.status_code}")
+        self.status_code = response.status_code
+        self.text = response.text
+        self.headers = response.headers
+
+
+def raise_for_retryable(response: httpx.Response) -> httpx.Response:
+    """재시도 대상 상태 코드면 RetryableHTTPError, 아니면 응답 그대로 반환."""
+    if response.status_code in RETRYABLE_STATUS_CODES:
+        raise RetryableHTTPError(response)
+    return response
+
+
+# ---------------------------------------------------------------------------
+# 마감 시간
+# ---------------------------------------------------------------------------
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[None]:
+    """블록 안의 Upstage 호출이 seconds 안에 끝나도록 제한 (바깥 마감이 더 이르면 그쪽 유지)."""
+    new_deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(new_deadline if current is None else min(current, new_deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """가장 이른 마감(deadline 블록, 현재 단계의 STAGE_DEADLINES)까지 남은 초. 마감이 없으면 None."""
+    candidates = []
+    explicit = _deadline.get()
+    if explicit is not None:
+        candidates.append(explicit)
+    stage_limit = STAGE_DEADLINES.get(current_stage())
+    started = stage_started_at()
+    if stage_limit and started is not None:
+        candidates.append(started + stage_limit)
+    if not candidates:
+        return None
+    return min(candidates) - time.monotonic()
+
+
+def request_timeout(default: float) -> float:
+    """요청 1건의 타임아웃: 기본값과 남은 마감 시간 중 작은 값. 이미 지났으면 DeadlineExceeded."""
+    left = remaining()
+    if left is None:
+        return default
+    if left <= 0:
+        raise DeadlineExceeded(f"'{current_stage()}' 단계 마감 시간을 초과했습니다.")
+    return min(default, left)
+
+
+# ---------------------------------------------------------------------------
+# 재시도
+# ---------------------------------------------------------------------------
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, RetryableHTTPError):
+        return True
+    if isinstance(exc, openai.APIStatusError):
+        return exc.status_code in RETRYABLE_STATUS_CODES
+    # APITimeoutError는 APIConnectionError의 하위 클래스
+    return isinstance(exc, (openai.APIConnectionError, httpx.TransportError))
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    """Retry-After 헤더(초 또는 HTTP 날짜)를 초로 변환."""
+    headers = getattr(exc, "headers", None)
+    if headers is None:
+        response = getattr(exc, "response", None)
+        headers = getattr(response, "headers", None)
+    value = headers.get("retry-after") if headers is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """attempt번째 재시도 전 대기 시간 (full jitter). Retry-After가 있으면 그 이상."""
+    delay = random.uniform(0, min(UPSTAGE_RETRY_MAX_DELAY, UPSTAGE_RETRY_BASE_DELAY * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, UPSTAGE_RETRY_MAX_DELAY))
+    return delay
+
+
+def _next_delay(exc: Exception, attempt: int) -> float:
+    """재시도 가능하면 대기 시간, 아니면 예외를 그대로 다시 발생."""
+    if not is_retryable(exc) or attempt >= UPSTAGE_MAX_RETRIES:
+        raise exc
+    delay = backoff_delay(attempt, _retry_after(exc))
+    left = remaining()
+    if left is not None and delay >= left:
+        raise DeadlineExceeded(f"'{current_stage()}' 단계 마감 시간 안에 재시도할 수 없습니다.") from exc
+    return delay
+
+
+def check_hedge_cancelled() -> None:
+    """헤지 경쟁에서 이미 진 호출이면 HedgeCancelled (요청을 보내기 직전에 확인)."""
+    event = _hedge_cancel.get()
+    if event is not None and event.is_set():
+        raise HedgeCancelled(f"'{current_stage()}' 단계 헤지 경쟁에서 다른 요청이 먼저 끝났습니다.")
+
+
+def call_with_retry(fn: Callable[[], T], attributes: Optional[Dict[str, Any]] = None) -> T:
+    """fn()을 재시도 정책에 따라 실행. attributes(trace span 속성)가 있으면 retries 기록."""
+    attempt = 0
+    while True:
+        check_hedge_cancelled()
+        try:
+            return fn()
+        except Exception as exc:
+            delay = _next_delay(exc, attempt)
+        attempt += 1
+        if attributes is not None:
+            attributes["retries"] = attributes.get("retries", 0) + 1
+        time.sleep(delay)
+
+
+async def acall_with_retry(fn: Callable[[], Awaitable[T]], attributes: Optional[Dict[str, Any]] = None) -> T:
+    """call_with_retry의 비동기 버전 (fn은 매번 새 코루틴을 만드는 함수)."""
+    attempt = 0
+    while True:
+        try:
+            return await fn()
+        except Exception as exc:
+            delay = _next_delay(exc, attempt)
+        attempt += 1
+        if attributes is not None:
+            attributes["retries"] = attributes.get("retries", 0) + 1
+        await asyncio.sleep(delay)
+
+
+# ---------------------------------------------------------------------------
+# 헤지 요청
+# ---------------------------------------------------------------------------
+
+
+class LatencyTracker:
+    """키(단계)별 최근 성공 응답 지연 시간. p95 계산용.
+
+    Args:
+        window: 키별로 보관할 최근 표본 수
+    """
+
+    def __init__(self, window: int = 200) -> None:
+        self._lock = threading.Lock()
+        self._samples: Dict[str, deque] = {}
+        self.window = window
+
+    def record(self, key: str, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(key, deque(maxlen=self.window)).append(seconds)
+
+    def p95(self, key: str, min_samples: int) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if len(samples) < max(1, min_samples):
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+
+_latencies = LatencyTracker()
+_hedge_lock = threading.Lock()
+_pools: Dict[str, ThreadPoolExecutor] = {}
+
+
+def _executor(name: str) -> ThreadPoolExecutor:
+    """헤지 사용 시 요청을 실행하는 풀 ("solar-primary" / "solar-hedge"). 동시에 나갈 수 있는 Solar 요청 수
+    (SOLAR_MAX_CONCURRENCY)만큼만 스레드를 두므로 호출 수가 많아도 스레드가 늘어나지 않음."""
+    with _hedge_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            pool = _pools[name] = ThreadPoolExecutor(max_workers=max(1, SOLAR_MAX_CONCURRENCY), thread_name_prefix=name)
+        return pool
+
+
+def _hedge_executor() -> ThreadPoolExecutor:
+    """실제로 보낸 헤지 요청만 실행하는 풀."""
+    return _executor("solar-hedge")
+
+
+def _run_branch(fn: Callable[[], T], key: str, cancel: threading.Event, started: Optional[threading.Event]) -> T:
+    if started is not None:
+        started.set()
+    _hedge_cancel.set(cancel)
+    return _timed(fn, key)
+
+
+def _start_primary(fn: Callable[[], T], key: str, cancel: threading.Event) -> "Future[T]":
+    """주 요청을 주 요청 풀에서 시작하고 실제로 실행되기 시작할 때까지 대기.
+
+    헤지 대기 시간은 실행 시작부터 세므로, 풀 자리를 기다리는 동안에는 헤지를 보내지 않음.
+    """
+    started = threading.Event()
+    future = _executor("solar-primary").submit(contextvars.copy_context().run, _run_branch, fn, key, cancel, started)
+    started.wait()
+    return future
+
+
+def hedge_delay(key: str) -> Optional[float]:
+    """헤지 요청을 보낼 대기 시간. 비활성화면 None. 표본이 부족하면 SOLAR_HEDGE_INITIAL_DELAY."""
+    if not SOLAR_HEDGE_ENABLED:
+        return None
+    p95 = _latencies.p95(key, SOLAR_HEDGE_MIN_SAMPLES)
+    return SOLAR_HEDGE_INITIAL_DELAY if p95 is None else max(SOLAR_HEDGE_MIN_DELAY, p95)
+
+
+def _timed(fn: Callable[[], T], key: str) -> T:
+    started = time.monotonic()
+    result = fn()
+    _latencies.record(key, time.monotonic() - started)
+    return result
+
+
+def call_hedged(fn: Callable[[], T], attributes: Optional[Dict[str, Any]] = None) -> T:
+    """fn()을 실행하되 hedge_delay가 지나도 끝나지 않으면 같은 호출을 한 번 더 보내 먼저 끝난 결과 반환.
+
+    fn은 멱등이어야 함 (Solar 비스트리밍 호출). 한쪽이 성공하면 다른 쪽에 취소 신호를 보내,
+    진 쪽은 이미 보낸 HTTP 요청만 마치고 재시도·다음 시도(슬롯 대기 후 전송 포함)는 하지 않음.
+    """
+    key = current_stage()
+    delay = hedge_delay(key)
+    if delay is None:
+        return _timed(fn, key)
+
+    primary_cancel = threading.Event()
+    primary = _start_primary(fn, key, primary_cancel)
+    done, _ = wait([primary], timeout=delay)
+    if done:
+        return primary.result()
+
+    if attributes is not None:
+        attributes["hedged"] = True
+    hedge_cancel = threading.Event()
+    secondary: Future = _hedge_executor().submit(
+        contextvars.copy_context().run, _run_branch, fn, key, hedge_cancel, None
+    )
+    cancels = {primary: primary_cancel, secondary: hedge_cancel}
+    pending = {primary, secondary}
+    first_error: Optional[BaseException] = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                for loser in pending:
+                    cancels[loser].set()
+                return future.result()
+            first_error = first_error or future.exception()
+    raise first_error
+
+
+async def acall_hedged(fn: Callable[[], Awaitable[T]], attributes: Optional[Dict[str, Any]] = None) -> T:
+    """call_hedged의 비동기 버전. 먼저 끝난 쪽을 쓰고 나머지 요청은 취소."""
+    key = current_stage()
+    delay = hedge_delay(key)
+
+    async def _atimed() -> T:
+        started = time.monotonic()
+        result = await fn()
+        _latencies.record(key, time.monotonic() - started)
+        return result
+
+    if delay is None:
+        return await _atimed()
+
+    primary = asyncio.ensure_future(_atimed())
+    done, _ = await asyncio.wait({primary}, timeout=delay)
+    if done:
+        return primary.result()
+
+    if attributes is not None:
+        attributes["hedged"] = True
+    pending = {primary, asyncio.ensure_future(_atimed())}
+    first_error: Optional[BaseException] = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                first_error = first_error or task.exception()
+        raise first_error
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,221 @@
+"""정책 문서 청킹 및 로컬 검색 모듈
+
+Document Parse의 elements(heading/paragraph/table 등)를 섹션 단위 청크로 묶고,
+BM25(외부 서비스 없이 로컬 계산)로 프로필·조건과 관련된 청크만 골라
+프롬프트 예산(문자 수) 안에서 원문 순서대로 이어 붙입니다.
+- 한국어는 조사 결합이 많으므로 단어 + 음절 bigram으로 토큰화
+- 예산이 남으면 점수 0인 청크도 문서 앞쪽부터 채움 (짧은 문서는 전체 포함)
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Any, Collection, Dict, List, Optional
+
+
+# 청크 최대 길이 (문자). heading을 만나거나 이 길이를 넘으면 새 청크 시작
+CHUNK_MAX_CHARS = 1200
+# 페이지 머리말/꼬리말 등 본문이 아닌 요소
+_SKIP_CATEGORIES = {"header", "footer", "figure", "chart"}
+_TOKEN_RE = re.compile(r"[0-9a-z]+|[가-힣]+")
+_HANGUL_RE = re.compile(r"[가-힣]")
+
+
+def _clean_text(raw: str) -> str:
+    text = re.sub(r"<[^>]+>", " ", raw) if "<" in raw and ">" in raw else raw
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _element_text(element: Dict[str, Any]) -> str:
+    content = element.get("content")
+    if isinstance(content, dict):
+        raw = content.get("text") or content.get("markdown") or content.get("html") or ""
+    elif isinstance(content, str):
+        raw = content
+    else:
+        raw = ""
+    return _clean_text(str(raw))
+
+
+def tokenize(text: str) -> List[str]:
+    """검색용 토큰화: 영숫자 단어 + 한글 단어 + 한글 음절 bigram."""
+    tokens: List[str] = []
+    for word in _TOKEN_RE.findall(text.lower()):
+        tokens.append(word)
+        if _HANGUL_RE.match(word) and len(word) > 2:
+            tokens.extend(word[i : i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def _split_text(text: str, max_chars: int) -> List[str]:
+    """긴 텍스트를 문장 경계 기준으로 max_chars 이하 조각으로 분할."""
+    sentences = re.split(r"(?<=[.!?])\s+", text)
+    pieces: List[str] = []
+    current = ""
+    for sentence in sentences:
+        while len(sentence) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            pieces.append(current)
+            current = ""
+        current = f"{current} {sentence}".strip()
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def chunk_elements(elements: List[Any], max_chars: int = CHUNK_MAX_CHARS) -> List[Dict[str, Any]]:
+    """Document Parse elements를 청크 목록으로 변환.
+
+    Returns:
+        [{"id": 0, "heading": "...", "page": 1, "text": "..."}, ...] (문서 순서)
+    """
+    chunks: List[Dict[str, Any]] = []
+    heading = ""
+    current: List[str] = []
+    page: Optional[int] = None
+
+    def _flush() -> None:
+        nonlocal current
+        body = " ".join(current).strip()
+        if body:
+            for piece in _split_text(body, max_chars):
+                chunks.append({"id": len(chunks), "heading": heading, "page": page, "text": piece})
+        current = []
+
+    for element in elements:
+        if not isinstance(element, dict):
+            continue
+        category = str(element.get("category") or element.get("type") or "").lower()
+        if category in _SKIP_CATEGORIES:
+            continue
+        text = _element_text(element)
+        if not text:
+            continue
+        if category.startswith("heading") or category == "title":
+            _flush()
+            heading = text
+            page = element.get("page", page)
+            continue
+        if category == "table":
+            # 표는 조건/금액이 몰려 있으므로 단독 청크로 유지
+            _flush()
+            page = element.get("page", page)
+            current.append(text)
+            _flush()
+            continue
+        if current and sum(len(t) + 1 for t in current) + len(text) > max_chars:
+            _flush()
+        if not current:
+            page = element.get("page", page)
+        current.append(text)
+    _flush()
+    return chunks
+
+
+def chunk_text(text: str, max_chars: int = CHUNK_MAX_CHARS) -> List[Dict[str, Any]]:
+    """elements가 없는 응답용: 정규화된 본문을 길이 기준으로 청킹."""
+    return [
+        {"id": i, "heading": "", "page": None, "text": piece}
+        for i, piece in enumerate(_split_text(_clean_text(text), max_chars))
+    ]
+
+
+class BM25Index:
+    """청크 목록에 대한 BM25 인덱스."""
+
+    def __init__(self, chunks: List[Dict[str, Any]], k1: float = 1.5, b: float = 0.75) -> None:
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+        self._term_freqs = [Counter(tokenize(f"{c['heading']} {c['text']}")) for c in chunks]
+        self._lengths = [sum(tf.values()) for tf in self._term_freqs]
+        self._avg_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+        doc_freq: Counter = Counter()
+        for tf in self._term_freqs:
+            doc_freq.update(tf.keys())
+        n = len(chunks)
+        self._idf = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in doc_freq.items()
+        }
+
+    def scores(self, query: str) -> List[float]:
+        terms = [t for t in set(tokenize(query)) if t in self._idf]
+        results = []
+        for tf, length in zip(self._term_freqs, self._lengths):
+            score = 0.0
+            norm = self.k1 * (1 - self.b + self.b * length / self._avg_length) if self._avg_length else self.k1
+            for term in terms:
+                freq = tf.get(term)
+                if freq:
+                    score += self._idf[term] * freq * (self.k1 + 1) / (freq + norm)
+            results.append(score)
+        return results
+
+    def select(self, query: str, budget_chars: int, exclude: Collection[int] = ()) -> List[Dict[str, Any]]:
+        """관련도 순으로 예산 안에 들어가는 청크를 고르고 문서 순서로 정렬해 반환 (exclude: 제외할 청크 id)."""
+        scores = self.scores(query)
+        ranked = sorted(range(len(self.chunks)), key=lambda i: (-scores[i], i))
+        selected = []
+        used = 0
+        for i in ranked:
+            if self.chunks[i]["id"] in exclude:
+                continue
+            size = len(self.chunks[i]["text"]) + len(self.chunks[i]["heading"]) + 2
+            if used + size > budget_chars:
+                continue
+            selected.append(i)
+            used += size
+        return [self.chunks[i] for i in sorted(selected)]
+
+
+def format_chunks(chunks: List[Dict[str, Any]]) -> str:
+    """선택된 청크를 프롬프트용 텍스트로 결합 (섹션 제목이 바뀔 때만 제목 표시)."""
+    lines = []
+    last_heading = None
+    for chunk in chunks:
+        if chunk["heading"] and chunk["heading"] != last_heading:
+            lines.append(f"■ {chunk['heading']}")
+            last_heading = chunk["heading"]
+        lines.append(chunk["text"])
+    return "\n".join(lines)
+
+
+class PolicyIndex:
+    """정책 문서 1건: 청크 + BM25 인덱스 + (기존 호환용) 정규화 본문.
+
+    Args:
+        chunks: chunk_elements / chunk_text 결과
+        text: 정규화된 정책 본문 (전체 본문이 필요한 곳에서 사용)
+        conditions: 프로필과 무관한 자격 조건 목록 (정책 팩에서 로드한 경우, 없으면 None)
+        predicates: 자격 조건의 조건식 (eligibility.prescreen용, 없으면 None)
+    """
+
+    def __init__(
+        self,
+        chunks: List[Dict[str, Any]],
+        text: str,
+        conditions: Optional[List[Dict[str, Any]]] = None,
+        predicates: Optional[List[Dict[str, Any]]] = None,
+    ) -> None:
+        self.chunks = chunks
+        self.text = text
+        self.conditions = conditions
+        self.predicates = predicates
+        self._bm25 = BM25Index(chunks)
+
+    def select_text(self, query: str, budget_chars: int) -> str:
+        """질의와 관련된 청크만 골라 budget_chars 이내의 정책 텍스트로 반환."""
+        if not self.chunks:
+            return self.text[:budget_chars]
+        return format_chunks(self._bm25.select(query, budget_chars))
+
+    def select_chunks(self, query: str, budget_chars: int, exclude: Collection[int] = ()) -> List[Dict[str, Any]]:
+        """select_text의 청크 목록 버전 (exclude: 이미 프롬프트에 넣은 청크 id). 청크가 없는 문서는 []."""
+        if budget_chars <= 0:
+            return []
+        return self._bm25.select(query, budget_chars, exclude)
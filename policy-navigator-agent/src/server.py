@@ -0,0 +1,316 @@
+"""HTTP 서버 모드 (ASGI): 대화형 질문 루프를 요청 단위 단계로 나누어 여러 대화를 한 프로세스에서 동시에 처리
+
+run은 input()에서 멈추므로 사용자마다 프로세스가 필요하지만, 서버 모드는 대화를 단계별 요청으로 나누고
+(시작 → 질문 → 답변 → 최종) 단계 사이의 상태를 세션 저장소에 둡니다.
+- 프레임워크 없이 ASGI 규약만 구현 (uvicorn 등 ASGI 서버로 실행: python src/main.py serve)
+- 정책(청크·BM25 인덱스·IE 결과)은 PolicyStore에 상주시켜 세션 간 공유 (시작 시 미리 로드, 파일이 바뀌면 다시 로드)
+- 세션 저장소는 교체 가능: SessionStore의 get/put/delete를 구현 (기본: 프로세스 메모리, TTL·최대 개수)
+- 오류 응답: 잘못된 요청 4xx, Upstage 호출 실패 502, 마감 시간 초과 504, 그 밖의 내부 오류 500
+- 같은 세션에 대한 요청은 프로세스 안에서 순서대로 처리 (워커 여러 개 + 외부 저장소면 세션별로 같은 워커로 라우팅)
+
+엔드포인트 (JSON):
+    GET    /health
+    GET    /policies                  정책별 상주 메모리·로드 시각
+    POST   /sessions                  {"profile": "...", "policy": "finance_policy"}  → 질문 목록
+    GET    /sessions/{id}
+    POST   /sessions/{id}/answers     {"answers": [{"id": 0, "answer": "..."}]}
+    POST   /sessions/{id}/final       → 최종 상담 결과
+    DELETE /sessions/{id}
+"""
+
+import abc
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+import openai
+
+from agent import DEFAULT_PDF_PATH, afinish_session, astart_session, asubmit_answers
+from config import POLICY_PRELOAD, SERVER_POLICIES, SESSION_MAX_COUNT, SESSION_TTL_MINUTES
+from policy_store import PolicyStore
+from resilience import DeadlineExceeded, RetryableHTTPError
+from upstage_client import UpstageAPIError, aclose_clients, awarm_clients
+
+
+# 요청 본문 최대 크기 (프로필·답변 텍스트만 받으므로 작게)
+MAX_BODY_BYTES = 64 * 1024
+_SESSION_PATH_RE = re.compile(r"^/sessions/([0-9a-f]{32})(/answers|/final)?$")
+# Upstage 호출 실패로 보는 예외 (502). 구간 분할 파싱처럼 다른 예외로 감싸 다시 던진 경우도 원인을 따라가 확인
+_UPSTREAM_ERRORS = (UpstageAPIError, RetryableHTTPError, openai.APIError, httpx.HTTPError)
+
+logger = logging.getLogger(__name__)
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class SessionStore(abc.ABC):
+    """세션 상태 저장소 인터페이스. 상태는 JSON 직렬화 가능한 dict (agent.astart_session 형식).
+
+    다른 백엔드(Redis 등)를 쓰려면 이 세 메서드를 구현해 create_app(store=...)으로 전달
+    (하나라도 빠지면 인스턴스를 만들 때 TypeError). __len__은 /health의 세션 수로, 구현하지 않으면 0.
+    """
+
+    @abc.abstractmethod
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """세션 상태. 없거나 만료되었으면 None."""
+
+    @abc.abstractmethod
+    async def put(self, session_id: str, state: Dict[str, Any]) -> None:
+        """세션 상태 저장 (있으면 덮어씀)."""
+
+    @abc.abstractmethod
+    async def delete(self, session_id: str) -> None:
+        """세션 삭제 (없어도 오류 아님)."""
+
+    def __len__(self) -> int:
+        return 0
+
+
+class InMemorySessionStore(SessionStore):
+    """프로세스 메모리 세션 저장소. 마지막 접근 후 ttl_seconds가 지나거나 max_sessions를 넘으면 오래된 것부터 삭제.
+
+    외부 저장소와 같은 조건이 되도록 JSON 문자열로 보관 (직렬화 불가능한 값이 섞이면 바로 드러남).
+    """
+
+    def __init__(self, ttl_seconds: float, max_sessions: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max(1, max_sessions)
+        self._items: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        while self._items:
+            session_id, (touched, _) = next(iter(self._items.items()))
+            if len(self._items) <= self.max_sessions and now - touched <= self.ttl_seconds:
+                break
+            del self._items[session_id]
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        self._evict()
+        item = self._items.get(session_id)
+        if item is None:
+            return None
+        self._items[session_id] = (time.monotonic(), item[1])
+        self._items.move_to_end(session_id)
+        return json.loads(item[1])
+
+    async def put(self, session_id: str, state: Dict[str, Any]) -> None:
+        self._items[session_id] = (time.monotonic(), json.dumps(state, ensure_ascii=False))
+        self._items.move_to_end(session_id)
+        self._evict()
+
+    async def delete(self, session_id: str) -> None:
+        self._items.pop(session_id, None)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+def _session_view(session_id: str, state: Dict[str, Any]) -> Dict[str, Any]:
+    """클라이언트에 돌려줄 세션 정보 (Plan 내부 결과·프로필 원문은 제외)."""
+    return {
+        "session_id": session_id,
+        "policy": state["policy"],
+        "status": state["status"],
+        "structured_profile": state["structured_profile"],
+        "questions": [{**q, "answered": q["id"] in state["answered"]} for q in state["questions"]],
+        "result": state["result"],
+    }
+
+
+def _caused_by(exc: Optional[BaseException], types: Tuple[type, ...]) -> bool:
+    """exc 또는 그 원인 예외(__cause__/__context__)가 types 중 하나인지."""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        if isinstance(exc, types):
+            return True
+        seen.add(id(exc))
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+
+def _error_response(exc: Exception) -> Tuple[int, Dict[str, Any]]:
+    """처리 중 예외 → (상태 코드, 본문)."""
+    if isinstance(exc, HTTPError):
+        return exc.status, {"error": exc.message}
+    if _caused_by(exc, (DeadlineExceeded,)):
+        return 504, {"error": f"처리 시간이 초과되었습니다: {exc}"}
+    if _caused_by(exc, _UPSTREAM_ERRORS):
+        return 502, {"error": f"{type(exc).__name__}: {exc}"}
+    logger.exception("요청 처리 중 내부 오류")
+    return 500, {"error": "내부 오류가 발생했습니다."}
+
+
+def _parse_answers(body: Dict[str, Any]) -> Dict[int, str]:
+    answers = body.get("answers")
+    if isinstance(answers, dict):  # {"0": "..."} 형식도 허용
+        answers = [{"id": key, "answer": value} for key, value in answers.items()]
+    if not isinstance(answers, list):
+        raise HTTPError(400, "answers는 [{\"id\": 질문 id, \"answer\": 답변}] 목록이어야 합니다.")
+    parsed: Dict[int, str] = {}
+    for item in answers:
+        try:
+            parsed[int(item["id"])] = str(item.get("answer") or "")
+        except (TypeError, KeyError, ValueError):
+            raise HTTPError(400, f"잘못된 답변 항목입니다: {item}") from None
+    return parsed
+
+
+class PolicyNavigatorApp:
+    """ASGI 애플리케이션.
+
+    Args:
+        policies: 서비스할 정책 PDF / 정책 팩 경로 목록 (요청의 policy는 파일 이름)
+        store: 세션 저장소 (없으면 InMemorySessionStore)
+    """
+
+    def __init__(self, policies: List[str], store: Optional[SessionStore] = None) -> None:
+        self.policies = PolicyStore(policies)
+        self.store = store or InMemorySessionStore(SESSION_TTL_MINUTES * 60, SESSION_MAX_COUNT)
+        self._locks: Dict[str, List[Any]] = {}  # 세션 id → [Lock, 대기 중인 요청 수]
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable[[], Awaitable[Dict[str, Any]]], send: Callable) -> None:
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    try:
+                        await self.startup()
+                    except Exception as exc:
+                        await send({"type": "lifespan.startup.failed", "message": f"{type(exc).__name__}: {exc}"})
+                        return
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await aclose_clients()
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+        try:
+            body = await self._read_json(receive)
+            status, payload = await self._route(scope["method"], scope["path"], body)
+        except Exception as exc:
+            status, payload = _error_response(exc)
+        await self._respond(send, status, payload)
+
+    async def startup(self) -> None:
+        """워커 시작 시: 공유 클라이언트 생성 + (POLICY_PRELOAD) 정책 미리 로드."""
+        await awarm_clients()
+        if POLICY_PRELOAD:
+            await self.policies.preload()
+
+    def _resolve_policy(self, name: Optional[str]) -> str:
+        if not name:
+            if len(self.policies.sources) != 1:
+                raise HTTPError(400, f"policy를 지정하세요: {sorted(self.policies.sources)}")
+            return next(iter(self.policies.sources))
+        if name not in self.policies:
+            raise HTTPError(404, f"없는 정책입니다: {name}")
+        return name
+
+    async def _read_json(self, receive: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        chunks, size = [], 0
+        while True:
+            message = await receive()
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > MAX_BODY_BYTES:
+                raise HTTPError(413, "요청 본문이 너무 큽니다.")
+            chunks.append(chunk)
+            if not message.get("more_body"):
+                break
+        raw = b"".join(chunks)
+        if not raw:
+            return {}
+        try:
+            body = json.loads(raw)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            raise HTTPError(400, "요청 본문이 JSON이 아닙니다.") from None
+        if not isinstance(body, dict):
+            raise HTTPError(400, "요청 본문은 JSON 객체여야 합니다.")
+        return body
+
+    @staticmethod
+    async def _respond(send: Callable, status: int, payload: Optional[Dict[str, Any]]) -> None:
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8") if payload is not None else b""
+        headers = [(b"content-length", str(len(data)).encode())]
+        if payload is not None:
+            headers.append((b"content-type", b"application/json; charset=utf-8"))
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": data})
+
+    async def _route(self, method: str, path: str, body: Dict[str, Any]) -> Tuple[int, Optional[Dict[str, Any]]]:
+        if path == "/health" and method == "GET":
+            return 200, {"status": "ok", "sessions": len(self.store), "policies": sorted(self.policies.sources)}
+        if path == "/policies" and method == "GET":
+            return 200, self.policies.memory_stats()
+        if path == "/sessions" and method == "POST":
+            return await self._start(body)
+        match = _SESSION_PATH_RE.match(path)
+        if not match:
+            raise HTTPError(404, "없는 경로입니다.")
+        session_id, action = match.groups()
+        entry = self._locks.setdefault(session_id, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                return await self._session_action(method, session_id, action, body)
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[session_id]
+
+    async def _start(self, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        profile = str(body.get("profile") or "").strip()
+        if not profile:
+            raise HTTPError(400, "profile이 필요합니다.")
+        name = self._resolve_policy(body.get("policy"))
+        policy, ie_extract = await self.policies.get(name)
+        state = {"policy": name, **await astart_session(profile, policy, ie_extract)}
+        session_id = uuid.uuid4().hex
+        await self.store.put(session_id, state)
+        return 201, _session_view(session_id, state)
+
+    async def _session_action(
+        self, method: str, session_id: str, action: Optional[str], body: Dict[str, Any]
+    ) -> Tuple[int, Optional[Dict[str, Any]]]:
+        state = await self.store.get(session_id)
+        if state is None:
+            raise HTTPError(404, "세션이 없거나 만료되었습니다.")
+        if action is None:
+            if method == "GET":
+                return 200, _session_view(session_id, state)
+            if method == "DELETE":
+                await self.store.delete(session_id)
+                return 204, None
+        elif method == "POST":
+            if state["status"] == "done":
+                raise HTTPError(409, "이미 최종 결과가 생성된 세션입니다.")
+            if action == "/answers":
+                try:
+                    state = await asubmit_answers(state, _parse_answers(body))
+                except ValueError as exc:
+                    raise HTTPError(400, str(exc)) from None
+            else:
+                policy, ie_extract = await self.policies.get(state["policy"])
+                state = await afinish_session(state, policy, ie_extract)
+            await self.store.put(session_id, state)
+            return 200, _session_view(session_id, state)
+        raise HTTPError(405, "허용되지 않는 메서드입니다.")
+
+
+def create_app(policies: Optional[List[str]] = None, store: Optional[SessionStore] = None) -> PolicyNavigatorApp:
+    """ASGI 앱 생성. policies가 없으면 SERVER_POLICIES 설정, 그것도 없으면 기본 PDF."""
+    return PolicyNavigatorApp(policies or SERVER_POLICIES or [os.path.normpath(DEFAULT_PDF_PATH)], store=store)
@@ -0,0 +1,239 @@
+"""단계별 지연 시간 / 토큰 계측 모듈
+
+Upstage API 호출(Solar, Document Parse, IE) 1건 = span 1개로 기록합니다.
+- 호출한 단계(stage): agent의 각 단계 함수에 @traced_stage("plan") 형태로 지정
+- 벽시계 시간, prompt/completion 토큰(응답 usage), 전송 바이트, 재시도 횟수, 성공 여부
+- 프롬프트 예산 적용으로 줄인 입력 토큰(추정)은 API 호출이 아닌 "prompt_budget" span으로 기록
+- JSON Lines로 내보내며, 각 줄은 OpenTelemetry span 필드명(trace_id, span_id, name,
+  start_time_unix_nano, end_time_unix_nano, attributes, status)을 따름
+
+기본은 비활성화 상태이며 enable() 이후에만 기록합니다 (main.py --trace).
+"""
+
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+_current_stage: contextvars.ContextVar = contextvars.ContextVar("trace_stage", default="unknown")
+_current_trace: contextvars.ContextVar = contextvars.ContextVar("trace_id", default="")
+_stage_started: contextvars.ContextVar = contextvars.ContextVar("trace_stage_started", default=None)
+
+
+def current_stage() -> str:
+    """현재 실행 중인 단계 이름."""
+    return _current_stage.get()
+
+
+def stage_started_at() -> Optional[float]:
+    """현재 단계 시작 시각 (time.monotonic 기준, 단계 밖이면 None). 단계별 마감 시간 계산용."""
+    return _stage_started.get()
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """with 블록 안의 API 호출을 name 단계로 기록."""
+    token = _current_stage.set(name)
+    started_token = _stage_started.set(time.monotonic())
+    try:
+        yield
+    finally:
+        _stage_started.reset(started_token)
+        _current_stage.reset(token)
+
+
+def traced_stage(name: str) -> Callable:
+    """함수(동기/비동기) 실행 동안 단계 이름을 지정하는 데코레이터."""
+
+    def decorator(fn: Callable) -> Callable:
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with stage(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def start_trace() -> str:
+    """새 trace id 발급 (세션 1건 = trace 1개). 현재 컨텍스트에 설정하고 반환."""
+    trace_id = os.urandom(16).hex()
+    _current_trace.set(trace_id)
+    return trace_id
+
+
+class Tracer:
+    """span 수집기. 최근 max_spans개를 메모리에 보관하고, 파일 sink가 있으면 즉시 기록.
+
+    Args:
+        max_spans: 메모리에 보관할 최대 span 수
+    """
+
+    def __init__(self, max_spans: int = 10000) -> None:
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._spans: deque = deque(maxlen=max_spans)
+        self._sink_path: Optional[str] = None
+
+    def enable(self, sink_path: Optional[str] = None) -> None:
+        """기록 시작. sink_path가 있으면 span마다 JSON 한 줄씩 추가."""
+        with self._lock:
+            self.enabled = True
+            self._sink_path = sink_path
+
+    def disable(self) -> None:
+        with self._lock:
+            self.enabled = False
+            self._sink_path = None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+    def spans(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._spans)
+
+    def record(self, span: Dict[str, Any]) -> None:
+        with self._lock:
+            if not self.enabled:
+                return
+            self._spans.append(span)
+            if self._sink_path:
+                with open(self._sink_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(span, ensure_ascii=False) + "\n")
+
+    def export_jsonl(self, path: str) -> int:
+        """보관 중인 span을 JSONL 파일로 저장. 저장한 개수 반환."""
+        spans = self.spans()
+        with open(path, "w", encoding="utf-8") as f:
+            for span in spans:
+                f.write(json.dumps(span, ensure_ascii=False) + "\n")
+        return len(spans)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """단계별 집계: 호출 수, 총/평균/최대 시간(ms), 토큰, 절약 토큰, 전송 바이트, 재시도, 대기열 대기(ms), 오류."""
+        rows: Dict[str, Dict[str, Any]] = {}
+        for span in self.spans():
+            attrs = span["attributes"]
+            row = rows.setdefault(attrs["stage"], {
+                "stage": attrs["stage"], "calls": 0, "total_ms": 0.0, "max_ms": 0.0,
+                "prompt_tokens": 0, "completion_tokens": 0, "saved_tokens": 0, "payload_bytes": 0,
+                "retries": 0, "queue_wait_ms": 0.0, "errors": 0,
+            })
+            if span["name"] == PROMPT_BUDGET_SPAN:
+                row["saved_tokens"] += attrs.get("prompt_tokens_saved") or 0
+                continue
+            duration_ms = (span["end_time_unix_nano"] - span["start_time_unix_nano"]) / 1e6
+            row["calls"] += 1
+            row["total_ms"] += duration_ms
+            row["max_ms"] = max(row["max_ms"], duration_ms)
+            row["prompt_tokens"] += attrs.get("prompt_tokens") or 0
+            row["completion_tokens"] += attrs.get("completion_tokens") or 0
+            row["payload_bytes"] += attrs.get("payload_bytes") or 0
+            row["retries"] += attrs.get("retries") or 0
+            row["queue_wait_ms"] += attrs.get("queue_wait_ms") or 0.0
+            row["errors"] += 1 if span["status"]["code"] == "ERROR" else 0
+        for row in rows.values():
+            row["avg_ms"] = row["total_ms"] / row["calls"] if row["calls"] else 0.0
+        return sorted(rows.values(), key=lambda r: -r["total_ms"])
+
+    def format_summary(self) -> str:
+        """summary()를 터미널 표로 변환."""
+        header = f"{'stage':<16}{'calls':>6}{'total(s)':>10}{'avg(ms)':>10}{'max(ms)':>10}{'in_tok':>9}{'out_tok':>9}{'saved':>8}{'KB':>9}{'retry':>7}{'wait(ms)':>10}{'err':>5}"
+        lines = [header, "-" * len(header)]
+        for row in self.summary():
+            lines.append(
+                f"{row['stage']:<16}{row['calls']:>6}{row['total_ms'] / 1000:>10.2f}{row['avg_ms']:>10.0f}"
+                f"{row['max_ms']:>10.0f}{row['prompt_tokens']:>9}{row['completion_tokens']:>9}{row['saved_tokens']:>8}"
+                f"{row['payload_bytes'] / 1024:>9.0f}{row['retries']:>7}{row['queue_wait_ms']:>10.0f}{row['errors']:>5}"
+            )
+        return "\n".join(lines)
+
+
+tracer = Tracer()
+
+# 프롬프트 예산 기록용 span 이름 (API 호출 수에는 포함하지 않음)
+PROMPT_BUDGET_SPAN = "prompt_budget"
+
+
+@contextmanager
+def trace_call(name: str, payload_bytes: int = 0) -> Iterator[Dict[str, Any]]:
+    """API 호출 1건을 span으로 기록. yield된 dict에 토큰·재시도 등 속성을 채운다.
+
+    Args:
+        name: 호출 대상 ("solar", "document_parse", "information_extract")
+        payload_bytes: 요청 본문 크기
+    """
+    attributes: Dict[str, Any] = {
+        "stage": current_stage(),
+        "payload_bytes": payload_bytes,
+        "retries": 0,
+    }
+    if not tracer.enabled:
+        yield attributes
+        return
+    start_ns = time.time_ns()
+    status = {"code": "OK"}
+    try:
+        yield attributes
+    except BaseException as exc:
+        status = {"code": "ERROR", "message": f"{type(exc).__name__}: {exc}"[:300]}
+        raise
+    finally:
+        tracer.record({
+            "trace_id": _current_trace.get() or "0" * 32,
+            "span_id": os.urandom(8).hex(),
+            "name": name,
+            "start_time_unix_nano": start_ns,
+            "end_time_unix_nano": time.time_ns(),
+            "attributes": attributes,
+            "status": status,
+        })
+
+
+def record_usage(attributes: Dict[str, Any], usage: Any) -> None:
+    """OpenAI 응답 usage(SDK 객체 또는 응답 JSON의 dict)의 토큰 수를 span 속성에 기록."""
+    if usage is None:
+        return
+    if isinstance(usage, dict):
+        attributes["prompt_tokens"] = usage.get("prompt_tokens")
+        attributes["completion_tokens"] = usage.get("completion_tokens")
+        return
+    attributes["prompt_tokens"] = getattr(usage, "prompt_tokens", None)
+    attributes["completion_tokens"] = getattr(usage, "completion_tokens", None)
+
+
+def record_prompt_savings(prompt_tokens: int, tokens_saved: int, sections: Dict[str, int]) -> None:
+    """프롬프트 예산 적용 결과(추정 토큰)를 현재 단계의 prompt_budget span으로 기록."""
+    if not tracer.enabled:
+        return
+    now = time.time_ns()
+    tracer.record({
+        "trace_id": _current_trace.get() or "0" * 32,
+        "span_id": os.urandom(8).hex(),
+        "name": PROMPT_BUDGET_SPAN,
+        "start_time_unix_nano": now,
+        "end_time_unix_nano": now,
+        "attributes": {
+            "stage": current_stage(),
+            "prompt_tokens_estimated": prompt_tokens,
+            "prompt_tokens_saved": tokens_saved,
+            **{f"section_tokens.{name}": tokens for name, tokens in sections.items()},
+        },
+        "status": {"code": "OK"},
+    })
@@ -1,14 +1,90 @@
+import asyncio
+import atexit
 import base64
+import hashlib
+import io
 import json
-import requests
-from openai import OpenAI
+import os
+import threading
+import weakref
+from contextlib import ExitStack
+from typing import Any, AsyncIterator, Callable, Iterator
+import httpx
+from openai import AsyncOpenAI, OpenAI
 
-from config import SOLAR_MODEL, UPSTAGE_API_KEY, UPSTAGE_BASE_URL
+from cache import ResponseCache, make_key
+from config import (
+    CACHE_DIR,
+    DOCUMENT_PARSE_MAX_CONCURRENCY,
+    DOCUMENT_PARSE_RPS,
+    IE_MAX_CONCURRENCY,
+    IE_RPS,
+    PARSE_RANGE_RETRIES,
+    PARSE_SPLIT_ENABLED,
+    PARSE_SPLIT_MIN_PAGES,
+    PARSE_SPLIT_PAGES,
+    PARSE_SPLIT_WORKERS,
+    SOLAR_CACHE_ENABLED,
+    SOLAR_CACHE_MAX_ENTRIES,
+    SOLAR_CACHE_MAX_TEMPERATURE,
+    SOLAR_CACHE_MEMORY_ENTRIES,
+    SOLAR_CACHE_STAGES,
+    SOLAR_CACHE_TTL_HOURS,
+    SOLAR_MAX_CONCURRENCY,
+    SOLAR_RPS,
+    SOLAR_TPM,
+    SOLAR_MODEL,
+    UPSTAGE_API_KEY,
+    UPSTAGE_BASE_URL,
+    UPSTAGE_CONNECT_TIMEOUT,
+    UPSTAGE_KEEPALIVE_EXPIRY,
+    UPSTAGE_POOL_MAX_CONNECTIONS,
+    UPSTAGE_POOL_MAX_KEEPALIVE,
+    UPSTAGE_READ_TIMEOUT,
+)
+from pdf_split import (
+    PageRange,
+    ProgressCallback,
+    aparse_in_ranges,
+    merge_parsed_ranges,
+    page_count,
+    parse_in_ranges,
+    range_filename,
+    split_pdf,
+)
+from ratelimit import EndpointLimiter, estimate_tokens
+from resilience import (
+    RetryableHTTPError,
+    acall_hedged,
+    acall_with_retry,
+    call_hedged,
+    call_with_retry,
+    raise_for_retryable,
+    request_timeout,
+)
+from tracing import current_stage, record_usage, trace_call
 
 
 DOCUMENT_PARSE_PATH = "/document-digitization"
 INFORMATION_EXTRACT_PATH = "/information-extraction"
 
+# Document Parse 요청 파라미터 (캐시 키에도 포함)
+DOCUMENT_PARSE_PARAMS = {
+    "model": "document-parse-nightly",
+    "mode": "auto",
+    "ocr": "auto",
+    "chart_recognition": True,
+    "coordinates": True,
+    "output_formats": '["html"]',
+    "base64_encoding": '["figure"]',
+}
+# 분할 파싱 설정: 병합 결과(구간 경계의 요소 분리 등)가 달라지므로 Document Parse 캐시 키에 함께 포함
+PARSE_SPLIT_PARAMS = {
+    "enabled": PARSE_SPLIT_ENABLED,
+    "pages": PARSE_SPLIT_PAGES,
+    "min_pages": PARSE_SPLIT_MIN_PAGES,
+}
+
 
 def _ensure_v1(base_url: str) -> str:
     """Upstage API는 /v1 경로가 필요함."""
@@ -18,101 +94,650 @@ def _ensure_v1(base_url: str) -> str:
 
 VERSIONED_BASE_URL = _ensure_v1(UPSTAGE_BASE_URL)
 SOLAR_BASE_URL = VERSIONED_BASE_URL
+INFORMATION_EXTRACT_BASE_URL = f"{VERSIONED_BASE_URL}{INFORMATION_EXTRACT_PATH}"
 
 
-def call_solar(
-    prompt: str,
-    *,
-    temperature: float = 0.2,
-    max_tokens: int = 16384,
-    reasoning_effort: str | None = None,
-) -> str:
-    """Solar 모델을 호출하여 응답을 반환.
+class _ConnectionCounter:
+    """요청 수 / 새 커넥션 수 집계 (커넥션 재사용 확인용)."""
 
-    reasoning_effort: Solar Pro 2는 기본 꺼짐, "high"로 활성화.
-                      Solar Pro 3는 high(60%)/medium(30%)/low(꺼짐).
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._seen: "weakref.WeakSet" = weakref.WeakSet()
+        self.requests = 0
+        self.new_connections = 0
+
+    def observe(self, pool) -> None:
+        """요청 1건 완료 후 풀의 커넥션 목록을 확인하여 처음 보는 커넥션을 센다."""
+        connections = list(getattr(pool, "connections", []) or [])
+        with self._lock:
+            self.requests += 1
+            for connection in connections:
+                if connection not in self._seen:
+                    self._seen.add(connection)
+                    self.new_connections += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused_connections": max(0, self.requests - self.new_connections),
+            }
+
+
+class _CountingTransport(httpx.HTTPTransport):
+    def __init__(self, counter: _ConnectionCounter, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._counter = counter
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        response = super().handle_request(request)
+        self._counter.observe(self._pool)
+        return response
+
+
+class _AsyncCountingTransport(httpx.AsyncHTTPTransport):
+    def __init__(self, counter: _ConnectionCounter, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._counter = counter
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await super().handle_async_request(request)
+        self._counter.observe(self._pool)
+        return response
+
+
+class _ClientManager:
+    """프로세스 단위 공유 클라이언트 관리.
+
+    - 동기: httpx.Client 1개(keep-alive 커넥션 풀)를 Solar(OpenAI)와 Document Parse / IE가 공유
+    - 비동기: 이벤트 루프별로 httpx.AsyncClient 1개 (커넥션은 루프에 묶이므로)
+    - 최초 사용 시 잠금 하에 지연 생성 → 여러 스레드에서 안전하게 공유
     """
-    client = OpenAI(
-        api_key=UPSTAGE_API_KEY,
-        base_url=SOLAR_BASE_URL,
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._sync_counter = _ConnectionCounter()
+        self._async_counter = _ConnectionCounter()
+        self._http: httpx.Client | None = None
+        self._solar: OpenAI | None = None
+        self._async: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+    @staticmethod
+    def _limits() -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=UPSTAGE_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=UPSTAGE_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=UPSTAGE_KEEPALIVE_EXPIRY,
+        )
+
+    @staticmethod
+    def _timeout() -> httpx.Timeout:
+        return httpx.Timeout(UPSTAGE_READ_TIMEOUT, connect=UPSTAGE_CONNECT_TIMEOUT)
+
+    def http(self) -> httpx.Client:
+        with self._lock:
+            if self._http is None:
+                transport = _CountingTransport(self._sync_counter, limits=self._limits())
+                self._http = httpx.Client(transport=transport, timeout=self._timeout())
+            return self._http
+
+    def solar(self) -> OpenAI:
+        http_client = self.http()
+        with self._lock:
+            if self._solar is None:
+                self._solar = OpenAI(
+                    api_key=UPSTAGE_API_KEY,
+                    base_url=SOLAR_BASE_URL,
+                    http_client=http_client,
+                    max_retries=0,  # 재시도는 resilience 모듈에서 (백오프·마감 시간·trace 집계)
+                )
+            return self._solar
+
+    def _async_clients(self) -> dict:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = self._async.get(loop)
+            if clients is None:
+                transport = _AsyncCountingTransport(self._async_counter, limits=self._limits())
+                http_client = httpx.AsyncClient(transport=transport, timeout=self._timeout())
+                clients = {
+                    "http": http_client,
+                    "solar": AsyncOpenAI(
+                        api_key=UPSTAGE_API_KEY,
+                        base_url=SOLAR_BASE_URL,
+                        http_client=http_client,
+                        max_retries=0,
+                    ),
+                }
+                self._async[loop] = clients
+            return clients
+
+    def async_http(self) -> httpx.AsyncClient:
+        return self._async_clients()["http"]
+
+    def async_solar(self) -> AsyncOpenAI:
+        return self._async_clients()["solar"]
+
+    def stats(self) -> dict:
+        return {"sync": self._sync_counter.snapshot(), "async": self._async_counter.snapshot()}
+
+    def close(self) -> None:
+        """동기 클라이언트 닫기 (비동기 클라이언트는 루프 안에서 aclose로)."""
+        with self._lock:
+            if self._http is not None:
+                self._http.close()
+            self._http = None
+            self._solar = None
+
+    async def aclose(self) -> None:
+        """루프별 비동기 클라이언트와 동기 클라이언트를 모두 닫기 (다음 사용 시 다시 생성).
+
+        현재 루프의 클라이언트는 바로 닫고, 다른 스레드에서 실행 중인 루프의 클라이언트는 그 루프에서 닫음.
+        이미 닫힌 루프의 클라이언트는 커넥션을 쓸 수 없으므로 참조만 제거.
+        """
+        current = asyncio.get_running_loop()
+        with self._lock:
+            entries = list(self._async.items())
+            self._async.clear()
+        for loop, clients in entries:
+            # AsyncOpenAI는 공유 http_client를 사용하므로 httpx 클라이언트만 닫으면 됨
+            if loop is current:
+                await clients["http"].aclose()
+            elif loop.is_running():
+                await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(clients["http"].aclose(), loop))
+        self.close()
+
+
+_clients = _ClientManager()
+atexit.register(_clients.close)
+
+
+async def awarm_clients() -> None:
+    """현재 이벤트 루프의 공유 클라이언트(및 동기 클라이언트)를 미리 생성 (서버 시작 시 첫 요청 지연 제거)."""
+    _clients.solar()
+    _clients.async_solar()
+
+
+def close_clients() -> None:
+    """공유 동기 클라이언트 닫기 (프로세스 종료 시 자동 호출, CLI 명령 끝에서 명시적으로 호출)."""
+    _clients.close()
+
+
+async def aclose_clients() -> None:
+    """공유 클라이언트 전체 닫기. asyncio.run으로 실행한 작업이나 서버 종료 시 루프가 끝나기 전에 호출."""
+    await _clients.aclose()
+
+
+def connection_stats() -> dict:
+    """공유 클라이언트의 요청 수 / 새 커넥션 수 / 재사용 횟수 (sync, async 별)."""
+    return _clients.stats()
+
+
+# 엔드포인트별 속도/동시 요청 제한 (프로세스 안의 모든 세션이 공유)
+_limiters = {
+    "solar": EndpointLimiter("solar", rps=SOLAR_RPS, max_concurrency=SOLAR_MAX_CONCURRENCY, tpm=SOLAR_TPM),
+    "document_parse": EndpointLimiter(
+        "document_parse", rps=DOCUMENT_PARSE_RPS, max_concurrency=DOCUMENT_PARSE_MAX_CONCURRENCY
+    ),
+    "information_extract": EndpointLimiter("information_extract", rps=IE_RPS, max_concurrency=IE_MAX_CONCURRENCY),
+}
+
+
+def limiter_stats() -> dict:
+    """엔드포인트별 대기열 지표 (요청 수, 대기 횟수, 총/평균/최대 대기 시간, 실행/대기 중 요청 수)."""
+    return {name: limiter.stats() for name, limiter in _limiters.items()}
+
+
+def _total_tokens(usage) -> int | None:
+    return getattr(usage, "total_tokens", None) if usage is not None else None
+
+
+# Solar 응답 캐시 (SOLAR_CACHE_ENABLED=1일 때만). 단계·temperature 조건은 _solar_cache_key 참고
+_solar_cache: ResponseCache | None = (
+    ResponseCache(
+        os.path.join(CACHE_DIR, "solar_responses.sqlite3"),
+        max_memory_entries=SOLAR_CACHE_MEMORY_ENTRIES,
+        max_disk_entries=SOLAR_CACHE_MAX_ENTRIES,
+        ttl_seconds=SOLAR_CACHE_TTL_HOURS * 3600,
     )
+    if SOLAR_CACHE_ENABLED
+    else None
+)
+
+
+def solar_cache_stats() -> dict | None:
+    """Solar 응답 캐시 적중/미스 지표 (캐시가 꺼져 있으면 None)."""
+    return _solar_cache.stats() if _solar_cache is not None else None
+
+
+def _solar_cache_key(
+    prompt: str,
+    temperature: float,
+    max_tokens: int,
+    reasoning_effort: str | None,
+) -> str | None:
+    """캐시 대상이면 키, 아니면 None (캐시 꺼짐 / 대상 단계 아님 / temperature 높음)."""
+    if _solar_cache is None or temperature > SOLAR_CACHE_MAX_TEMPERATURE:
+        return None
+    if "*" not in SOLAR_CACHE_STAGES and current_stage() not in SOLAR_CACHE_STAGES:
+        return None
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    return make_key("solar", SOLAR_MODEL, prompt_hash, temperature, reasoning_effort, max_tokens)
+
+
+def _store_solar_response(cache_key: str | None, content: str) -> None:
+    if cache_key is not None and content:
+        _solar_cache.set(cache_key, content)
+
+
+def _solar_request(
+    prompt: str,
+    temperature: float,
+    max_tokens: int,
+    reasoning_effort: str | None,
+    stream: bool = False,
+) -> dict:
+    """Solar chat.completions 요청 인자 (동기/비동기 공용)."""
     kwargs: dict = {
         "model": SOLAR_MODEL,
         "messages": [{"role": "user", "content": prompt}],
         "temperature": temperature,
         "max_tokens": max_tokens,
-        "stream": False,
+        "stream": stream,
     }
+    if stream:
+        kwargs["stream_options"] = {"include_usage": True}  # 마지막 청크에 usage 포함
     if reasoning_effort is not None:
         kwargs["reasoning_effort"] = reasoning_effort
-    response = client.chat.completions.create(**kwargs)
+    return kwargs
+
+
+def _solar_content(response) -> str:
     choice = response.choices[0] if response.choices else None
     content = choice.message.content if choice and choice.message else None
     return content if content is not None else ""
 
 
-def call_document_parse(pdf_path: str) -> dict:
-    """Document Parse API를 호출하여 PDF를 파싱."""
+def _solar_delta(chunk) -> str:
+    choice = chunk.choices[0] if chunk.choices else None
+    delta = choice.delta if choice else None
+    content = delta.content if delta else None
+    return content or ""
+
+
+def call_solar(
+    prompt: str,
+    *,
+    temperature: float = 0.2,
+    max_tokens: int = 16384,
+    reasoning_effort: str | None = None,
+    on_token: Callable[[str], None] | None = None,
+) -> str:
+    """Solar 모델을 호출하여 응답을 반환.
+
+    reasoning_effort: Solar Pro 2는 기본 꺼짐, "high"로 활성화.
+                      Solar Pro 3는 high(60%)/medium(30%)/low(꺼짐).
+    on_token: 지정 시 스트리밍 모드. 토큰(delta)이 도착할 때마다 호출되며, 반환값은 전체 응답.
+              (캐시 적중 시에는 전체 응답이 한 번에 전달됨)
+    """
+    cache_key = _solar_cache_key(prompt, temperature, max_tokens, reasoning_effort)
+    if cache_key is not None:
+        cached = _solar_cache.get(cache_key)
+        if cached is not None:
+            if on_token is not None:
+                on_token(cached)
+            return cached
+    content = _call_solar_api(prompt, temperature, max_tokens, reasoning_effort, on_token)
+    _store_solar_response(cache_key, content)
+    return content
+
+
+def _call_solar_api(
+    prompt: str,
+    temperature: float,
+    max_tokens: int,
+    reasoning_effort: str | None,
+    on_token: Callable[[str], None] | None,
+) -> str:
+    client = _clients.solar()
+    limiter = _limiters["solar"]
+    estimated = estimate_tokens(prompt)
+    with trace_call("solar", payload_bytes=len(prompt.encode("utf-8"))) as span:
+        if on_token is None:
+            request = _solar_request(prompt, temperature, max_tokens, reasoning_effort)
+
+            def _attempt():
+                with limiter.limit(estimated, span):
+                    response = client.chat.completions.create(**request, timeout=request_timeout(UPSTAGE_READ_TIMEOUT))
+                limiter.settle_tokens(estimated, _total_tokens(getattr(response, "usage", None)))
+                return response
+
+            response = call_hedged(lambda: call_with_retry(_attempt, span), span)
+            record_usage(span, getattr(response, "usage", None))
+            return _solar_content(response)
+
+        # 스트리밍: 연결 수립까지만 재시도 (토큰이 출력되기 시작하면 중복 출력되므로 재시도·헤지 없음)
+        parts = []
+        usage = None
+        request = _solar_request(prompt, temperature, max_tokens, reasoning_effort, stream=True)
+
+        def _open_stream():
+            # 시도마다 슬롯을 잡고 연결에 실패하면 바로 해제 (재시도 대기·Retry-After 동안 슬롯을 점유하지 않음)
+            slot = ExitStack()
+            slot.enter_context(limiter.limit(estimated, span))
+            try:
+                return client.chat.completions.create(**request, timeout=request_timeout(UPSTAGE_READ_TIMEOUT)), slot
+            except BaseException:
+                slot.close()
+                raise
+
+        stream, slot = call_with_retry(_open_stream, span)
+        with slot:  # 연결에 성공한 뒤에는 스트림을 다 읽을 때까지 동시 요청 슬롯 점유
+            try:
+                for chunk in stream:
+                    usage = getattr(chunk, "usage", None) or usage
+                    delta = _solar_delta(chunk)
+                    if delta:
+                        parts.append(delta)
+                        on_token(delta)
+            finally:
+                # 중간에 예외(마감 시간, 출력 중단, KeyboardInterrupt)가 나도 커넥션을 바로 풀에 반환
+                stream.close()
+        record_usage(span, usage)
+        limiter.settle_tokens(estimated, _total_tokens(usage))
+        return "".join(parts)
+
+
+async def acall_solar(
+    prompt: str,
+    *,
+    temperature: float = 0.2,
+    max_tokens: int = 16384,
+    reasoning_effort: str | None = None,
+) -> str:
+    """call_solar의 비동기 버전 (AsyncOpenAI)."""
+    cache_key = _solar_cache_key(prompt, temperature, max_tokens, reasoning_effort)
+    if cache_key is not None:
+        # SQLite 조회는 짧지만 디스크 I/O이므로 이벤트 루프 밖에서 수행
+        cached = await asyncio.to_thread(_solar_cache.get, cache_key)
+        if cached is not None:
+            return cached
+    client = _clients.async_solar()
+    limiter = _limiters["solar"]
+    estimated = estimate_tokens(prompt)
+    request = _solar_request(prompt, temperature, max_tokens, reasoning_effort)
+    with trace_call("solar", payload_bytes=len(prompt.encode("utf-8"))) as span:
+
+        async def _attempt():
+            async with limiter.alimit(estimated, span):
+                response = await client.chat.completions.create(**request, timeout=request_timeout(UPSTAGE_READ_TIMEOUT))
+            limiter.settle_tokens(estimated, _total_tokens(getattr(response, "usage", None)))
+            return response
+
+        response = await acall_hedged(lambda: acall_with_retry(_attempt, span), span)
+        record_usage(span, getattr(response, "usage", None))
+    content = _solar_content(response)
+    if cache_key is not None and content:
+        await asyncio.to_thread(_solar_cache.set, cache_key, content)
+    return content
+
+
+def _read_bytes(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+class UpstageAPIError(RuntimeError):
+    """Upstage API가 재시도 후에도 실패 응답을 돌려줌 (Document Parse / Information Extraction)."""
+
+
+def _raise_document_parse_error(status_code: int, text: str) -> None:
+    msg = f"Document Parse API 오류 ({status_code}). "
+    if status_code >= 500 or status_code == 429:
+        msg += "재시도 후에도 실패했습니다 (Upstage 서버 일시 오류 또는 요청 한도). 잠시 후 다시 시도하세요."
+    elif status_code == 401:
+        msg += "API 키를 확인하거나 결제/크레딧 상태를 확인하세요."
+    else:
+        msg += text[:200] if text else ""
+    raise UpstageAPIError(msg)
+
+
+def _document_parse_form() -> dict:
+    # multipart form 값은 문자열이어야 함 (bool → "True")
+    return {key: str(value) for key, value in DOCUMENT_PARSE_PARAMS.items()}
+
+
+def _split_ranges(pdf_path: str) -> list[PageRange] | None:
+    """분할 파싱 대상이면 페이지 구간 목록, 아니면 None (작은 PDF / 분할 꺼짐 / pypdf 없음)."""
+    if not PARSE_SPLIT_ENABLED:
+        return None
+    pages = page_count(pdf_path)
+    if pages is None or pages <= PARSE_SPLIT_MIN_PAGES:
+        return None
+    return split_pdf(pdf_path, PARSE_SPLIT_PAGES)
+
+
+def _document_parse_once(filename: str, open_document: Callable[[], Any], payload_bytes: int) -> dict:
+    """Document Parse 요청 1건 (재시도·속도 제한 포함). open_document는 매 시도마다 새 파일 객체를 반환."""
     url = f"{VERSIONED_BASE_URL}{DOCUMENT_PARSE_PATH}"
     headers = {"Authorization": f"Bearer {UPSTAGE_API_KEY}"}
-    data = {
-        "model": "document-parse-nightly",
-        "mode": "auto",
-        "ocr": "auto",
-        "chart_recognition": True,
-        "coordinates": True,
-        "output_formats": '["html"]',
-        "base64_encoding": '["figure"]',
-    }
-    with open(pdf_path, "rb") as file_handle:
-        files = {"document": file_handle}
-        response = requests.post(url, headers=headers, files=files, data=data, timeout=120)
-    if not response.ok:
-        msg = f"Document Parse API 오류 ({response.status_code}). "
-        if response.status_code == 500:
-            msg += "Upstage 서버 일시 오류입니다. 잠시 후 다시 시도하세요."
-        elif response.status_code == 401:
-            msg += "API 키를 확인하거나 결제/크레딧 상태를 확인하세요."
-        else:
-            msg += response.text[:200] if response.text else ""
-        raise RuntimeError(msg)
+    data = _document_parse_form()
+
+    def _attempt() -> httpx.Response:
+        with _limiters["document_parse"].limit(attributes=span), open_document() as document:
+            files = {"document": (filename, document)}
+            return raise_for_retryable(
+                _clients.http().post(url, headers=headers, files=files, data=data, timeout=request_timeout(120))
+            )
+
+    with trace_call("document_parse", payload_bytes=payload_bytes) as span:
+        try:
+            response = call_with_retry(_attempt, span)
+        except RetryableHTTPError as exc:
+            _raise_document_parse_error(exc.status_code, exc.text)
+        if not response.is_success:
+            _raise_document_parse_error(response.status_code, response.text)
     return response.json()
 
 
-def call_information_extract(document_path: str, schema: dict) -> dict:
-    """Information Extraction API 호출. 문서(PDF/이미지)를 base64로 전달."""
-    with open(document_path, "rb") as f:
-        raw = f.read()
-    b64 = base64.standard_b64encode(raw).decode("ascii")
-    # Upstage IE API는 문서를 image_url 형태의 base64로 받음 (PDF는 application/pdf)
-    mime = "application/pdf" if document_path.lower().endswith(".pdf") else "image/png"
-    data_url = f"data:{mime};base64,{b64}"
+async def _adocument_parse_once(filename: str, document: bytes) -> dict:
+    """_document_parse_once의 비동기 버전 (문서 바이트를 받음)."""
+    url = f"{VERSIONED_BASE_URL}{DOCUMENT_PARSE_PATH}"
+    headers = {"Authorization": f"Bearer {UPSTAGE_API_KEY}"}
+    data = _document_parse_form()
+    files = {"document": (filename, document)}
 
-    client = OpenAI(
-        api_key=UPSTAGE_API_KEY,
-        base_url=f"{VERSIONED_BASE_URL}{INFORMATION_EXTRACT_PATH}",
-    )
-    response = client.chat.completions.create(
-        model="information-extract",
-        messages=[
+    async def _attempt() -> httpx.Response:
+        async with _limiters["document_parse"].alimit(attributes=span):
+            return raise_for_retryable(
+                await _clients.async_http().post(url, headers=headers, files=files, data=data, timeout=request_timeout(120))
+            )
+
+    with trace_call("document_parse", payload_bytes=len(document)) as span:
+        try:
+            response = await acall_with_retry(_attempt, span)
+        except RetryableHTTPError as exc:
+            _raise_document_parse_error(exc.status_code, exc.text)
+        if not response.is_success:
+            _raise_document_parse_error(response.status_code, response.text)
+    return response.json()
+
+
+def call_document_parse(pdf_path: str, on_progress: ProgressCallback | None = None) -> dict:
+    """Document Parse API를 호출하여 PDF를 파싱.
+
+    페이지 수가 PARSE_SPLIT_MIN_PAGES를 넘으면 PARSE_SPLIT_PAGES쪽 구간으로 나누어 동시에 파싱한 뒤 병합.
+    on_progress: 구간 1개가 끝날 때마다 (완료 수, 전체 수, 시작 페이지, 끝 페이지)로 호출
+    """
+    ranges = _split_ranges(pdf_path)
+    if ranges is None:
+        return _document_parse_once(
+            os.path.basename(pdf_path), lambda: open(pdf_path, "rb"), os.path.getsize(pdf_path)
+        )
+
+    def _parse_range(page_range: PageRange) -> dict:
+        return _document_parse_once(
+            range_filename(pdf_path, page_range), lambda: io.BytesIO(page_range["data"]), len(page_range["data"])
+        )
+
+    results = parse_in_ranges(ranges, _parse_range, PARSE_SPLIT_WORKERS, PARSE_RANGE_RETRIES, on_progress)
+    return merge_parsed_ranges(ranges, results)
+
+
+async def acall_document_parse(pdf_path: str, on_progress: ProgressCallback | None = None) -> dict:
+    """call_document_parse의 비동기 버전 (httpx.AsyncClient)."""
+    ranges = await asyncio.to_thread(_split_ranges, pdf_path)
+    if ranges is None:
+        document = await asyncio.to_thread(_read_bytes, pdf_path)
+        return await _adocument_parse_once(os.path.basename(pdf_path), document)
+
+    async def _parse_range(page_range: PageRange) -> dict:
+        return await _adocument_parse_once(range_filename(pdf_path, page_range), page_range["data"])
+
+    results = await aparse_in_ranges(ranges, _parse_range, PARSE_SPLIT_WORKERS, PARSE_RANGE_RETRIES, on_progress)
+    return merge_parsed_ranges(ranges, results)
+
+
+# 업로드 시 한 번에 읽어 base64로 바꾸는 크기. 3의 배수여야 조각별 base64를 이어 붙인 결과가
+# 파일 전체를 한 번에 인코딩한 결과와 같음 (중간에 "=" 패딩이 생기지 않음)
+_IE_UPLOAD_CHUNK_BYTES = 3 * 64 * 1024
+# JSON 요청 본문에서 문서 data URL이 들어갈 자리
+_IE_DOCUMENT_PLACEHOLDER = "__DOCUMENT_DATA_URL__"
+
+
+def _information_extract_body(document_path: str, schema: dict) -> tuple[bytes, bytes, int]:
+    """IE chat.completions 요청 본문을 (data URL 앞부분, 뒷부분, 전체 바이트 수)로 분리.
+
+    문서 base64는 본문에 넣지 않고 전송 시 파일에서 조각씩 인코딩하여 앞/뒷부분 사이에 흘려보냄.
+    """
+    body = {
+        "model": "information-extract",
+        "messages": [
             {
                 "role": "user",
                 "content": [
-                    {"type": "image_url", "image_url": {"url": data_url}},
+                    {"type": "image_url", "image_url": {"url": _IE_DOCUMENT_PLACEHOLDER}},
                 ],
             }
         ],
-        response_format={
+        "response_format": {
             "type": "json_schema",
             "json_schema": {
                 "name": "policy_schema",
                 "schema": schema,
             },
         },
-        timeout=120,
-    )
-    content = response.choices[0].message.content
+    }
+    head, tail = json.dumps(body, ensure_ascii=False).split(f'"{_IE_DOCUMENT_PLACEHOLDER}"')
+    # Upstage IE API는 문서를 image_url 형태의 base64로 받음 (PDF는 application/pdf)
+    mime = "application/pdf" if document_path.lower().endswith(".pdf") else "image/png"
+    prefix = f'{head}"data:{mime};base64,'.encode("utf-8")
+    suffix = f'"{tail}'.encode("utf-8")
+    encoded_size = 4 * ((os.path.getsize(document_path) + 2) // 3)
+    return prefix, suffix, len(prefix) + encoded_size + len(suffix)
+
+
+def _upload_block_bytes() -> int:
+    """실제로 읽는 조각 크기: _IE_UPLOAD_CHUNK_BYTES를 3의 배수로 내림 (설정이 바뀌어도 base64가 깨지지 않도록)."""
+    return max(3, _IE_UPLOAD_CHUNK_BYTES - _IE_UPLOAD_CHUNK_BYTES % 3)
+
+
+def _iter_information_extract_body(document_path: str, prefix: bytes, suffix: bytes) -> Iterator[bytes]:
+    yield prefix
+    block_bytes = _upload_block_bytes()
+    with open(document_path, "rb") as f:
+        while block := f.read(block_bytes):
+            yield base64.b64encode(block)
+    yield suffix
+
+
+async def _aiter_information_extract_body(document_path: str, prefix: bytes, suffix: bytes) -> AsyncIterator[bytes]:
+    yield prefix
+    block_bytes = _upload_block_bytes()
+    f = await asyncio.to_thread(open, document_path, "rb")
+    try:
+        while block := await asyncio.to_thread(f.read, block_bytes):
+            yield base64.b64encode(block)
+    finally:
+        f.close()
+    yield suffix
+
+
+def _information_extract_headers(content_length: int) -> dict:
+    # 길이를 미리 알려 chunked 전송 대신 일반 요청으로 보냄
+    return {
+        "Authorization": f"Bearer {UPSTAGE_API_KEY}",
+        "Content-Type": "application/json",
+        "Content-Length": str(content_length),
+    }
+
+
+def _raise_information_extract_error(status_code: int, text: str) -> None:
+    msg = f"Information Extraction API 오류 ({status_code}). "
+    if status_code >= 500 or status_code == 429:
+        msg += "재시도 후에도 실패했습니다 (Upstage 서버 일시 오류 또는 요청 한도)."
+    elif status_code == 401:
+        msg += "API 키를 확인하거나 결제/크레딧 상태를 확인하세요."
+    else:
+        msg += text[:200] if text else ""
+    raise UpstageAPIError(msg)
+
+
+def _information_extract_result(response: httpx.Response, span: dict) -> dict:
+    if not response.is_success:
+        _raise_information_extract_error(response.status_code, response.text)
+    completion = response.json()
+    record_usage(span, completion.get("usage"))
+    content = completion["choices"][0]["message"]["content"]
     try:
         return json.loads(content) if isinstance(content, str) else content
     except json.JSONDecodeError:
         return {}
+
+
+def call_information_extract(document_path: str, schema: dict) -> dict:
+    """Information Extraction API 호출. 문서(PDF/이미지)를 base64로 전달.
+
+    파일 전체를 메모리에 올리지 않도록 조각 단위로 읽어 base64로 바꾸며 요청 본문을 스트리밍 전송
+    (OpenAI SDK는 본문을 한 번에 직렬화하므로 httpx로 직접 호출).
+    """
+    url = f"{INFORMATION_EXTRACT_BASE_URL}/chat/completions"
+    prefix, suffix, content_length = _information_extract_body(document_path, schema)
+    headers = _information_extract_headers(content_length)
+
+    def _attempt() -> httpx.Response:
+        with _limiters["information_extract"].limit(attributes=span):
+            # 재시도마다 파일을 처음부터 다시 읽는 새 본문 생성
+            content = _iter_information_extract_body(document_path, prefix, suffix)
+            return raise_for_retryable(
+                _clients.http().post(url, headers=headers, content=content, timeout=request_timeout(120))
+            )
+
+    with trace_call("information_extract", payload_bytes=content_length) as span:
+        try:
+            response = call_with_retry(_attempt, span)
+        except RetryableHTTPError as exc:
+            _raise_information_extract_error(exc.status_code, exc.text)
+        return _information_extract_result(response, span)
+
+
+async def acall_information_extract(document_path: str, schema: dict) -> dict:
+    """call_information_extract의 비동기 버전 (httpx.AsyncClient, 파일 읽기는 스레드에서)."""
+    url = f"{INFORMATION_EXTRACT_BASE_URL}/chat/completions"
+    prefix, suffix, content_length = await asyncio.to_thread(_information_extract_body, document_path, schema)
+    headers = _information_extract_headers(content_length)
+
+    async def _attempt() -> httpx.Response:
+        async with _limiters["information_extract"].alimit(attributes=span):
+            content = _aiter_information_extract_body(document_path, prefix, suffix)
+            return raise_for_retryable(
+                await _clients.async_http().post(url, headers=headers, content=content, timeout=request_timeout(120))
+            )
+
+    with trace_call("information_extract", payload_bytes=content_length) as span:
+        try:
+            response = await acall_with_retry(_attempt, span)
+        except RetryableHTTPError as exc:
+            _raise_information_extract_error(exc.status_code, exc.text)
+        return _information_extract_result(response, span)
@@ -0,0 +1,15 @@
+"""테스트 공통 설정: src/ 모듈 import 경로 + 필수 환경변수 기본값 (API는 호출하지 않음)."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+# config.py는 import 시 필수 설정을 확인하므로, 실제 값이 없으면 더미 값 사용
+os.environ.setdefault("UPSTAGE_API_KEY", "test")
+os.environ.setdefault("UPSTAGE_BASE_URL", "http://127.0.0.1:9")
+os.environ.setdefault("SOLAR_MODEL", "solar-pro3")
+# 테스트가 작업 디렉토리의 .cache를 읽거나 쓰지 않도록
+os.environ.setdefault("PARSE_CACHE_ENABLED", "0")
+os.environ.setdefault("IE_CACHE_ENABLED", "0")
+os.environ.setdefault("SOLAR_CACHE_ENABLED", "0")
@@ -0,0 +1,106 @@
+import os
+import time
+
+from cache import DiskCache, ResponseCache, file_sha256, make_key
+
+
+def _age(cache: DiskCache, key: str, seconds_ago: float) -> None:
+    path = cache._path(key)
+    when = time.time() - seconds_ago
+    os.utime(path, (when, when))
+
+
+def test_make_key_ignores_dict_order():
+    assert make_key({"a": 1, "b": 2}, "x") == make_key({"b": 2, "a": 1}, "x")
+    assert make_key({"a": 1}) != make_key({"a": 2})
+
+
+def test_file_sha256_matches_content(tmp_path):
+    first, second = tmp_path / "a.pdf", tmp_path / "b.pdf"
+    first.write_bytes(b"%PDF same")
+    second.write_bytes(b"%PDF same")
+    assert file_sha256(str(first)) == file_sha256(str(second))
+    second.write_bytes(b"%PDF other")
+    assert file_sha256(str(first)) != file_sha256(str(second))
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    cache = DiskCache(str(tmp_path), max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    _age(cache, "a", 20)
+    _age(cache, "b", 10)
+    assert cache.get("a") == 1  # 조회로 a가 최근 사용이 됨
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_disk_cache_max_bytes(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=200)
+    cache.set("big", "x" * 500)  # 상한보다 큰 값은 저장하지 않음
+    assert cache.get("big") is None
+    cache.set("a", "x" * 80)
+    _age(cache, "a", 10)
+    cache.set("b", "y" * 80)
+    assert cache.get("a") is None
+    assert cache.get("b") == "y" * 80
+
+
+def test_disk_cache_ttl_and_corrupt_entry(tmp_path):
+    cache = DiskCache(str(tmp_path), ttl_seconds=0.05)
+    cache.set("k", {"v": 1})
+    assert cache.get("k") == {"v": 1}
+    time.sleep(0.1)
+    assert cache.get("k") is None
+    assert not os.path.exists(cache._path("k"))
+
+    with open(cache._path("bad"), "w", encoding="utf-8") as f:
+        f.write("{not json")
+    assert cache.get("bad") is None
+    assert not os.path.exists(cache._path("bad"))
+
+
+def test_response_cache_memory_lru_and_disk_tier(tmp_path):
+    path = str(tmp_path / "responses.sqlite3")
+    cache = ResponseCache(path, max_memory_entries=1)
+    cache.set("a", "A")
+    cache.set("b", "B")  # a는 메모리에서 밀려나고 SQLite에만 남음
+    assert cache.get("b") == "B"
+    assert cache.get("a") == "A"
+    assert cache.get("missing") is None
+    stats = cache.stats()
+    assert (stats["memory_hits"], stats["disk_hits"], stats["misses"]) == (1, 1, 1)
+
+
+def test_response_cache_ttl_and_disk_limit(tmp_path):
+    cache = ResponseCache(str(tmp_path / "r.sqlite3"), max_memory_entries=10, ttl_seconds=0.05)
+    cache.set("k", "v")
+    time.sleep(0.1)
+    assert cache.get("k") is None
+
+    limited = ResponseCache(str(tmp_path / "l.sqlite3"), max_memory_entries=1, max_disk_entries=2)
+    for key in ("a", "b", "c"):
+        limited.set(key, key.upper())
+        time.sleep(0.01)
+    limited._memory.clear()
+    assert limited.get("a") is None
+    assert limited.get("b") == "B" and limited.get("c") == "C"
+
+
+def test_load_policy_hashes_pdf_once(tmp_path, monkeypatch):
+    import agent
+
+    pdf = tmp_path / "policy.pdf"
+    pdf.write_bytes(b"%PDF-1.4 test")
+    calls = []
+    monkeypatch.setattr(agent, "file_sha256", lambda path: calls.append(path) or "hash")
+    monkeypatch.setattr(agent, "_parse_cache", DiskCache(str(tmp_path / "parse")))
+    monkeypatch.setattr(agent, "_ie_cache", DiskCache(str(tmp_path / "ie")))
+    monkeypatch.setattr(agent, "call_document_parse", lambda path, on_progress=None: {"content": {"text": "지원 대상"}})
+    monkeypatch.setattr(agent, "call_information_extract", lambda document_path, schema: {"program_name": "p"})
+
+    agent.load_policy(str(pdf))
+    assert calls == [str(pdf)]
+    assert agent._parse_cache.get(agent._parse_cache_key("hash")) is not None
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+import agent
+import catalog
+from catalog import APPLICABLE, NOT_APPLICABLE, UNDECIDED, Catalog, _status
+from retrieval import PolicyIndex, chunk_text
+
+
+def _result(applicable: str) -> str:
+    return (
+        "[자격 판단]\n- 연령 요건 충족\n\n"
+        f"[신청 가능 정책]\n{applicable}\n\n"
+        "[예상 혜택]\n- 해당 없음\n\n[다음 단계]\n1. 신청\n\n[확인 필요 사항]\n- 없음"
+    )
+
+
+@pytest.mark.parametrize("body", [
+    "- 청년 지원사업 (소득 제한 없음)",
+    "1) 청년 월세 지원\n   - 중복 신청 불가",
+    "- 청년도약계좌: 제출 서류 외 추가 조건 없음",
+    "- **청년 지원사업**",
+])
+def test_ordinary_eligible_answers_are_applicable(body):
+    assert _status({"result": _result(body), "questions": []}) == APPLICABLE
+
+
+@pytest.mark.parametrize("body", [
+    "- 현재 프로필로 신청 가능한 정책이 없습니다.",
+    "- 해당 없음",
+    "없음",
+    "- 신청 가능한 정책 없음",
+    "- **해당 사항 없음**",
+])
+def test_none_statements_are_not_applicable(body):
+    assert _status({"result": _result(body), "questions": []}) == NOT_APPLICABLE
+
+
+def test_mixed_or_missing_section_is_undecided():
+    mixed = "- 현재 신청 가능한 정책이 없습니다.\n- 다만 무주택 확인 시 청년 월세 지원 신청 가능"
+    assert _status({"result": _result(mixed), "questions": []}) == UNDECIDED
+    assert _status({"result": "[자격 판단]\n- 확인 필요", "questions": []}) == UNDECIDED
+    assert _status({"result": _result("- 청년 지원사업"), "questions": [{"field": "주거"}]}) == UNDECIDED
+
+
+def test_prescreen_verdict_decides_status():
+    eligible = {"prescreen": {"sections": [{"eligible": False}, {"eligible": True}]}}
+    assert _status(eligible) == APPLICABLE
+    assert _status({"prescreen": {"sections": [{"eligible": False}]}}) == NOT_APPLICABLE
+
+
+def test_match_structures_profile_once_for_all_candidates(monkeypatch):
+    calls = []
+
+    async def structure(profile):
+        calls.append(profile)
+        return "나이: 30세"
+
+    async def plan(profile, policy, ie_extract):
+        assert profile == "나이: 30세"
+        return {"questions": []}
+
+    async def final(profile, policy, plan_result, answered_fields, ie_extract):
+        return _result("- 청년 지원사업")
+
+    monkeypatch.setattr(catalog, "_aget_structured_profile", structure)
+    monkeypatch.setattr(agent, "_aget_structured_profile", structure)
+    monkeypatch.setattr(agent, "_aplan_phase", plan)
+    monkeypatch.setattr(agent, "_afinal_phase", final)
+    entries = [
+        {"path": f"p{i}.pack.json", "name": f"정책{i}", "policy": PolicyIndex(chunk_text(text), text), "ie_extract": None}
+        for i, text in enumerate(["청년 월세 지원 자격", "청년 교통비 지원 자격", "청년 저축 지원 자격"])
+    ]
+    matches = asyncio.run(catalog.amatch_catalog("30세 청년", Catalog(entries), top_k=3))
+    assert calls == ["30세 청년"]
+    assert [p["status"] for p in matches["policies"]] == [APPLICABLE] * 3
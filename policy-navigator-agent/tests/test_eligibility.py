@@ -0,0 +1,97 @@
+from eligibility import evaluate_condition, evaluate_predicate, predicates_from_output, prescreen
+
+
+def _condition(cid, text, field, section="청년 지원", group=""):
+    return {"id": cid, "category": "", "condition": text, "field": field, "section": section, "group": group}
+
+
+AGE = {"condition_id": "C1", "field": "나이", "op": "range", "min": 19, "max": 34}
+
+
+def test_range_predicate_and_income_conversion():
+    assert evaluate_predicate(AGE, {"나이": "29세"}) is True
+    assert evaluate_predicate(AGE, {"나이": "41세"}) is False
+    assert evaluate_predicate(AGE, {"지역": "서울"}) is None
+    income = {"condition_id": "C2", "field": "월소득", "op": "range", "min": None, "max": 300}
+    assert evaluate_predicate(income, {"연소득": "연3000"}) is True  # 3000 / 12 = 250
+    assert evaluate_predicate(income, {"월소득": "월350"}) is False
+
+
+def test_region_predicate():
+    capital = {"condition_id": "C3", "field": "지역", "op": "in", "values": ["수도권"]}
+    assert evaluate_predicate(capital, {"지역": "서울시"}) is True
+    assert evaluate_predicate(capital, {"지역": "부산"}) is False
+    assert evaluate_predicate(capital, {"지역": "비수도권"}) is False
+    seoul = {"condition_id": "C3", "field": "지역", "op": "in", "values": ["서울"]}
+    assert evaluate_predicate(seoul, {"지역": "수도권"}) is None  # 일부만 겹침 → 보류
+    excluded = {"condition_id": "C3", "field": "지역", "op": "not_in", "values": ["서울"]}
+    assert evaluate_predicate(excluded, {"지역": "부산"}) is True
+
+
+def test_category_predicate_only_decides_on_exact_listing():
+    housing = {"condition_id": "C4", "field": "주거", "op": "in", "values": ["무주택"]}
+    assert evaluate_predicate(housing, {"주거": "무주택"}) is True
+    assert evaluate_predicate(housing, {"주거": "전세"}) is None
+
+
+def test_predicates_from_output_validates_items():
+    conditions = [_condition("C1", "만 19~34세", "나이")]
+    items = [
+        {**AGE, "either": True},
+        {"condition_id": "C9", "field": "나이", "op": "range", "min": 1},  # 없는 조건
+        {"condition_id": "C1", "field": "지역", "op": "range", "min": 1},  # 범주 필드에 range
+        {"condition_id": "C1", "field": "지역", "op": "in", "values": ["강남"]},  # 알 수 없는 지역
+    ]
+    assert predicates_from_output(items, conditions) == [{**AGE, "either": True}]
+
+
+def test_either_predicates_within_one_condition():
+    predicates = [
+        {"condition_id": "C1", "field": "나이", "op": "range", "min": None, "max": 34, "either": True},
+        {"condition_id": "C1", "field": "혼인상태", "op": "in", "values": ["신혼"], "either": True},
+    ]
+    assert evaluate_condition(predicates, {"나이": "41세", "혼인상태": "신혼"}) is True
+    assert evaluate_condition(predicates, {"나이": "41세", "혼인상태": "기혼"}) is None  # 기혼은 목록에 없음 → 보류
+    assert evaluate_condition(predicates, {"나이": "41세"}) is None
+    assert evaluate_condition([], {"나이": "41세"}) is None
+
+
+def test_prescreen_and_of_required_conditions():
+    conditions = [_condition("C1", "만 19세 이상 34세 이하", "나이"), _condition("C2", "월소득 300만원 이하", "월소득")]
+    predicates = [AGE, {"condition_id": "C2", "field": "월소득", "op": "range", "min": None, "max": 300}]
+    verdict = prescreen({"나이": "29세", "월소득": "월250"}, conditions, predicates)
+    assert verdict["sections"][0]["eligible"] is True
+    assert len(verdict["sections"][0]["met"]) == 2
+
+    verdict = prescreen({"나이": "41세", "월소득": "월250"}, conditions, predicates)
+    assert verdict["sections"][0]["eligible"] is False
+    assert [e["condition"] for e in verdict["sections"][0]["failed"]] == ["만 19세 이상 34세 이하"]
+
+
+def test_prescreen_alternative_group_is_not_a_hard_failure():
+    conditions = [
+        _condition("C1", "월소득 300만원 이하", "월소득", group="소득·자산 중 하나"),
+        _condition("C2", "무주택", "주거", group="소득·자산 중 하나"),
+    ]
+    predicates = [
+        {"condition_id": "C1", "field": "월소득", "op": "range", "min": None, "max": 300},
+        {"condition_id": "C2", "field": "주거", "op": "in", "values": ["무주택"]},
+    ]
+    verdict = prescreen({"월소득": "월500", "주거": "무주택"}, conditions, predicates)
+    assert verdict["sections"][0]["eligible"] is True
+    assert [e["condition"] for e in verdict["sections"][0]["met"]] == ["무주택"]
+    assert verdict["sections"][0]["failed"] == []
+
+    # 한쪽이 미충족, 다른 쪽은 판단 불가 → LLM으로
+    assert prescreen({"월소득": "월500"}, conditions, predicates) is None
+
+    verdict = prescreen({"월소득": "월500", "주거": "유주택"}, conditions, predicates)
+    assert verdict is None  # 유주택은 in 목록에 없으므로 보류 (범주는 정확히 있을 때만 확정)
+
+
+def test_prescreen_undecided_section_returns_none():
+    conditions = [_condition("C1", "만 19세 이상 34세 이하", "나이"), _condition("C2", "중위소득 150% 이하", "소득")]
+    assert prescreen({"나이": "29세"}, conditions, [AGE]) is None
+    # 필수 조건이 미충족이면 다른 조건이 보류여도 미충족 확정
+    verdict = prescreen({"나이": "41세"}, conditions, [AGE])
+    assert verdict["sections"][0]["eligible"] is False
@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from pdf_split import aparse_in_ranges, merge_parsed_ranges, parse_in_ranges
+
+
+RANGES = [{"start": 1, "end": 2}, {"start": 3, "end": 4}, {"start": 5, "end": 5}]
+
+
+def _result(label: str) -> dict:
+    return {
+        "api": "2.0",
+        "elements": [
+            {"id": 0, "page": 1, "category": "heading1", "content": {"html": f"{label}-h"}},
+            {"id": 1, "page": 2, "category": "paragraph", "content": {"html": f"{label}-p"}},
+        ],
+        "content": {"html": f"<p>{label}</p>"},
+        "usage": {"pages": 2},
+    }
+
+
+def test_merge_offsets_pages_and_renumbers_ids_in_range_order():
+    results = [_result("a"), _result("b"), {"elements": [{"id": 0, "page": 1}], "content": {"html": "<p>c</p>"}}]
+    merged = merge_parsed_ranges(RANGES, results)
+    assert [e["page"] for e in merged["elements"]] == [1, 2, 3, 4, 5]
+    assert [e["id"] for e in merged["elements"]] == [0, 1, 2, 3, 4]
+    assert merged["elements"][2]["content"]["html"] == "b-h"
+    assert merged["content"]["html"] == "<p>a</p>\n<p>b</p>\n<p>c</p>"
+    assert merged["usage"] == {"pages": 5}  # usage 없는 구간은 페이지 범위로 계산
+    assert merged["api"] == "2.0"
+    assert results[1]["elements"][0]["page"] == 1  # 원본 결과는 변경하지 않음
+
+
+def test_parse_in_ranges_keeps_range_order_and_retries_failed_range():
+    calls = []
+
+    def parse_range(page_range):
+        calls.append(page_range["start"])
+        if page_range["start"] == 3 and calls.count(3) == 1:
+            raise ConnectionError("temporary")
+        return {"start": page_range["start"]}
+
+    progress = []
+    results = parse_in_ranges(RANGES, parse_range, max_workers=3, range_retries=1,
+                              on_progress=lambda done, total, start, end: progress.append((done, total)))
+    assert [r["start"] for r in results] == [1, 3, 5]
+    assert calls.count(1) == 1 and calls.count(3) == 2  # 성공한 구간은 다시 요청하지 않음
+    assert sorted(progress) == [(1, 3), (2, 3), (3, 3)]
+
+
+def test_parse_in_ranges_raises_after_retries():
+    def parse_range(page_range):
+        if page_range["start"] == 5:
+            raise ConnectionError("down")
+        return {}
+
+    with pytest.raises(RuntimeError, match="5-5쪽"):
+        parse_in_ranges(RANGES, parse_range, max_workers=2, range_retries=1)
+
+
+def test_aparse_in_ranges_keeps_range_order():
+    async def parse_range(page_range):
+        await asyncio.sleep(0.01 * (6 - page_range["start"]))  # 뒤 구간이 먼저 끝남
+        return {"start": page_range["start"]}
+
+    results = asyncio.run(aparse_in_ranges(RANGES, parse_range, max_workers=3))
+    assert [r["start"] for r in results] == [1, 3, 5]
+
+
+def test_parse_cache_key_includes_split_settings(monkeypatch):
+    import agent
+
+    key = agent._parse_cache_key("hash")
+    monkeypatch.setitem(agent.PARSE_SPLIT_PARAMS, "pages", 7)
+    assert agent._parse_cache_key("hash") != key
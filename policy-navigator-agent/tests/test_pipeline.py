@@ -0,0 +1,70 @@
+import threading
+import time
+
+import pytest
+
+from pipeline import StageGraph
+
+
+def test_dependency_results_are_passed_in_order():
+    graph = StageGraph()
+    graph.add("a", lambda: 1)
+    graph.add("b", lambda x: x * 10, 5)
+    graph.add("c", lambda a, b, extra=0: (a, b, extra), deps=["a", "b"], extra=3)
+    assert graph.run() == {"a": 1, "b": 50, "c": (1, 50, 3)}
+
+
+def test_independent_stages_run_concurrently():
+    barrier = threading.Barrier(2, timeout=2)  # 두 단계가 동시에 실행 중이어야 통과
+    graph = StageGraph(max_workers=2)
+    graph.add("parse", barrier.wait)
+    graph.add("profile", barrier.wait)
+    graph.add("plan", lambda parse, profile: "done", deps=["parse", "profile"])
+    assert graph.run()["plan"] == "done"
+
+
+def test_stage_starts_only_after_all_deps_finish():
+    events = []
+
+    def slow(name, seconds):
+        time.sleep(seconds)
+        return name
+
+    graph = StageGraph(max_workers=3)
+    graph.add("parse", slow, "parse", 0.05)
+    graph.add("ie", slow, "ie", 0.15)
+    graph.add("policy", lambda parse: parse, deps=["parse"])
+    graph.add("plan", lambda policy, ie: "plan", deps=["policy", "ie"])
+    graph.run(on_done=lambda name, _: events.append(("done", name)), on_start=lambda name: events.append(("start", name)))
+    start_plan = events.index(("start", "plan"))
+    assert start_plan > events.index(("done", "ie"))
+    assert start_plan > events.index(("done", "policy"))
+    assert events.index(("start", "policy")) > events.index(("done", "parse"))
+
+
+def test_exception_propagates_and_stops_dependents():
+    ran = []
+
+    def fail():
+        raise ValueError("parse failed")
+
+    def slow():
+        time.sleep(0.1)
+        ran.append("profile")
+
+    graph = StageGraph(max_workers=2)
+    graph.add("parse", fail)
+    graph.add("profile", slow)
+    graph.add("policy", lambda parse: ran.append("policy"), deps=["parse"])
+    with pytest.raises(ValueError, match="parse failed"):
+        graph.run()
+    assert ran == ["profile"]  # 실행 중이던 단계는 끝까지, 실패한 단계의 후속 단계는 실행 안 함
+
+
+def test_add_rejects_duplicate_and_unknown_deps():
+    graph = StageGraph()
+    graph.add("a", lambda: 1)
+    with pytest.raises(ValueError):
+        graph.add("a", lambda: 2)
+    with pytest.raises(ValueError):
+        graph.add("b", lambda x: x, deps=["missing"])
@@ -0,0 +1,61 @@
+import json
+import os
+
+import pytest
+
+from policy_pack import PACK_FORMAT, PACK_VERSION, build_pack, load_pack, pack_policy, save_pack
+from retrieval import PolicyIndex, chunk_text
+
+
+TEXT = "지원 대상: 만 19세 이상 34세 이하 청년. 연소득 7,500만원 이하."
+CONDITIONS = [{"section": "청년도약계좌", "condition": "만 19~34세", "field": "나이", "group": ""}]
+PREDICATES = [{"field": "나이", "op": "between", "value": [19, 34], "condition": 0}]
+IE = {"program_name": "청년도약계좌", "benefit": "정부 기여금"}
+
+
+def _pack(tmp_path):
+    pdf = tmp_path / "policy.pdf"
+    pdf.write_bytes(b"%PDF-1.4 test")
+    policy = PolicyIndex(chunk_text(TEXT), TEXT)
+    return build_pack(
+        str(pdf), policy, json.dumps(IE, ensure_ascii=False), CONDITIONS, PREDICATES,
+        parse_params={"ocr": "auto"}, ie_schema={"type": "object"},
+    )
+
+
+def test_save_load_round_trip(tmp_path):
+    pack = _pack(tmp_path)
+    path = tmp_path / "packs" / "policy.pack.json"
+    save_pack(pack, str(path))
+    loaded = load_pack(str(path))
+    assert loaded == pack
+    assert loaded["format"] == PACK_FORMAT and loaded["version"] == PACK_VERSION
+    assert loaded["source"]["name"] == "policy.pdf" and loaded["source"]["size"] == len(b"%PDF-1.4 test")
+    assert os.listdir(path.parent) == ["policy.pack.json"]  # 임시 파일이 남지 않음
+
+    policy, ie_extract = pack_policy(loaded)
+    assert policy.text == TEXT and policy.chunks == chunk_text(TEXT)
+    assert policy.conditions == CONDITIONS and policy.predicates == PREDICATES
+    assert json.loads(ie_extract) == IE
+
+
+def test_mismatched_version_is_rejected(tmp_path):
+    pack = {**_pack(tmp_path), "version": PACK_VERSION - 1}
+    path = tmp_path / "old.pack.json"
+    save_pack(pack, str(path))
+    with pytest.raises(ValueError, match="버전"):
+        load_pack(str(path))
+
+
+def test_non_pack_file_and_missing_file_are_rejected(tmp_path):
+    path = tmp_path / "other.json"
+    path.write_text(json.dumps({"format": "something-else", "version": PACK_VERSION}), encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_pack(str(path))
+    with pytest.raises(FileNotFoundError):
+        load_pack(str(tmp_path / "missing.pack.json"))
+
+
+def test_pack_without_ie_loads_as_none(tmp_path):
+    pack = {**_pack(tmp_path), "ie": None}
+    assert pack_policy(pack)[1] is None
@@ -0,0 +1,99 @@
+import asyncio
+import os
+
+import pytest
+
+from policy_pack import PACK_FORMAT, PACK_VERSION, save_pack
+from policy_store import PolicyStore, policy_name
+
+
+def _write_pack(path, text, mtime):
+    save_pack({
+        "format": PACK_FORMAT,
+        "version": PACK_VERSION,
+        "source": {"name": "policy.pdf"},
+        "text": text,
+        "chunks": [{"id": 0, "heading": "", "page": None, "text": text}],
+        "ie": None,
+        "conditions": [],
+        "predicates": [],
+    }, str(path))
+    os.utime(path, (mtime, mtime))
+
+
+async def _settle(store, name):
+    """백그라운드 로드가 있으면 끝날 때까지 대기 (완료 콜백까지)."""
+    task = store._loading.get(name)
+    if task is not None:
+        await asyncio.gather(task, return_exceptions=True)
+    await asyncio.sleep(0)
+
+
+def test_policy_name_strips_suffixes():
+    assert policy_name("data/finance_policy.pack.json") == "finance_policy"
+    assert policy_name("data/finance_policy.pdf") == "finance_policy"
+
+
+def test_modified_pack_is_reloaded_in_background(tmp_path):
+    path = tmp_path / "finance.pack.json"
+    _write_pack(path, "버전 1 본문", 1_000_000)
+    store = PolicyStore([str(path)], check_seconds=0)
+
+    async def scenario():
+        await store.preload()
+        assert (await store.get("finance"))[0].text == "버전 1 본문"
+
+        _write_pack(path, "버전 2 본문", 1_000_100)
+        policy, _ = await store.get("finance")  # 변경 감지 → 다시 로드 시작, 이번 요청은 이전 버전
+        assert policy.text == "버전 1 본문"
+        await _settle(store, "finance")
+        assert (await store.get("finance"))[0].text == "버전 2 본문"
+
+    asyncio.run(scenario())
+    assert store.reloads == 1
+
+
+def test_touched_file_with_same_content_is_not_reloaded(tmp_path):
+    path = tmp_path / "finance.pack.json"
+    _write_pack(path, "같은 본문", 1_000_000)
+    store = PolicyStore([str(path)], check_seconds=0)
+
+    async def scenario():
+        await store.preload()
+        os.utime(path, (1_000_100, 1_000_100))
+        await store.get("finance")
+        await _settle(store, "finance")
+
+    asyncio.run(scenario())
+    assert store.reloads == 0
+
+
+def test_broken_file_keeps_previous_entry(tmp_path):
+    path = tmp_path / "finance.pack.json"
+    _write_pack(path, "정상 본문", 1_000_000)
+    store = PolicyStore([str(path)], check_seconds=0)
+
+    async def scenario():
+        await store.preload()
+        path.write_text("{쓰는 중", encoding="utf-8")
+        os.utime(path, (1_000_100, 1_000_100))
+        await store.get("finance")
+        await _settle(store, "finance")
+        assert (await store.get("finance"))[0].text == "정상 본문"
+        await _settle(store, "finance")
+
+        _write_pack(path, "고친 본문", 1_000_200)  # 파일이 복구되면 다음 확인 때 새 버전
+        await store.get("finance")
+        await _settle(store, "finance")
+        assert (await store.get("finance"))[0].text == "고친 본문"
+
+    asyncio.run(scenario())
+    assert store.reloads == 1
+
+
+def test_preload_fails_on_broken_file(tmp_path):
+    path = tmp_path / "finance.pack.json"
+    path.write_text("not json", encoding="utf-8")
+    store = PolicyStore([str(path)], check_seconds=0)
+    with pytest.raises(ValueError):
+        asyncio.run(store.preload())
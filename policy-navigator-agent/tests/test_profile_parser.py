@@ -0,0 +1,35 @@
+from profile_parser import parse_profile_rules
+
+
+def test_slash_profile():
+    assert parse_profile_rules("29세/수도권/중소기업/월250/미혼") == {
+        "나이": "29세", "지역": "수도권", "직업": "중소기업", "월소득": "월250", "혼인상태": "미혼",
+    }
+
+
+def test_region_suffix_children_and_housing():
+    assert parse_profile_rules("만 41세/부산광역시/자녀 2명/무주택") == {
+        "나이": "41세", "지역": "부산광역시", "자녀": "2명", "주거": "무주택",
+    }
+
+
+def test_structured_profile_round_trip():
+    structured = "나이: 29세, 지역: 서울, 월소득: 월250"
+    assert parse_profile_rules(structured) == {"나이": "29세", "지역": "서울", "월소득": "월250"}
+
+
+def test_unknown_key_falls_back_to_llm():
+    assert parse_profile_rules("29세/서울/비고: 작년에 퇴사 후 프리랜서") is None
+    assert parse_profile_rules("주택소유여부: 없음") is None
+
+
+def test_unrecognized_or_conflicting_token_falls_back():
+    assert parse_profile_rules("29세/서울/작년에 퇴사") is None
+    assert parse_profile_rules("29세/31세") is None
+    assert parse_profile_rules("") is None
+
+
+def test_thousands_separator_is_not_a_token_boundary():
+    assert parse_profile_rules("29세, 서울, 연소득 3,000만원") == {"나이": "29세", "지역": "서울", "연소득": "연3000"}
+    assert parse_profile_rules("29세/월 2,500,000원") == {"나이": "29세", "월소득": "월250"}
+    assert parse_profile_rules("29세/월2.5") == {"나이": "29세", "월소득": "월2.5"}
@@ -0,0 +1,136 @@
+import json
+import logging
+
+import pytest
+
+import agent
+import prefix_check
+from prompts import CHARS_PER_TOKEN, PromptBudget, compact_ie_extract, compact_plan
+from retrieval import PolicyIndex, chunk_elements, chunk_text
+
+
+def test_budget_add_reserve_release_used():
+    budget = PromptBudget(100)
+    assert budget.add("template", "가" * 20) == "가" * 20
+    budget.add("ie", None)
+    budget.reserve("user", 30)
+    assert budget.sections == {"template": 10, "ie": 0, "user": 30}
+    assert budget.used == 40
+    budget.add("template", "가" * 40)  # 같은 이름은 덮어씀
+    budget.release("user")
+    budget.release("missing")
+    assert budget.used == 20
+
+
+def test_policy_chars_uses_remaining_budget_within_cap_and_min():
+    budget = PromptBudget(100)
+    budget.reserve("fixed", 60)
+    assert budget.policy_chars(10_000, 0) == 40 * CHARS_PER_TOKEN
+    assert budget.policy_chars(50, 0) == 50
+    budget.reserve("fixed", 150)  # 고정 섹션이 예산을 넘어도 최소 길이는 남김
+    assert budget.policy_chars(10_000, 30) == 30
+
+
+def test_compact_ie_extract_drops_fields_covered_by_policy_text():
+    ie = json.dumps({
+        "지원대상": "만 19세 이상 34세 이하 청년",
+        "신청기간": "2025년 3월 1일부터",
+        "제출서류": ["주민등록등본", "소득금액증명원"],
+        "비고": "",
+    }, ensure_ascii=False)
+    policy_text = "지원대상: 만 19세 이상 34세 이하 청년. 제출서류는 주민등록등본."
+    assert json.loads(compact_ie_extract(ie, policy_text)) == {
+        "신청기간": "2025년 3월 1일부터",
+        "제출서류": ["소득금액증명원"],
+    }
+
+
+def test_compact_ie_extract_edge_cases():
+    assert compact_ie_extract(None, "본문") is None
+    assert compact_ie_extract(json.dumps({"a": "본문"}), "본문") is None
+    assert compact_ie_extract("not json", "본문") == "not json"
+    assert compact_ie_extract("[1, 2]", "본문") == "[1, 2]"
+
+
+def test_compact_plan_keeps_conditions_and_actions_only():
+    plan = {
+        "certain_conditions": ["나이 충족"],
+        "uncertain_conditions": None,
+        "questions": [{"question": "소득은?"}],
+        "action_candidates": ["온라인 신청"],
+    }
+    assert json.loads(compact_plan(plan)) == {
+        "certain_conditions": ["나이 충족"],
+        "uncertain_conditions": [],
+        "action_candidates": ["온라인 신청"],
+    }
+
+
+def _policy(chars: int) -> PolicyIndex:
+    text = "청년 지원 자격 조건 소득 기준 신청 방법 안내. " * (chars // 28 + 1)
+    return PolicyIndex(chunk_text(text), text)
+
+
+def test_disabled_budget_keeps_full_prompt(monkeypatch, caplog):
+    monkeypatch.setattr(agent, "PROMPT_BUDGET_ENABLED", False)
+    monkeypatch.setattr(agent, "PLAN_PROMPT_TOKENS", 10)
+    policy = _policy(20_000)
+    with caplog.at_level(logging.WARNING, logger="agent"):
+        prompt = agent._plan_prompt("30세 직장인", policy, None)
+    assert prompt == agent._plan_prompt_full("30세 직장인", policy, None)
+    assert not caplog.records
+
+
+def test_trimmed_policy_text_is_logged(monkeypatch, caplog):
+    monkeypatch.setattr(agent, "PROMPT_BUDGET_ENABLED", True)
+    monkeypatch.setattr(agent, "PLAN_PROMPT_TOKENS", 10)
+    with caplog.at_level(logging.WARNING, logger="agent"):
+        agent._plan_prompt("30세 직장인", _policy(20_000), None)
+    assert any("Plan 프롬프트 예산" in record.getMessage() for record in caplog.records)
+
+
+def test_no_warning_when_budget_fits(monkeypatch, caplog):
+    monkeypatch.setattr(agent, "PROMPT_BUDGET_ENABLED", True)
+    monkeypatch.setattr(agent, "PLAN_PROMPT_TOKENS", 1_000_000)
+    with caplog.at_level(logging.WARNING, logger="agent"):
+        agent._plan_prompt("30세 직장인", _policy(20_000), None)
+    assert not caplog.records
+
+
+def _multi_section_policy() -> PolicyIndex:
+    sections = [
+        ("지원 대상", "만 19세 이상 34세 이하 청년, 개인소득 연 7,500만원 이하, 가구소득 중위 180% 이하."),
+        ("지원 내용", "정부 기여금 월 최대 3.3만원, 비과세 혜택, 5년 만기 적금."),
+        ("신청 방법", "은행 앱에서 매월 신청, 가입 심사 후 계좌 개설."),
+        ("제외 대상", "직전 3개년 중 1회 이상 금융소득종합과세 대상자는 가입 불가."),
+        ("자녀 지원", "자녀 1명당 추가 지원, 한부모 가구 우대."),
+        ("지역 요건", "수도권·비수도권 구분 없이 전국 거주 청년."),
+    ]
+    elements = []
+    for heading, body in sections * 6:
+        elements.append({"category": "heading1", "content": {"text": heading}})
+        elements.extend({"category": "paragraph", "content": {"text": f"{body} 세부 안내 {i}."}} for i in range(8))
+    chunks = chunk_elements(elements)
+    return PolicyIndex(chunks, " ".join(c["text"] for c in chunks))
+
+
+@pytest.mark.parametrize("budget_enabled", [False, True])
+def test_different_profiles_share_policy_prefix(monkeypatch, budget_enabled):
+    monkeypatch.setattr(agent, "PROMPT_BUDGET_ENABLED", budget_enabled)
+    policy = _multi_section_policy()
+    ie = json.dumps({"program_name": "청년도약계좌", "benefit": "정부 기여금"}, ensure_ascii=False)
+    profile_a, profile_b = "29세/서울/중소기업/월250", "41세/부산/자영업/월400/기혼"
+    prompts_a = prefix_check._session_prompts(profile_a, policy, ie)
+    prompts_b = prefix_check._session_prompts(profile_b, policy, ie)
+    structured_a = agent._rule_structured_profile(profile_a)
+    caps = {"plan": agent._plan_context_chars(policy), "replan": agent.REPLAN_CONTEXT_CHARS, "final": agent.FINAL_CONTEXT_CHARS}
+    for stage, prompt_a in prompts_a.items():
+        shared = prefix_check.shared_prefix_length(prompt_a, prompts_b[stage])
+        # 프로필과 무관한 정책 블록은 공통 접두부 안에, 프로필은 그 뒤에
+        assert structured_a not in prompt_a[:shared], stage
+        assert shared > prompt_a.index("■ ") + 2000, stage
+        if not budget_enabled:
+            block, _ = agent._stable_policy_block(policy, int(caps[stage] * agent.STABLE_POLICY_SHARE))
+            assert block in prompt_a[:shared], stage
+    rows = prefix_check.compare_sessions(policy, ie, profile_a, profile_b)
+    assert all(row["shared_ratio"] > 0.7 for row in rows)
@@ -0,0 +1,55 @@
+import logging
+
+import agent
+from agent import _local_filter_questions
+
+
+PROFILE = "29세/서울/중소기업/월250"
+
+
+def _q(field, question="질문"):
+    return {"field": field, "question": question}
+
+
+def test_questions_about_profile_fields_are_dropped():
+    questions = [
+        _q("나이", "나이가 어떻게 되나요?"),
+        _q("연령"),  # 나이의 별칭
+        _q("거주지역"),
+        _q("고용형태"),
+        _q("월평균소득"),
+        _q("소득 수준"),  # 공백·접미사(수준) 제거 후 "소득" → 월소득
+    ]
+    assert _local_filter_questions(PROFILE, questions) == []
+
+
+def test_unrelated_questions_are_kept_in_order():
+    questions = [
+        _q("나이"),
+        _q("주택소유여부", "주택을 소유하고 있나요?"),
+        _q("연소득", "연소득은 얼마인가요?"),  # 월소득만 있으면 연소득은 물어봄
+        _q("자녀수", "자녀가 있나요?"),
+    ]
+    assert _local_filter_questions(PROFILE, questions) == questions[1:]
+
+
+def test_dropped_questions_are_logged(caplog):
+    with caplog.at_level(logging.INFO, logger="agent"):
+        _local_filter_questions(PROFILE, [_q("연령"), _q("자녀수")])
+    assert any("연령" in record.getMessage() and "자녀수" not in record.getMessage() for record in caplog.records)
+
+
+def test_undecidable_cases_fall_back_to_llm():
+    assert _local_filter_questions(PROFILE, [_q("나이"), "소득이 얼마인가요?"]) is None  # field 없는 질문
+    assert _local_filter_questions("작년에 퇴사한 청년", [_q("나이")]) is None  # 규칙 파싱 불가
+    assert _local_filter_questions(PROFILE, []) == []
+
+
+def test_plan_questions_calls_llm_filter_only_when_needed(monkeypatch):
+    calls = []
+    monkeypatch.setattr(agent, "PLAN_FILTERS_QUESTIONS", True)
+    monkeypatch.setattr(agent, "_filter_questions_llm", lambda profile, questions: calls.append(questions) or [])
+    assert agent._plan_questions(PROFILE, {"questions": [_q("나이"), _q("자녀수")]}) == [_q("자녀수")]
+    assert calls == []
+    agent._plan_questions(PROFILE, {"questions": ["소득이 얼마인가요?"]})
+    assert calls == [["소득이 얼마인가요?"]]
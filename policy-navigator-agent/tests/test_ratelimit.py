@@ -0,0 +1,109 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from ratelimit import EndpointLimiter, TokenBucket, estimate_tokens
+import resilience
+from resilience import DeadlineExceeded, HedgeCancelled, deadline
+
+
+def _tokens(bucket: TokenBucket) -> float:
+    with bucket._lock:
+        bucket._refill()
+        return bucket._tokens
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 1
+    assert estimate_tokens("가" * 10) == 5
+
+
+def test_bucket_reserve_returns_wait_for_debt():
+    bucket = TokenBucket(rate=10, capacity=1)
+    assert bucket.reserve(1) == 0.0
+    assert bucket.reserve(1) == pytest.approx(0.1, abs=0.01)
+
+
+def test_settle_tokens_refunds_overestimate():
+    limiter = EndpointLimiter("solar", tpm=600)
+    with limiter.limit(100):
+        pass
+    assert _tokens(limiter._tokens) == pytest.approx(500, abs=1)
+    limiter.settle_tokens(100, 40)
+    assert _tokens(limiter._tokens) == pytest.approx(560, abs=1)
+    limiter.settle_tokens(100, None)  # usage 없음 → 추정치 유지
+    assert _tokens(limiter._tokens) == pytest.approx(560, abs=1)
+
+
+def test_deadline_failure_refunds_reservation():
+    limiter = EndpointLimiter("solar", rps=1, tpm=600)
+    with limiter.limit(600):  # 버킷 소진
+        pass
+    before = (_tokens(limiter._requests), _tokens(limiter._tokens))
+    with deadline(0.05):
+        with pytest.raises(DeadlineExceeded):
+            with limiter.limit(300):
+                pass
+    after = (_tokens(limiter._requests), _tokens(limiter._tokens))
+    assert after[0] == pytest.approx(before[0], abs=0.2)
+    assert after[1] == pytest.approx(before[1], abs=1)
+    assert limiter.stats()["queued"] == 0
+
+
+def test_hedge_loser_releases_slot_and_refunds_reservation():
+    limiter = EndpointLimiter("solar", rps=10, max_concurrency=1, tpm=600)
+    before = (_tokens(limiter._requests), _tokens(limiter._tokens))
+    cancel = threading.Event()
+    cancel.set()
+    token = resilience._hedge_cancel.set(cancel)
+    try:
+        with pytest.raises(HedgeCancelled):
+            with limiter.limit(300):
+                raise AssertionError("request sent after losing the hedge race")
+    finally:
+        resilience._hedge_cancel.reset(token)
+    after = (_tokens(limiter._requests), _tokens(limiter._tokens))
+    assert after[0] == pytest.approx(before[0], abs=0.2)
+    assert after[1] == pytest.approx(before[1], abs=1)
+    with limiter.limit(0):  # 슬롯이 반환되어 바로 다시 얻을 수 있음
+        pass
+    assert limiter.stats()["in_flight"] == 0 and limiter.stats()["queued"] == 0
+
+
+def test_rate_wait_does_not_hold_concurrency_slot():
+    limiter = EndpointLimiter("solar", rps=2, max_concurrency=1)
+    with limiter.limit(), limiter._requests._lock:
+        limiter._requests._tokens = 0.0  # 버킷 소진 → 다음 요청은 약 0.5초 대기
+        pass
+    waiting_holds_slot = []
+
+    def slow_rate_wait():
+        with limiter.limit():
+            pass
+
+    thread = threading.Thread(target=slow_rate_wait)
+    thread.start()
+    time.sleep(0.05)  # 다른 스레드가 속도 제한으로 대기 중
+    waiting_holds_slot.append(not limiter._semaphore.acquire(blocking=False))
+    if not waiting_holds_slot[0]:
+        limiter._semaphore.release()
+    thread.join()
+    assert waiting_holds_slot == [False]
+
+
+def test_async_limit_releases_slot_and_counts():
+    limiter = EndpointLimiter("solar", max_concurrency=2)
+
+    async def run():
+        async def one():
+            async with limiter.alimit(10):
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(one() for _ in range(5)))
+
+    asyncio.run(run())
+    stats = limiter.stats()
+    assert stats["requests"] == 5
+    assert stats["in_flight"] == 0 and stats["queued"] == 0
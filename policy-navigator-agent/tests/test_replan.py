@@ -0,0 +1,70 @@
+import json
+
+import agent
+from agent import _merge_replan_output
+from retrieval import PolicyIndex, chunk_text
+
+
+PREVIOUS = {
+    "certain_conditions": ["나이: 30세로 충족"],
+    "uncertain_conditions": ["소득: 연소득 미확인", "주택: 무주택 여부 미확인"],
+    "questions": [
+        {"field": "연소득", "question": "연소득이 얼마인가요?"},
+        {"field": "주택소유", "question": "주택을 소유하고 있나요?"},
+    ],
+    "action_candidates": ["청년도약계좌 검토 필요"],
+}
+
+
+def test_missing_or_invalid_keys_keep_previous_conditions():
+    output = json.dumps({"uncertain_conditions": "잘못된 형식", "action_candidates": ["청년도약계좌 신청 가능"]})
+    merged = _merge_replan_output(PREVIOUS, output)
+    assert merged["certain_conditions"] == PREVIOUS["certain_conditions"]
+    assert merged["uncertain_conditions"] == PREVIOUS["uncertain_conditions"]
+    assert merged["questions"] == PREVIOUS["questions"]
+    assert merged["action_candidates"] == ["청년도약계좌 신청 가능"]
+
+
+def test_resolved_condition_moves_to_certain():
+    output = json.dumps({
+        "certain_conditions": ["나이: 30세로 충족", "소득: 연 3,000만원으로 충족"],
+        "uncertain_conditions": ["주택: 무주택 여부 미확인"],
+        "questions": [{"field": "주택소유", "question": "주택을 소유하고 있나요?"}],
+        "action_candidates": ["청년도약계좌 검토 필요"],
+    }, ensure_ascii=False)
+    merged = _merge_replan_output(PREVIOUS, output, {"연소득": "3000만원"})
+    assert merged["certain_conditions"] == ["나이: 30세로 충족", "소득: 연 3,000만원으로 충족"]
+    assert merged["uncertain_conditions"] == ["주택: 무주택 여부 미확인"]
+    assert PREVIOUS["certain_conditions"] == ["나이: 30세로 충족"]  # 1차 Plan은 변경하지 않음
+
+
+def test_new_questions_are_deduplicated_and_answered_fields_dropped():
+    output = json.dumps({
+        "certain_conditions": ["나이: 30세로 충족", "나이: 30세로 충족"],
+        "questions": [
+            {"field": "연소득", "question": "연소득을 다시 알려주세요."},
+            {"field": "주택소유", "question": "주택을 소유하고 있나요?"},
+            {"field": "주택소유", "question": "집이 있으신가요?"},
+            {"field": "", "question": "다른 지원을 받고 있나요?"},
+            {"field": "", "question": "다른 지원을 받고 있나요?"},
+        ],
+    }, ensure_ascii=False)
+    merged = _merge_replan_output(PREVIOUS, output, {"연소득": "3000만원"})
+    assert merged["questions"] == [
+        {"field": "주택소유", "question": "주택을 소유하고 있나요?"},
+        {"field": "", "question": "다른 지원을 받고 있나요?"},
+    ]
+    assert merged["certain_conditions"] == ["나이: 30세로 충족"]
+
+
+def test_unparseable_output_returns_none():
+    assert _merge_replan_output(PREVIOUS, "분석 결과를 만들 수 없습니다") is None
+
+
+def test_replan_falls_back_to_full_plan_when_merge_fails(monkeypatch):
+    calls = []
+    monkeypatch.setattr(agent, "call_solar", lambda prompt, **kwargs: "not json")
+    monkeypatch.setattr(agent, "_plan_phase", lambda **kwargs: calls.append(kwargs) or {"questions": []})
+    text = "지원 대상: 만 19~34세 청년, 연소득 7,500만원 이하."
+    result = agent._replan_phase("나이: 30세", PolicyIndex(chunk_text(text), text), None, PREVIOUS, {"연소득": "3000만원"})
+    assert result == {"questions": []} and len(calls) == 1
@@ -0,0 +1,87 @@
+import threading
+import time
+
+import httpx
+
+import resilience
+from config import SOLAR_MAX_CONCURRENCY
+
+
+def test_call_hedged_returns_faster_hedge(monkeypatch):
+    monkeypatch.setattr(resilience, "hedge_delay", lambda key: 0.05)
+    calls = []
+
+    def fn():
+        calls.append(threading.current_thread().name)
+        if len(calls) == 1:
+            time.sleep(0.5)
+            return "primary"
+        return "hedge"
+
+    attributes = {}
+    started = time.monotonic()
+    assert resilience.call_hedged(fn, attributes) == "hedge"
+    assert time.monotonic() - started < 0.4
+    assert attributes["hedged"] is True
+    assert calls[0].startswith("solar-primary") and calls[1].startswith("solar-hedge")
+
+
+def test_call_hedged_primary_does_not_use_hedge_pool(monkeypatch):
+    monkeypatch.setattr(resilience, "hedge_delay", lambda key: 1.0)
+    monkeypatch.setattr(resilience, "_hedge_executor", lambda: (_ for _ in ()).throw(AssertionError("pool used")))
+    assert resilience.call_hedged(lambda: 42) == 42
+
+
+def test_call_hedged_propagates_error_when_both_fail(monkeypatch):
+    monkeypatch.setattr(resilience, "hedge_delay", lambda key: 0.01)
+
+    def fn():
+        time.sleep(0.05)
+        raise ValueError("boom")
+
+    try:
+        resilience.call_hedged(fn)
+    except ValueError as exc:
+        assert str(exc) == "boom"
+    else:
+        raise AssertionError("expected ValueError")
+
+
+def test_backoff_delay_respects_retry_after(monkeypatch):
+    monkeypatch.setattr(resilience.random, "uniform", lambda a, b: 0.0)
+    assert resilience.backoff_delay(0, retry_after=1.5) == 1.5
+    assert resilience.backoff_delay(0) == 0.0
+
+
+def test_losing_primary_stops_retrying_after_hedge_wins(monkeypatch):
+    monkeypatch.setattr(resilience, "hedge_delay", lambda key: 0.02)
+    monkeypatch.setattr(resilience, "backoff_delay", lambda attempt, retry_after=None: 0.05)
+    primary_attempts = []
+
+    def attempt():
+        if threading.current_thread().name.startswith("solar-primary"):
+            primary_attempts.append(1)
+            time.sleep(0.1)
+            raise httpx.ConnectError("slow upstream")
+        return "hedge"
+
+    assert resilience.call_hedged(lambda: resilience.call_with_retry(attempt)) == "hedge"
+    time.sleep(0.3)  # 주 요청이 재시도했다면 이 사이에 시도가 늘어남
+    assert primary_attempts == [1]
+
+
+def test_primaries_run_on_bounded_pool(monkeypatch):
+    monkeypatch.setattr(resilience, "hedge_delay", lambda key: 1.0)
+    names = set()
+
+    def fn():
+        names.add(threading.current_thread().name)
+        return 1
+
+    threads = [threading.Thread(target=resilience.call_hedged, args=(fn,)) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(name.startswith("solar-primary") for name in names)
+    assert len(names) <= max(1, SOLAR_MAX_CONCURRENCY)
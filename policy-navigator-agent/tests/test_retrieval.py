@@ -0,0 +1,71 @@
+from retrieval import BM25Index, PolicyIndex, chunk_elements, format_chunks, tokenize
+
+
+ELEMENTS = [
+    {"category": "header", "page": 1, "content": {"text": "2025 청년정책 안내"}},
+    {"category": "heading1", "page": 1, "content": {"text": "사업 개요"}},
+    {"category": "paragraph", "page": 1, "content": {"text": "청년의 자산 형성을 돕기 위한 저축 지원 사업입니다."}},
+    {"category": "paragraph", "page": 1, "content": {"text": "정부가 매월 기여금을 지급합니다."}},
+    {"category": "heading1", "page": 2, "content": {"text": "지원 대상"}},
+    {"category": "paragraph", "page": 2, "content": {"text": "만 19세 이상 34세 이하 청년으로 개인소득 연 7,500만원 이하인 자."}},
+    {"category": "table", "page": 2, "content": {"html": "<table><tr><td>소득 구간</td><td>기여금</td></tr>"
+                                                           "<tr><td>2,400만원 이하</td><td>월 3.3만원</td></tr></table>"}},
+    {"category": "paragraph", "page": 2, "content": {"text": "가구소득 중위 180% 이하 요건도 충족해야 합니다."}},
+    {"category": "footer", "page": 2, "content": {"text": "- 2 -"}},
+    {"category": "heading1", "page": 3, "content": {"text": "신청 방법"}},
+    {"category": "paragraph", "page": 3, "content": {"text": "은행 앱에서 매월 신청할 수 있습니다."}},
+]
+
+
+def test_chunks_follow_headings_and_keep_tables_alone():
+    chunks = chunk_elements(ELEMENTS)
+    assert [(c["heading"], c["page"]) for c in chunks] == [
+        ("사업 개요", 1),
+        ("지원 대상", 2),
+        ("지원 대상", 2),  # 표 단독 청크
+        ("지원 대상", 2),
+        ("신청 방법", 3),
+    ]
+    assert [c["id"] for c in chunks] == list(range(5))
+    assert chunks[0]["text"] == "청년의 자산 형성을 돕기 위한 저축 지원 사업입니다. 정부가 매월 기여금을 지급합니다."
+    assert chunks[2]["text"] == "소득 구간 기여금 2,400만원 이하 월 3.3만원"  # HTML 태그 제거
+    assert "<" not in chunks[2]["text"]
+    assert not any("2025 청년정책 안내" in c["text"] or c["text"] == "- 2 -" for c in chunks)
+
+
+def test_long_section_is_split_within_max_chars():
+    sentence = "연소득 요건을 충족해야 합니다. "
+    elements = [{"category": "heading1", "content": {"text": "자격"}}]
+    elements += [{"category": "paragraph", "content": {"text": sentence * 3}} for _ in range(10)]
+    chunks = chunk_elements(elements, max_chars=120)
+    assert len(chunks) > 1
+    assert all(len(c["text"]) <= 120 and c["heading"] == "자격" for c in chunks)
+
+
+def test_tokenize_adds_hangul_bigrams():
+    assert tokenize("개인소득 34세") == ["개인소득", "개인", "인소", "소득", "34", "세"]
+
+
+def test_bm25_ranks_condition_chunk_first():
+    chunks = chunk_elements(ELEMENTS)
+    scores = BM25Index(chunks).scores("나이 34세 청년 개인소득 요건")
+    assert max(range(len(chunks)), key=scores.__getitem__) == 1  # "지원 대상" 본문
+    assert scores[1] > scores[4]
+
+
+def test_select_respects_budget_exclusions_and_document_order():
+    chunks = chunk_elements(ELEMENTS)
+    index = PolicyIndex(chunks, " ".join(c["text"] for c in chunks))
+    selected = index.select_chunks("기여금 소득 구간", 120)
+    assert sum(len(c["text"]) + len(c["heading"]) + 2 for c in selected) <= 120
+    assert [c["id"] for c in selected] == sorted(c["id"] for c in selected)
+    assert 2 in [c["id"] for c in selected]  # 표 청크
+    assert 2 not in [c["id"] for c in index.select_chunks("기여금 소득 구간", 120, exclude=[2])]
+    assert index.select_chunks("기여금", 0) == []
+
+
+def test_format_chunks_shows_heading_once_per_section():
+    chunks = chunk_elements(ELEMENTS)
+    text = format_chunks(chunks[1:4])
+    assert text.count("■ 지원 대상") == 1
+    assert text.startswith("■ 지원 대상\n만 19세")
@@ -0,0 +1,99 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+import server
+from resilience import DeadlineExceeded
+from server import InMemorySessionStore, SessionStore, create_app
+from upstage_client import UpstageAPIError
+
+
+def _request(app, method, path, body=None):
+    """ASGI 요청 1건 실행 → (상태 코드, JSON 본문)."""
+    messages = [{"type": "http.request", "body": json.dumps(body).encode() if body is not None else b""}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app({"type": "http", "method": method, "path": path}, receive, send))
+    data = sent[1]["body"]
+    return sent[0]["status"], json.loads(data) if data else None
+
+
+def _app_failing_with(monkeypatch, exc):
+    app = create_app(["finance_policy.pdf"])
+
+    async def fake_get(name):
+        return None, None
+
+    async def fake_start(profile, policy, ie_extract):
+        raise exc
+
+    monkeypatch.setattr(app.policies, "get", fake_get)
+    monkeypatch.setattr(server, "astart_session", fake_start)
+    return app
+
+
+def test_incomplete_session_store_fails_at_construction():
+    class GetOnly(SessionStore):
+        async def get(self, session_id):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnly()
+
+
+def test_in_memory_store_roundtrip_and_max_sessions():
+    store = InMemorySessionStore(ttl_seconds=60, max_sessions=2)
+
+    async def scenario():
+        for i in range(3):
+            await store.put(f"s{i}", {"n": i})
+        return await store.get("s0"), await store.get("s2")
+
+    assert asyncio.run(scenario()) == (None, {"n": 2})
+    assert len(store) == 2
+
+
+def test_client_errors_are_4xx():
+    app = create_app(["finance_policy.pdf"])
+    assert _request(app, "POST", "/sessions", {})[0] == 400
+    assert _request(app, "POST", "/sessions", {"profile": "30세", "policy": "없음"})[0] == 404
+    assert _request(app, "GET", "/sessions/" + "0" * 32)[0] == 404
+    assert _request(app, "GET", "/nope")[0] == 404
+
+
+@pytest.mark.parametrize(
+    "exc, status",
+    [
+        (UpstageAPIError("Document Parse API 오류 (503)."), 502),
+        (httpx.ConnectError("connection refused"), 502),
+        (DeadlineExceeded("plan"), 504),
+        (KeyError("plan"), 500),
+        (ValueError("버그"), 500),
+    ],
+)
+def test_error_status_mapping(monkeypatch, exc, status):
+    app = _app_failing_with(monkeypatch, exc)
+    code, payload = _request(app, "POST", "/sessions", {"profile": "30세 직장인"})
+    assert code == status
+    if status == 500:  # 내부 오류 내용은 응답에 노출하지 않음
+        assert payload == {"error": "내부 오류가 발생했습니다."}
+
+
+def test_wrapped_upstream_error_is_502(monkeypatch):
+    try:
+        try:
+            raise UpstageAPIError("Document Parse API 오류 (500).")
+        except UpstageAPIError as cause:
+            raise RuntimeError("PDF 1-10쪽 구간 파싱에 실패했습니다") from cause
+    except RuntimeError as wrapped:
+        exc = wrapped
+    app = _app_failing_with(monkeypatch, exc)
+    assert _request(app, "POST", "/sessions", {"profile": "30세 직장인"})[0] == 502
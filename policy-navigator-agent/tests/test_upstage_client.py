@@ -0,0 +1,77 @@
+import asyncio
+import base64
+import json
+import os
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+import resilience
+import upstage_client
+
+
+class _FakeStream:
+    def __init__(self, deltas):
+        self._chunks = [
+            SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=d))], usage=None) for d in deltas
+        ]
+        self.closed = False
+
+    def __iter__(self):
+        return iter(self._chunks)
+
+    def close(self):
+        self.closed = True
+
+
+def test_stream_retry_does_not_hold_solar_slot_during_backoff(monkeypatch):
+    limiter = upstage_client._limiters["solar"]
+    stream = _FakeStream(["안녕", "하세요"])
+    attempts, in_flight_while_sleeping, in_flight_while_reading = [], [], []
+
+    def create(**kwargs):
+        attempts.append(limiter.stats()["in_flight"])
+        if len(attempts) == 1:
+            raise openai.APIConnectionError(request=httpx.Request("POST", "http://test"))
+        return stream
+
+    def on_token(delta):
+        in_flight_while_reading.append(limiter.stats()["in_flight"])
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(upstage_client._clients, "solar", lambda: client)
+    monkeypatch.setattr(resilience.time, "sleep", lambda s: in_flight_while_sleeping.append(limiter.stats()["in_flight"]))
+
+    assert upstage_client._call_solar_api("질문", 0.2, 100, None, on_token) == "안녕하세요"
+    assert attempts == [1, 1]  # 시도마다 슬롯 1개
+    assert in_flight_while_sleeping == [0]  # 재시도 대기 중에는 슬롯 반환
+    assert in_flight_while_reading == [1, 1]  # 스트림을 읽는 동안은 점유
+    assert limiter.stats()["in_flight"] == 0 and stream.closed
+
+
+@pytest.mark.parametrize("chunk_bytes, file_bytes", [
+    (1, 10), (2, 11), (3, 12), (4, 13), (1000, 0), (1000, 1), (1000, 2), (1000, 4097),
+    (upstage_client._IE_UPLOAD_CHUNK_BYTES, 100),
+    (upstage_client._IE_UPLOAD_CHUNK_BYTES, 3 * 64 * 1024 + 1),
+    (upstage_client._IE_UPLOAD_CHUNK_BYTES, 400_001),
+])
+def test_streamed_ie_body_matches_one_shot_base64(tmp_path, monkeypatch, chunk_bytes, file_bytes):
+    monkeypatch.setattr(upstage_client, "_IE_UPLOAD_CHUNK_BYTES", chunk_bytes)
+    path = tmp_path / "doc.pdf"
+    data = os.urandom(file_bytes)
+    path.write_bytes(data)
+    prefix, suffix, content_length = upstage_client._information_extract_body(str(path), {"type": "object"})
+    expected = prefix + base64.b64encode(data) + suffix
+
+    streamed = b"".join(upstage_client._iter_information_extract_body(str(path), prefix, suffix))
+
+    async def collect():
+        return b"".join([part async for part in upstage_client._aiter_information_extract_body(str(path), prefix, suffix)])
+
+    assert streamed == expected
+    assert asyncio.run(collect()) == expected
+    assert content_length == len(expected)
+    url = json.loads(streamed)["messages"][0]["content"][0]["image_url"]["url"]
+    assert url == "data:application/pdf;base64," + base64.b64encode(data).decode()